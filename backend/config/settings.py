@@ -8,6 +8,7 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 load_dotenv()
 
@@ -41,6 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack; inactive unless enabled below
+    "users.middleware.PerformanceMiddleware",
+    "users.middleware.QueryInspectionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Static file serving for production
@@ -50,6 +54,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Inactive unless DATABASE_REPLICA_URL is set
+    "users.middleware.ReplicaPinningMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -70,20 +76,115 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
+
+# Serve async-native register/login/profile/admin-list views on the primary
+# routes. Pair with SERVER_MODE=asgi (see gunicorn.conf.py).
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() in ('true', '1', 'yes')
 
 
 # =============================================================================
 # DATABASE CONFIGURATION
 # =============================================================================
 # SQLite for local development, PostgreSQL for production (auto-switch via DATABASE_URL)
+#
+# DATABASE_POOL picks how PostgreSQL connections are managed:
+#   off       - one persistent connection per worker thread (CONN_MAX_AGE),
+#               health-checked with a round trip at the start of each request
+#   psycopg   - psycopg 3 pool per worker process (Django's OPTIONS['pool']);
+#               idle connections are checked in the background instead
+#   pgbouncer - PgBouncer in transaction mode in front of the database: no
+#               server-side cursors, since they cannot outlive a transaction
+DATABASE_POOL = os.getenv('DATABASE_POOL', 'off')
+_pooled = DATABASE_POOL != 'off'
+_connection_options = {
+    'conn_max_age': 0 if DATABASE_POOL == 'psycopg' else int(os.getenv('DATABASE_CONN_MAX_AGE', '600')),
+    'conn_health_checks': os.getenv(
+        'DATABASE_HEALTH_CHECKS', 'False' if _pooled else 'True'
+    ).lower() in ('true', '1', 'yes'),
+}
 DATABASES = {
     "default": dj_database_url.config(
-        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600,
-        conn_health_checks=True,
+        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}", **_connection_options
     )
 }
 
+# DATABASE_REPLICA_URL adds a read replica for the admin list, count and
+# export queries (users.routers). After a user's own write their reads stay
+# on the primary for DATABASE_REPLICA_STICKY_SECONDS, which should exceed
+# the replication lag. Locally: DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+# with replica.sqlite3 a copy of db.sqlite3.
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+DATABASE_REPLICA_STICKY_SECONDS = float(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', '5'))
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL, **_connection_options)
+    # Tests read through the replica alias but run against one database
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['users.routers.ReplicaRouter']
+
+DATABASE_POOL_CHECK_INTERVAL = None
+for _database in DATABASES.values():
+    if _database['ENGINE'] != 'django.db.backends.postgresql':
+        continue
+    if DATABASE_POOL == 'psycopg':
+        _database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+            # Seconds a request waits for a free connection before erroring
+            'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '10')),
+            'max_idle': float(os.getenv('DATABASE_POOL_MAX_IDLE', '600')),
+            'max_lifetime': float(os.getenv('DATABASE_POOL_MAX_LIFETIME', '3600')),
+        }
+        DATABASE_POOL_CHECK_INTERVAL = float(os.getenv('DATABASE_POOL_CHECK_INTERVAL', '30')) or None
+    elif DATABASE_POOL == 'pgbouncer':
+        # Streaming exports fall back to keyset chunks (users.exporting)
+        _database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+
+# =============================================================================
+# PASSWORD HASHING
+# =============================================================================
+# PASSWORD_HASHER picks the algorithm for new hashes: pbkdf2, argon2 (needs
+# argon2-cffi) or scrypt. The others stay listed so existing hashes verify and
+# are re-encoded with the preferred hasher on the next successful login.
+# Benchmark with: python manage.py benchmark_hashers
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+_TUNABLE_HASHERS = {
+    'pbkdf2': 'users.hashers.TunablePBKDF2PasswordHasher',
+    'argon2': 'users.hashers.TunableArgon2PasswordHasher',
+    'scrypt': 'users.hashers.TunableScryptPasswordHasher',
+}
+PASSWORD_HASHERS = [_TUNABLE_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _TUNABLE_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+
+def _optional_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+# Cost parameters; unset values keep Django's defaults
+PASSWORD_HASHING = {
+    'PBKDF2_ITERATIONS': _optional_int('PBKDF2_ITERATIONS'),
+    'ARGON2_TIME_COST': _optional_int('ARGON2_TIME_COST'),
+    'ARGON2_MEMORY_COST': _optional_int('ARGON2_MEMORY_COST'),
+    'ARGON2_PARALLELISM': _optional_int('ARGON2_PARALLELISM'),
+    'SCRYPT_WORK_FACTOR': _optional_int('SCRYPT_WORK_FACTOR'),
+}
+
+# Optional bounded pool for hashing/verification. When WORKERS + MAX_QUEUE
+# hashes are already pending, login/register fail fast with 503 + Retry-After.
+PASSWORD_HASHING_POOL = {
+    'ENABLED': os.getenv('HASHING_POOL_ENABLED', 'False').lower() in ('true', '1', 'yes'),
+    'EXECUTOR': os.getenv('HASHING_POOL_EXECUTOR', 'thread'),  # 'thread' or 'process'
+    'WORKERS': int(os.getenv('HASHING_POOL_WORKERS', str(os.cpu_count() or 1))),
+    'MAX_QUEUE': int(os.getenv('HASHING_POOL_MAX_QUEUE', '16')),
+    'TIMEOUT': float(os.getenv('HASHING_POOL_TIMEOUT', '10')),
+}
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -106,6 +207,74 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+# =============================================================================
+# CACHE CONFIGURATION
+# =============================================================================
+# Redis when REDIS_URL is set (shared by all workers), per-process memory otherwise
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Whether the default cache is seen by every worker. Writes invalidate cached
+# state only in the cache they can reach, so entries other workers must not
+# keep serving (auth rows, ETag stamps) are used only when this is on. Set
+# SHARED_CACHE=True for a single-process deployment without Redis.
+SHARED_CACHE = os.getenv('SHARED_CACHE', str(bool(REDIS_URL))).lower() in ('true', '1', 'yes')
+
+# Lifetime of the ETag version stamps (users.versions); expiry only costs a 200
+RESOURCE_VERSION_TTL = int(os.getenv('RESOURCE_VERSION_TTL', '3600'))
+
+# Rendered admin list pages (users.page_cache), kept apart from the default
+# cache so they cannot evict auth entries. Redis shares pages across workers;
+# otherwise a file cache (USER_LIST_PAGE_CACHE_DIR) or per-process LRU memory.
+# Pages are keyed by the ETag stamps, so caching is skipped without SHARED_CACHE.
+USER_LIST_PAGE_CACHE = {
+    'ENABLED': os.getenv('USER_LIST_PAGE_CACHE', 'False').lower() in ('true', '1', 'yes'),
+    'ALIAS': 'user_list_pages',
+    'TTL': int(os.getenv('USER_LIST_PAGE_CACHE_TTL', '60')),
+}
+USER_LIST_PAGE_CACHE_DIR = os.getenv('USER_LIST_PAGE_CACHE_DIR')
+_page_cache_options = {'MAX_ENTRIES': int(os.getenv('USER_LIST_PAGE_CACHE_MAX_ENTRIES', '1000'))}
+if REDIS_URL:
+    CACHES['user_list_pages'] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "pages",
+    }
+elif USER_LIST_PAGE_CACHE_DIR:
+    CACHES['user_list_pages'] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": USER_LIST_PAGE_CACHE_DIR,
+        "OPTIONS": _page_cache_options,
+    }
+else:
+    CACHES['user_list_pages'] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "user-list-pages",
+        "OPTIONS": _page_cache_options,
+    }
+
+# Authenticated user lookups: optional per-process LRU in front of the shared
+# cache (used only with SHARED_CACHE). LOCAL_TTL > 0 enables the LRU and is how
+# long other workers may keep serving a row after a ban, so it is off (0) by default.
+AUTH_USER_CACHE = {
+    'LOCAL_SIZE': int(os.getenv('AUTH_USER_CACHE_LOCAL_SIZE', '1024')),
+    'LOCAL_TTL': float(os.getenv('AUTH_USER_CACHE_LOCAL_TTL', '0')),
+    'SHARED_TTL': int(os.getenv('AUTH_USER_CACHE_SHARED_TTL', '300')),
+}
+
+
 # =============================================================================
 # CUSTOM USER MODEL
 # =============================================================================
@@ -117,15 +286,48 @@ AUTH_USER_MODEL = 'users.CustomUser'
 # =============================================================================
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Trusted reverse proxies in front of the app. Throttles take the client IP
+    # from X-Forwarded-For only this many hops deep; 0 ignores the header and
+    # uses REMOTE_ADDR, so clients cannot pick their own bucket. Render's proxy
+    # is one hop; with 0 there, every client would share the proxy's bucket.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '1' if os.getenv('RENDER') else '0')),
+}
+
+# Token-bucket throttles for the public auth endpoints (users.throttling).
+# Rates read "capacity/period": '10/min' allows a burst of 10 that refills
+# over a minute. Rejections happen before any query or password hash.
+# Buckets live in the default cache: without REDIS_URL each worker keeps its
+# own, so the effective limits are the rates times the worker count.
+AUTH_THROTTLE = {
+    'ENABLED': os.getenv('AUTH_THROTTLE', 'True').lower() in ('true', '1', 'yes'),
+    'RATES': {
+        'login_ip': os.getenv('AUTH_THROTTLE_LOGIN_IP', '30/min'),
+        'login_email': os.getenv('AUTH_THROTTLE_LOGIN_EMAIL', '10/min'),
+        'register_ip': os.getenv('AUTH_THROTTLE_REGISTER_IP', '20/hour'),
+    },
 }
 
+# Admin user list pagination: 'page' (?page=N) or 'cursor' (keyset on date_joined, id).
+# Clients can override per request with ?pagination=cursor|page.
+USER_LIST_PAGINATION = os.getenv('USER_LIST_PAGINATION', 'page')
+
+# Default rows per admin list page; ?page_size=N may raise it up to the max.
+USER_LIST_PAGE_SIZE = int(os.getenv('USER_LIST_PAGE_SIZE', '10'))
+USER_LIST_MAX_PAGE_SIZE = int(os.getenv('USER_LIST_MAX_PAGE_SIZE', '1000'))
+
+# Page-mode total: 'exact' (COUNT(*)), 'estimated' (pg_class.reltuples / cached count),
+# 'capped' (exact up to USER_LIST_COUNT_CAP, then "cap+") or 'none' (has-next only).
+USER_LIST_COUNT = os.getenv('USER_LIST_COUNT', 'exact')
+USER_LIST_COUNT_CAP = int(os.getenv('USER_LIST_COUNT_CAP', '10000'))
+USER_LIST_COUNT_CACHE_TTL = int(os.getenv('USER_LIST_COUNT_CACHE_TTL', '60'))
+
 
 # =============================================================================
 # SIMPLE JWT CONFIGURATION
@@ -141,6 +343,20 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Buffer last_login writes in memory and flush them in bulk. MAX_STALENESS bounds
+# (in seconds) how far the stored value may lag behind the real login time.
+LAST_LOGIN_BUFFER = {
+    'ENABLED': os.getenv('LAST_LOGIN_BUFFER_ENABLED', 'False').lower() in ('true', '1', 'yes'),
+    'BATCH_SIZE': int(os.getenv('LAST_LOGIN_BUFFER_BATCH_SIZE', '500')),
+    'MAX_STALENESS': float(os.getenv('LAST_LOGIN_MAX_STALENESS', '30')),
+}
+
+# Opt-in: put role, is_active and token version in access tokens so permission
+# checks skip the user row. Revocations reach other workers within
+# TOKEN_VERSION_CHECK_INTERVAL seconds.
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', 'False').lower() in ('true', '1', 'yes')
+TOKEN_VERSION_CHECK_INTERVAL = float(os.getenv('TOKEN_VERSION_CHECK_INTERVAL', '5'))
+
 
 # =============================================================================
 # CORS CONFIGURATION
@@ -157,3 +373,46 @@ if FRONTEND_URL:
     CORS_ALLOWED_ORIGINS.append(FRONTEND_URL)
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Conditional GETs: the SPA sends If-None-Match and must be able to read ETag
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match')
+CORS_EXPOSE_HEADERS = ['ETag']
+
+
+# =============================================================================
+# PERFORMANCE INSTRUMENTATION
+# =============================================================================
+# Per-request DB/hash/serializer timings as Server-Timing headers and
+# histograms at /api/auth/admin/metrics/. LOG_THRESHOLD_MS logs one JSON line
+# per request at least that slow (0 logs all, unset logs none).
+PERFORMANCE_INSTRUMENTATION = {
+    'ENABLED': os.getenv('PERFORMANCE_INSTRUMENTATION', 'False').lower() in ('true', '1', 'yes'),
+    'SERVER_TIMING': os.getenv('PERFORMANCE_SERVER_TIMING', 'True').lower() in ('true', '1', 'yes'),
+    'LOG_THRESHOLD_MS': _optional_int('PERFORMANCE_LOG_THRESHOLD_MS'),
+}
+
+# N+1 and slow-query detection for users app views (development/staging).
+# A query shape run N_PLUS_ONE_THRESHOLD times in one request is reported;
+# queries slower than SLOW_QUERY_MS are logged with their EXPLAIN plan.
+# RAISE turns N+1 reports into NPlusOneDetected exceptions (for test runs).
+QUERY_INSPECTION = {
+    'ENABLED': os.getenv('QUERY_INSPECTION', 'False').lower() in ('true', '1', 'yes'),
+    'N_PLUS_ONE_THRESHOLD': int(os.getenv('QUERY_N_PLUS_ONE_THRESHOLD', '3')),
+    'SLOW_QUERY_MS': _optional_int('QUERY_SLOW_MS'),
+    'EXPLAIN': os.getenv('QUERY_EXPLAIN', 'True').lower() in ('true', '1', 'yes'),
+    'RAISE': os.getenv('QUERY_INSPECTION_RAISE', 'False').lower() in ('true', '1', 'yes'),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'users': {
+            'handlers': ['console'],
+            'level': os.getenv('USERS_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration.
+SERVER_MODE=wsgi (default) runs sync workers on config.wsgi; SERVER_MODE=asgi
+runs uvicorn workers on config.asgi so each process can hold thousands of
+concurrent slow clients (enable ASYNC_VIEWS for the async-native endpoints).
+Worker count comes from gunicorn's own WEB_CONCURRENCY variable.
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+if os.getenv('SERVER_MODE', 'wsgi') == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
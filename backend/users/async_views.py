@@ -0,0 +1,282 @@
+import json
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .authentication import CachedJWTAuthentication, aresolve_user
+from .hashing import hashing_pool
+from .last_login import last_login_buffer
+from .models import CustomUser
+from .pagination import UserCountPaginator, get_user_list_page_size
+from .renderers import FastJSONRenderer
+from .routers import aread_alias
+from .search import filter_users
+from .serializers import (
+    LoginCredentialsSerializer,
+    UserRegistrationSerializer,
+    UserResponseSerializer,
+    UserListSerializer,
+    UserProfileSerializer,
+    get_tokens_for_user,
+    user_list_data
+)
+from .throttling import LoginEmailThrottle, LoginIPThrottle, RegisterIPThrottle
+from .views import CustomTokenObtainPairSerializer
+
+
+# =============================================================================
+# BASE VIEW
+# =============================================================================
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of a DRF APIView for ASGI deployments.
+    Authenticates with the same cached JWT flow, validates with the same
+    serializers and renders with DRF's JSONRenderer, so response bodies match
+    the sync endpoints. DB work uses Django's async ORM and hashing
+    is awaited on an executor, keeping the event loop free for other clients.
+    """
+
+    authentication = CachedJWTAuthentication()
+    renderer = JSONRenderer()
+    require_authentication = True
+    require_admin = False
+    throttle_classes = ()
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if self.require_authentication:
+                request.user = await self.authenticate(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.error_response(request, exc)
+
+    async def authenticate(self, request):
+        result = await self.authentication.aauthenticate(request)
+        if result is None:
+            raise exceptions.NotAuthenticated()
+
+        user, _token = result
+        if self.require_admin and user.role != 'admin':
+            raise exceptions.PermissionDenied('Admin access required.')
+        return user
+
+    async def check_throttles(self, request, data) -> None:
+        """Same buckets as the sync views, checked before any DB or hash work."""
+        waits = []
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not await throttle.aallow_request(request, data):
+                waits.append(throttle.wait())
+        if waits:
+            raise exceptions.Throttled(max(waits))
+
+    def parse(self, request) -> dict:
+        if not request.body:
+            return {}
+        try:
+            return json.loads(request.body)
+        except ValueError as exc:
+            raise exceptions.ParseError(f'JSON parse error - {exc}')
+
+    def render(self, data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status_code,
+            content_type='application/json'
+        )
+
+    def error_response(self, request, exc: exceptions.APIException) -> HttpResponse:
+        # Same body shape and headers as DRF's default exception handler
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {'detail': exc.detail}
+
+        response = self.render(data, exc.status_code)
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response['WWW-Authenticate'] = self.authentication.authenticate_header(request)
+        if getattr(exc, 'wait', None):
+            response['Retry-After'] = '%d' % exc.wait
+        return response
+
+
+# =============================================================================
+# AUTHENTICATION VIEWS
+# =============================================================================
+
+class AsyncRegisterView(AsyncAPIView):
+    """Async variant of RegisterView."""
+
+    require_authentication = False
+    throttle_classes = (RegisterIPThrottle,)
+
+    async def post(self, request):
+        body = self.parse(request)
+        await self.check_throttles(request, body)
+        serializer = UserRegistrationSerializer(data=body)
+        # Field rules are CPU-only; the email UniqueValidator is one indexed SELECT
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        data = serializer.validated_data
+
+        password = await hashing_pool.arun(make_password, data['password'])
+        user = await CustomUser.objects.acreate(
+            email=CustomUser.objects.normalize_email(data['email']),
+            full_name=data['full_name'],
+            password=password
+        )
+
+        return self.render({
+            'user': UserResponseSerializer(user).data,
+            'tokens': get_tokens_for_user(user)
+        }, status.HTTP_201_CREATED)
+
+
+class AsyncLoginView(AsyncAPIView):
+    """
+    Async variant of LoginView.
+    Performs ModelBackend's checks with awaited lookups and hashing.
+    """
+
+    require_authentication = False
+    throttle_classes = (LoginIPThrottle, LoginEmailThrottle)
+
+    async def post(self, request):
+        body = self.parse(request)
+        await self.check_throttles(request, body)
+        serializer = LoginCredentialsSerializer(data=body)
+        serializer.is_valid(raise_exception=True)
+        email = serializer.validated_data['email']
+        password = serializer.validated_data['password']
+
+        user = await CustomUser.objects.filter(email=email).afirst()
+        if user is None:
+            # Same dummy hash ModelBackend runs, so unknown emails take as long
+            await hashing_pool.arun(make_password, password)
+            raise self.no_active_account()
+
+        is_correct, must_update = await hashing_pool.arun(verify_password, password, user.password)
+        if not is_correct or not user.is_active:
+            raise self.no_active_account()
+
+        if must_update:
+            user.password = await hashing_pool.arun(make_password, password)
+            await user.asave(update_fields=['password'])
+
+        user.last_login = timezone.now()
+        if last_login_buffer.enabled:
+            # Never touches the database; due batches flush on the timer thread
+            last_login_buffer.record(user.pk, user.last_login)
+        else:
+            await user.asave(update_fields=['last_login'])
+
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
+        return self.render({
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'user': CustomTokenObtainPairSerializer.get_user_data(user),
+        })
+
+    def no_active_account(self) -> exceptions.AuthenticationFailed:
+        return exceptions.AuthenticationFailed(
+            CustomTokenObtainPairSerializer.default_error_messages['no_active_account'],
+            'no_active_account'
+        )
+
+
+# =============================================================================
+# ADMIN VIEWS
+# =============================================================================
+
+class AsyncAdminUserListView(AsyncAPIView):
+    """
+    Async variant of AdminUserListView (page-number mode only, no ETag or
+    page cache), so it is served on its async/ route only.
+    Rows come from async iteration with a page_size + 1 lookahead, on the
+    replica unless the admin is pinned to the primary.
+    """
+
+    renderer = FastJSONRenderer()
+    require_admin = True
+
+    async def get(self, request):
+        alias = await aread_alias(request.user)
+        queryset = CustomUser.objects.using(alias).order_by('-date_joined', '-id')
+        # May probe for the SQLite FTS table on first use
+        queryset = await sync_to_async(filter_users)(queryset, request.GET)
+        page_size = get_user_list_page_size(request.GET)
+
+        try:
+            page = int(request.GET.get('page', 1))
+        except ValueError:
+            raise exceptions.NotFound('Invalid page.')
+        if page < 1:
+            raise exceptions.NotFound('Invalid page.')
+
+        bottom = (page - 1) * page_size
+        rows = [
+            row async for row in
+            queryset.values_list(*UserListSerializer.Meta.fields)[bottom:bottom + page_size + 1]
+        ]
+        if page > 1 and not rows:
+            raise exceptions.NotFound('Invalid page.')
+
+        data = OrderedDict()
+        if settings.USER_LIST_COUNT == 'exact':
+            data['count'] = await queryset.acount()
+        else:
+            paginator = UserCountPaginator(
+                queryset, page_size, settings.USER_LIST_COUNT, settings.USER_LIST_COUNT_CAP
+            )
+            data['count'] = await sync_to_async(lambda: paginator.count)()
+            data['count_is_approximate'] = paginator.count_is_approximate
+
+        url = request.build_absolute_uri()
+        data['next'] = replace_query_param(url, 'page', page + 1) if len(rows) > page_size else None
+        if page == 1:
+            data['previous'] = None
+        elif page == 2:
+            data['previous'] = remove_query_param(url, 'page')
+        else:
+            data['previous'] = replace_query_param(url, 'page', page - 1)
+        data['results'] = user_list_data(rows[:page_size])
+
+        return self.render(data)
+
+
+# =============================================================================
+# USER PROFILE VIEWS
+# =============================================================================
+
+class AsyncUserProfileView(AsyncAPIView):
+    """Async variant of UserProfileView without ETags; served on its async/ route only."""
+
+    async def get(self, request):
+        user = await aresolve_user(request.user)
+        return self.render(UserProfileSerializer(user).data)
+
+    async def put(self, request):
+        return await self.update(request, partial=False)
+
+    async def patch(self, request):
+        return await self.update(request, partial=True)
+
+    async def update(self, request, partial: bool):
+        user = await aresolve_user(request.user)
+        serializer = UserProfileSerializer(user, data=self.parse(request), partial=partial)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        # UserProfileSerializer.update() writes only the changed columns
+        user = await sync_to_async(serializer.save)()
+
+        return self.render(UserProfileSerializer(user).data)
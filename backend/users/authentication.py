@@ -0,0 +1,387 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser
+
+
+# Fields request.user needs for IsAdminRole and the profile/admin views.
+# last_login is left out on purpose: it changes on every login and a stale
+# cached value must never be written back by a later save().
+# Kept in concrete field order, which Model.from_db() requires.
+CACHED_USER_FIELDS = tuple(
+    field.attname for field in CustomUser._meta.concrete_fields
+    if field.attname in {
+        'id', 'email', 'full_name', 'role', 'is_active',
+        'is_staff', 'is_superuser', 'date_joined',
+    }
+)
+
+
+class LocalLRU:
+    """
+    Small thread-safe LRU with per-entry TTL.
+    Lives per process, in front of the shared cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class UserLookupCache:
+    """
+    Two-level cache of authenticated user rows: per-process LRU (opt-in via
+    LOCAL_TTL), then the Django cache shared by all workers, then the database.
+
+    Entries hold raw field values and are rebuilt into fresh model instances
+    on every hit, so a view mutating request.user never touches the cache.
+    Writes invalidate both layers in the writing worker only. The shared layer
+    is therefore used only when SHARED_CACHE is set (Redis): a per-process
+    locmem "shared" layer would let other workers serve a banned user for
+    SHARED_TTL. With the local layer on, other workers' entries expire after
+    LOCAL_TTL, which bounds how long a ban can take to reach them; with it off
+    (the default) every worker sees a ban on its next request.
+    """
+
+    key_prefix = 'users:auth:'
+
+    def __init__(self):
+        config = settings.AUTH_USER_CACHE
+        self.shared_ttl = config['SHARED_TTL']
+        self.local = LocalLRU(config['LOCAL_SIZE'], config['LOCAL_TTL'])
+        self.hits = {'local': 0, 'shared': 0}
+        self.misses = 0
+
+    def _key(self, user_id) -> str:
+        return f'{self.key_prefix}{user_id}'
+
+    def _build(self, values) -> CustomUser:
+        return CustomUser.from_db(DEFAULT_DB_ALIAS, CACHED_USER_FIELDS, values)
+
+    def get(self, user_id):
+        key = self._key(user_id)
+
+        values = self.local.get(key)
+        if values is not None:
+            self.hits['local'] += 1
+            return self._build(values)
+
+        shared = settings.SHARED_CACHE
+        values = cache.get(key) if shared else None
+        if values is not None:
+            self.hits['shared'] += 1
+            self.local.set(key, values)
+            return self._build(values)
+
+        self.misses += 1
+        values = CustomUser.objects.filter(pk=user_id).values_list(*CACHED_USER_FIELDS).first()
+        if values is None:
+            return None
+
+        if shared:
+            cache.set(key, values, self.shared_ttl)
+        self.local.set(key, values)
+        return self._build(values)
+
+    async def aget(self, user_id):
+        """Async variant of get() for the ASGI views."""
+        key = self._key(user_id)
+
+        values = self.local.get(key)
+        if values is not None:
+            self.hits['local'] += 1
+            return self._build(values)
+
+        shared = settings.SHARED_CACHE
+        values = await cache.aget(key) if shared else None
+        if values is not None:
+            self.hits['shared'] += 1
+            self.local.set(key, values)
+            return self._build(values)
+
+        self.misses += 1
+        values = await CustomUser.objects.filter(pk=user_id).values_list(*CACHED_USER_FIELDS).afirst()
+        if values is None:
+            return None
+
+        if shared:
+            await cache.aset(key, values, self.shared_ttl)
+        self.local.set(key, values)
+        return self._build(values)
+
+    def invalidate(self, user_id) -> None:
+        key = self._key(user_id)
+        self.local.delete(key)
+        cache.delete(key)
+
+    def invalidate_many(self, user_ids) -> None:
+        keys = [self._key(user_id) for user_id in user_ids]
+        for key in keys:
+            self.local.delete(key)
+        cache.delete_many(keys)
+
+    def clear_local(self) -> None:
+        self.local.clear()
+
+
+user_cache = UserLookupCache()
+
+
+# =============================================================================
+# STATELESS CLAIMS MODE
+# =============================================================================
+
+TOKEN_VERSION_CLAIM = 'ver'
+
+
+class TokenVersionStore:
+    """
+    Per-user token versions used to revoke stateless access tokens.
+
+    Reads go local memo -> shared cache -> CustomUser.token_version. The memo
+    lives for TOKEN_VERSION_CHECK_INTERVAL seconds, which is the longest a
+    revoked token stays usable on another worker. forget() clears the shared
+    entry for every worker only when SHARED_CACHE is set; otherwise that layer
+    is skipped, since a per-process copy would outlive the interval.
+    """
+
+    key_prefix = 'users:token_version:'
+
+    def __init__(self):
+        self.local = LocalLRU(
+            settings.AUTH_USER_CACHE['LOCAL_SIZE'], settings.TOKEN_VERSION_CHECK_INTERVAL
+        )
+
+    def _key(self, user_id) -> str:
+        return f'{self.key_prefix}{user_id}'
+
+    def get(self, user_id):
+        key = self._key(user_id)
+
+        shared = settings.SHARED_CACHE
+        version = self.local.get(key)
+        if version is None and shared:
+            version = cache.get(key)
+        if version is None:
+            version = CustomUser.objects.filter(pk=user_id).values_list(
+                'token_version', flat=True
+            ).first()
+            if version is None:
+                return None
+            if shared:
+                cache.set(key, version, settings.AUTH_USER_CACHE['SHARED_TTL'])
+
+        self.local.set(key, version)
+        return version
+
+    async def aget(self, user_id):
+        """Async variant of get() for the ASGI views."""
+        key = self._key(user_id)
+
+        shared = settings.SHARED_CACHE
+        version = self.local.get(key)
+        if version is None and shared:
+            version = await cache.aget(key)
+        if version is None:
+            version = await CustomUser.objects.filter(pk=user_id).values_list(
+                'token_version', flat=True
+            ).afirst()
+            if version is None:
+                return None
+            if shared:
+                await cache.aset(key, version, settings.AUTH_USER_CACHE['SHARED_TTL'])
+
+        self.local.set(key, version)
+        return version
+
+    def revoke(self, user_ids, using: str = 'default') -> None:
+        """Invalidate every token issued so far to the given users."""
+        user_ids = list(user_ids)
+        CustomUser.objects.using(using).filter(pk__in=user_ids).update(
+            token_version=F('token_version') + 1
+        )
+        self.forget(user_ids)
+
+    def forget(self, user_ids) -> None:
+        """Drop cached versions after token_version was bumped in the database."""
+        keys = [self._key(user_id) for user_id in user_ids]
+        for key in keys:
+            self.local.delete(key)
+        cache.delete_many(keys)
+
+    def clear_local(self) -> None:
+        self.local.clear()
+
+
+token_versions = TokenVersionStore()
+
+
+def add_user_claims(token, user: CustomUser):
+    """
+    Stamp role, is_active and token version onto a token in stateless mode.
+    Claims on a refresh token are copied into the access tokens it mints.
+    """
+    if settings.JWT_STATELESS_AUTH:
+        token['role'] = user.role
+        token['is_active'] = user.is_active
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight request.user built from access token claims.
+    Enough for IsAdminRole and self-lockout checks without a DB query.
+    """
+
+    @cached_property
+    def id(self) -> uuid.UUID:
+        return uuid.UUID(str(self.token[api_settings.USER_ID_CLAIM]))
+
+    @cached_property
+    def role(self) -> str:
+        return self.token.get('role', '')
+
+    @cached_property
+    def is_active(self) -> bool:
+        return self.token.get('is_active', False)
+
+
+def resolve_user(user) -> CustomUser:
+    """Return a model instance for request.user, loading it if it is a ClaimsUser."""
+    if isinstance(user, CustomUser):
+        return user
+    instance = user_cache.get(user.pk)
+    if instance is None:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+    return instance
+
+
+async def aresolve_user(user) -> CustomUser:
+    """Async variant of resolve_user() for the ASGI views."""
+    if isinstance(user, CustomUser):
+        return user
+    instance = await user_cache.aget(user.pk)
+    if instance is None:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+    return instance
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through UserLookupCache
+    instead of a SELECT per request.
+
+    With JWT_STATELESS_AUTH, tokens carrying claims skip the user lookup and
+    yield a ClaimsUser, checked only against the token version store.
+    The a*-methods are the same flow for the async (ASGI) views.
+    """
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            ) from e
+
+    def check_user(self, user):
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+    def check_token_version(self, validated_token, current_version) -> None:
+        if current_version is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if validated_token[TOKEN_VERSION_CLAIM] != current_version:
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+    def uses_claims(self, validated_token) -> bool:
+        return settings.JWT_STATELESS_AUTH and TOKEN_VERSION_CLAIM in validated_token
+
+    def get_user(self, validated_token):
+        if self.uses_claims(validated_token):
+            return self.get_claims_user(validated_token)
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Revocation compares the password hash, which is never cached
+            return super().get_user(validated_token)
+
+        return self.check_user(user_cache.get(self.get_user_id(validated_token)))
+
+    def get_claims_user(self, validated_token) -> ClaimsUser:
+        self.get_user_id(validated_token)
+        user = self.check_user(ClaimsUser(validated_token))
+        self.check_token_version(validated_token, token_versions.get(user.id))
+        return user
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if self.uses_claims(validated_token):
+            self.get_user_id(validated_token)
+            user = self.check_user(ClaimsUser(validated_token))
+            self.check_token_version(validated_token, await token_versions.aget(user.id))
+            return user
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return await sync_to_async(super().get_user)(validated_token)
+
+        return self.check_user(await user_cache.aget(self.get_user_id(validated_token)))
@@ -0,0 +1,272 @@
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .authentication import token_versions, user_cache
+from .factories import DEFAULT_PASSWORD, create_users, factory_email
+from .models import CustomUser
+from .serializers import get_tokens_for_user
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+@dataclass
+class Scenario:
+    """One request shape against a named route from users/urls.py."""
+
+    url_name: str
+    method: str = 'get'
+    auth: str = None
+    label: str = None
+    params: dict = None
+    data: object = None
+    url_kwargs: object = None
+    format: str = 'json'
+    # Whole-table work (export); run at most this many times per size
+    max_requests: int = None
+
+    @property
+    def name(self) -> str:
+        return self.label or f'{self.url_name}:{self.method}'
+
+
+def _register(ctx, i):
+    return {
+        'email': f'bench-register-{ctx.size}-{i}@example.com',
+        'full_name': 'Bench Register',
+        'password': DEFAULT_PASSWORD,
+    }
+
+
+def _change_password(ctx, i):
+    # Alternate between two passwords so every request succeeds
+    passwords = [DEFAULT_PASSWORD, 'BenchmarkPass456']
+    return {'old_password': passwords[i % 2], 'new_password': passwords[(i + 1) % 2]}
+
+
+def _import_file(ctx, i):
+    rows = ''.join(
+        f'bench-import-{ctx.size}-{i}-{n}@example.com,Bench Import,{DEFAULT_PASSWORD}\n'
+        for n in range(10)
+    )
+    content = ('email,full_name,password\n' + rows).encode()
+    return {'file': SimpleUploadedFile('users.csv', content, content_type='text/csv')}
+
+
+SCENARIOS = [
+    Scenario('auth-register', 'post', data=_register),
+    Scenario('auth-login', 'post', data=lambda ctx, i: {
+        'email': ctx.user.email, 'password': DEFAULT_PASSWORD
+    }),
+    Scenario('token-refresh', 'post', data=lambda ctx, i: {'refresh': ctx.refresh}),
+    Scenario('user-profile', 'get', auth='user'),
+    Scenario('user-profile', 'patch', auth='user', data=lambda ctx, i: {'full_name': f'Bench {i}'}),
+    Scenario('change-password', 'post', auth='password_user', data=_change_password),
+    Scenario('admin-user-list', 'get', auth='admin'),
+    Scenario('admin-user-list', 'get', auth='admin', label='admin-user-list:deep-page',
+             params=lambda ctx: {'page': max(1, min(ctx.size // 10, 1000))}),
+    Scenario('admin-user-list', 'get', auth='admin', label='admin-user-list:bulk-page',
+             params={'page_size': 1000}),
+    Scenario('admin-user-list', 'get', auth='admin', label='admin-user-list:cursor',
+             params={'pagination': 'cursor'}),
+    Scenario('admin-user-list', 'get', auth='admin', label='admin-user-list:search',
+             params={'search': 'smith 1'}),
+    Scenario('admin-user-status', 'patch', auth='admin',
+             url_kwargs=lambda ctx: {'pk': ctx.target.pk},
+             data=lambda ctx, i: {'is_active': bool(i % 2)}),
+    Scenario('admin-user-bulk-status', 'post', auth='admin',
+             data=lambda ctx, i: {'is_active': bool(i % 2), 'ids': ctx.bulk_ids}),
+    Scenario('admin-user-import', 'post', auth='admin', data=_import_file, format='multipart'),
+    Scenario('admin-user-export', 'get', auth='admin', max_requests=3),
+    Scenario('async-auth-login', 'post', data=lambda ctx, i: {
+        'email': ctx.user.email, 'password': DEFAULT_PASSWORD
+    }),
+    Scenario('async-user-profile', 'get', auth='user'),
+    Scenario('async-admin-user-list', 'get', auth='admin'),
+]
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+@dataclass
+class BenchmarkContext:
+    size: int
+    admin: CustomUser
+    user: CustomUser
+    password_user: CustomUser
+    target: CustomUser
+    bulk_ids: list
+    refresh: str
+    clients: dict = field(default_factory=dict)
+
+    def client(self, auth: str) -> APIClient:
+        if auth not in self.clients:
+            client = APIClient()
+            if auth is not None:
+                token = get_tokens_for_user(getattr(self, auth))['access']
+                client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.clients[auth] = client
+        return self.clients[auth]
+
+
+class BenchmarkRunner:
+    """
+    Seeds the user table up to each size in turn and measures every scenario:
+    p50/p95/p99 latency and the SQL query count of a warm request.
+
+    Runs against whatever database is active, so callers point it at a
+    throwaway test database (see the benchmark_api command).
+    """
+
+    def __init__(self, sizes: list, requests: int = 20, warmup: int = 2,
+                 scenarios: list = None, stdout=None):
+        self.sizes = sorted(sizes)
+        self.requests = requests
+        self.warmup = warmup
+        self.scenarios = scenarios or SCENARIOS
+        self.stdout = stdout
+        self.seeded = 0
+
+    def log(self, message: str) -> None:
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def seed_to(self, size: int) -> None:
+        if size > self.seeded:
+            self.log(f'Seeding users {self.seeded}..{size - 1}')
+            create_users(size - self.seeded, start=self.seeded)
+            self.seeded = size
+
+    def build_context(self, size: int) -> BenchmarkContext:
+        # Fixed accounts outside the seeded range, reused across sizes
+        def account(email, **extra):
+            user = CustomUser.objects.filter(email=email).first()
+            return user or CustomUser.objects.create_user(
+                email=email, password=DEFAULT_PASSWORD, full_name='Bench Account', **extra
+            )
+
+        user = account('bench-user@example.com')
+        password_user = account('bench-password@example.com')
+        # change-password alternates passwords; start every size from the default
+        password_user.set_password(DEFAULT_PASSWORD)
+        password_user.save(update_fields=['password'])
+        seeded = CustomUser.objects.filter(email__in=[factory_email(n) for n in range(100)])
+        return BenchmarkContext(
+            size=size,
+            admin=account('bench-admin@example.com', role='admin'),
+            user=user,
+            password_user=password_user,
+            target=CustomUser.objects.get(email=factory_email(0)),
+            bulk_ids=[str(pk) for pk in seeded.values_list('pk', flat=True)],
+            refresh=get_tokens_for_user(user)['refresh'],
+        )
+
+    def request(self, ctx: BenchmarkContext, scenario: Scenario, i: int):
+        client = ctx.client(scenario.auth)
+        kwargs = scenario.url_kwargs(ctx) if scenario.url_kwargs else None
+        url = reverse(scenario.url_name, kwargs=kwargs)
+        params = scenario.params(ctx) if callable(scenario.params) else scenario.params
+
+        method = getattr(client, scenario.method)
+        if scenario.method == 'get':
+            response = method(url, params)
+        else:
+            response = method(url, scenario.data(ctx, i) if scenario.data else {}, format=scenario.format)
+
+        if response.streaming:
+            # Latency covers the whole streamed body
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, ctx: BenchmarkContext, scenario: Scenario) -> dict:
+        requests = self.requests
+        if scenario.max_requests:
+            requests = min(requests, scenario.max_requests)
+
+        for i in range(self.warmup):
+            self.request(ctx, scenario, i)
+
+        latencies, queries, errors = [], 0, 0
+        for i in range(self.warmup, self.warmup + requests):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = self.request(ctx, scenario, i)
+                latencies.append(time.perf_counter() - start)
+            queries = max(queries, len(captured.captured_queries))
+            if response.status_code >= 400:
+                errors += 1
+
+        return {
+            'requests': requests,
+            'p50_ms': round(statistics.median(latencies) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'queries': queries,
+            'errors': errors,
+        }
+
+    def run(self) -> dict:
+        results = {}
+        for size in self.sizes:
+            self.seed_to(size)
+            cache.clear()
+            user_cache.clear_local()
+            token_versions.clear_local()
+
+            ctx = self.build_context(size)
+            results[str(size)] = {}
+            for scenario in self.scenarios:
+                results[str(size)][scenario.name] = self.measure(ctx, scenario)
+                self.log(f'  {size:>9} {scenario.name:<32} {results[str(size)][scenario.name]}')
+        return results
+
+
+# =============================================================================
+# REGRESSION CHECK
+# =============================================================================
+
+def compare(results: dict, baseline: dict, latency_threshold: float = 0.25,
+            query_threshold: int = 0, min_latency_ms: float = 1.0) -> list:
+    """
+    Regressions of results against a baseline run, as readable strings.
+
+    A scenario regresses when it issues more than query_threshold extra
+    queries, or its p95 grows by more than latency_threshold (a fraction)
+    and by at least min_latency_ms, which keeps sub-millisecond noise out.
+    Scenarios missing from the baseline are not compared.
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for name, current in scenarios.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries'] + query_threshold:
+                regressions.append(
+                    f'{name} @ {size}: queries {previous["queries"]} -> {current["queries"]}'
+                )
+            growth = current['p95_ms'] - previous['p95_ms']
+            if growth >= min_latency_ms and current['p95_ms'] > previous['p95_ms'] * (1 + latency_threshold):
+                regressions.append(
+                    f'{name} @ {size}: p95 {previous["p95_ms"]}ms -> {current["p95_ms"]}ms'
+                )
+    return regressions
@@ -0,0 +1,116 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.db import DatabaseError, transaction
+
+
+logger = logging.getLogger('users.queries')
+
+
+class NPlusOneDetected(Exception):
+    """Raised (when QUERY_INSPECTION['RAISE'] is set) for repeated query shapes."""
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+
+
+def query_shape(sql: str) -> str:
+    """
+    Normalize SQL so queries differing only in values compare equal:
+    literals (Django inlines LIMIT/OFFSET) become %s and IN lists collapse.
+    """
+    return _IN_LISTS.sub('(%s...)', _LITERALS.sub('%s', sql))
+
+
+class QueryLog:
+    """Queries executed during one request, grouped by shape."""
+
+    def __init__(self, slow_ms: float, explain: bool):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.shapes = Counter()
+        self.examples = {}
+        self.slow = []
+        self.explaining = False
+
+    def record(self, sql: str, params, seconds: float, connection) -> None:
+        shape = query_shape(sql)
+        self.shapes[shape] += 1
+        self.examples.setdefault(shape, (sql, params))
+
+        if self.slow_ms is not None and seconds * 1000 >= self.slow_ms:
+            plan = self.explain_plan(sql, params, connection) if self.explain else None
+            self.slow.append({'sql': sql, 'params': params, 'ms': round(seconds * 1000, 2), 'plan': plan})
+
+    def explain_plan(self, sql: str, params, connection):
+        # Only reads are safe to EXPLAIN without side effects
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return None
+        self.explaining = True
+        try:
+            # Savepoint, so a failed EXPLAIN never poisons the request's transaction
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+        except DatabaseError:
+            return None
+        finally:
+            self.explaining = False
+
+    def repeated(self, threshold: int) -> list:
+        """(shape, count, example) for shapes run at least threshold times."""
+        return [
+            (shape, count, self.examples[shape])
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+_current = ContextVar('users_query_log', default=None)
+
+
+def start_query_log(slow_ms: float, explain: bool) -> tuple:
+    log = QueryLog(slow_ms, explain)
+    return log, _current.set(log)
+
+
+def end_query_log(token) -> None:
+    _current.reset(token)
+
+
+def inspect_execute(execute, sql, params, many, context):
+    """connection.execute_wrapper hook feeding the current request's QueryLog."""
+    log = _current.get()
+    if log is None or log.explaining:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    log.record(sql, params, time.perf_counter() - start, context['connection'])
+    return result
+
+
+def report(log: QueryLog, request, n_plus_one_threshold: int, raise_on_repeat: bool) -> None:
+    """Log slow queries and repeated shapes; optionally raise for the latter."""
+    for query in log.slow:
+        logger.warning(
+            'Slow query (%.2f ms) in %s %s: %s\nparams: %r\nplan:\n%s',
+            query['ms'], request.method, request.path, query['sql'], query['params'],
+            query['plan'] or '(not explained)'
+        )
+
+    repeated = log.repeated(n_plus_one_threshold)
+    for shape, count, (sql, params) in repeated:
+        logger.warning(
+            'Possible N+1 in %s %s: %d queries with the same shape: %s\nexample params: %r',
+            request.method, request.path, count, shape, params
+        )
+    if repeated and raise_on_repeat:
+        shape, count, _ = repeated[0]
+        raise NPlusOneDetected(
+            f'{request.method} {request.path} ran {count} queries of shape: {shape}'
+        )
@@ -0,0 +1,104 @@
+import csv
+import json
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework import serializers
+
+from .models import CustomUser
+from .serializers import UserListSerializer
+
+
+EXPORT_FIELDS = UserListSerializer.Meta.fields
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+# Same representation UserListSerializer gives last_login
+_datetime_field = serializers.DateTimeField()
+
+
+def _keyset_rows(queryset, fields: list, chunk_size: int):
+    """
+    Fetch in (date_joined, id) keyset chunks.
+    Used when server-side cursors are disabled (PgBouncer transaction mode),
+    where iterator() would buffer the whole result set client-side.
+    """
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            joined, pk = last
+            chunk = chunk.filter(Q(date_joined__lt=joined) | Q(date_joined=joined, id__lt=pk))
+        rows = list(chunk.values_list(*fields, 'date_joined', 'id')[:chunk_size])
+        if not rows:
+            return
+        for row in rows:
+            yield row[:-2]
+        last = rows[-1][-2:]
+
+
+def iter_user_rows(chunk_size: int = DEFAULT_CHUNK_SIZE, fields: list = EXPORT_FIELDS, using=None):
+    """
+    Yield export rows as tuples without materializing model instances.
+    Streams from a server-side cursor, so memory is bounded by chunk_size.
+    """
+    queryset = CustomUser.objects.using(using).order_by('-date_joined', '-id')
+    if connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from _keyset_rows(queryset, fields, chunk_size)
+        return
+    yield from queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def _to_export_value(field: str, value):
+    if value is None:
+        return None
+    if field == 'id':
+        return str(value)
+    if field == 'last_login':
+        return _datetime_field.to_representation(value)
+    return value
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_export(file_format: str, chunk_size: int = DEFAULT_CHUNK_SIZE, using=None):
+    """
+    Yield the export as text chunks: the header first, then the first row on
+    its own and chunks doubling up to chunk_size rows, so bytes go out as
+    soon as the query returns a row.
+    using pins the database alias, since the body is produced after the view
+    (and its read routing) has returned.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported format {file_format!r}, expected csv or jsonl')
+
+    fields = EXPORT_FIELDS
+    writer = csv.writer(_Echo())
+
+    def encode(row) -> str:
+        values = [_to_export_value(field, value) for field, value in zip(fields, row)]
+        if file_format == 'csv':
+            return writer.writerow(['' if value is None else value for value in values])
+        return json.dumps(dict(zip(fields, values))) + '\n'
+
+    if file_format == 'csv':
+        yield writer.writerow(fields)
+
+    buffer = []
+    flush_at = 1
+    for row in iter_user_rows(chunk_size, using=using):
+        buffer.append(encode(row))
+        if len(buffer) >= flush_at:
+            yield ''.join(buffer)
+            buffer = []
+            flush_at = min(flush_at * 2, chunk_size)
+    if buffer:
+        yield ''.join(buffer)
@@ -0,0 +1,151 @@
+import io
+import math
+import random
+import re
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast, Length, Substr
+from django.utils import timezone
+
+from .models import CustomUser
+from .stats import user_stats
+
+
+DEFAULT_PASSWORD = 'BenchmarkPass123'
+
+FIRST_NAMES = ['Alice', 'Bob', 'Carol', 'David', 'Eve', 'Frank', 'Grace', 'Heidi', 'Ivan', 'Judy']
+LAST_NAMES = ['Smith', 'Jones', 'Taylor', 'Brown', 'Wilson', 'Evans', 'Thomas', 'Roberts']
+
+# Share of accounts that are admins, banned, or have logged in at least once
+ADMIN_RATE = 0.001
+BANNED_RATE = 0.03
+LOGGED_IN_RATE = 0.75
+
+
+def factory_email(number: int, domain: str = 'example.com') -> str:
+    # Lowercase like next_factory_number's scan, so reseeds see these rows
+    return f'user{number}@{domain.lower()}'
+
+
+def next_factory_number(domain: str = 'example.com', using: str = 'default') -> int:
+    """
+    One past the highest factory_email number already taken on domain, so
+    a new seed never collides with earlier ones, even after deletes.
+    """
+    suffix = f'@{domain.lower()}'
+    prefix = 'user'
+    highest = CustomUser.objects.using(using).filter(
+        email__regex=rf'^{prefix}[0-9]+{re.escape(suffix)}$'
+    ).aggregate(highest=Max(Cast(
+        Substr('email', len(prefix) + 1, Length('email') - len(prefix) - len(suffix)),
+        IntegerField()
+    )))['highest']
+    return 0 if highest is None else highest + 1
+
+
+def build_users(start: int, count: int, password_hash: str, rng: random.Random = None,
+                now=None, days: int = 3 * 365, domain: str = 'example.com') -> list:
+    """
+    Unsaved users numbered start..start+count-1 with realistic distributions:
+    signups skew towards recent dates over the last `days` (a growing
+    product), last_login falls between signup and now skewed towards now,
+    and a small share are admins or banned.
+    """
+    rng = rng or random.Random(start)
+    now = now or timezone.now()
+    span = days * 86400
+    users = []
+    for number in range(start, start + count):
+        # Density of age falls off linearly, so recent signups dominate
+        joined = now - timezone.timedelta(seconds=span * (1 - math.sqrt(rng.random())))
+        last_login = None
+        if rng.random() < LOGGED_IN_RATE:
+            last_login = joined + (now - joined) * (rng.random() ** 0.3)
+        users.append(CustomUser(
+            email=factory_email(number, domain),
+            full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}',
+            password=password_hash,
+            role='admin' if rng.random() < ADMIN_RATE else 'user',
+            is_active=rng.random() >= BANNED_RATE,
+            date_joined=joined,
+            last_login=last_login,
+        ))
+    return users
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def copy_users(users: list, using: str = 'default') -> None:
+    """
+    Insert users with PostgreSQL COPY FROM STDIN (text format).
+    Supports both psycopg2 (copy_expert) and psycopg 3 (cursor.copy).
+    """
+    fields = CustomUser._meta.concrete_fields
+    buffer = io.StringIO()
+    for user in users:
+        buffer.write('\t'.join(_copy_value(getattr(user, f.attname)) for f in fields))
+        buffer.write('\n')
+
+    connection = connections[using]
+    columns = ', '.join(connection.ops.quote_name(f.column) for f in fields)
+    sql = f'COPY {connection.ops.quote_name(CustomUser._meta.db_table)} ({columns}) FROM STDIN'
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy_expert'):
+            buffer.seek(0)
+            raw.copy_expert(sql, buffer)
+        else:
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def insert_users(users: list, method: str = 'bulk', using: str = 'default') -> None:
+    with transaction.atomic(using=using):
+        if method == 'copy':
+            copy_users(users, using)
+        else:
+            CustomUser.objects.using(using).bulk_create(users, batch_size=5000)
+        # Neither path sends post_save
+        user_stats.record_created(users, using)
+
+
+def create_users(count: int, start: int = 0, batch_size: int = 5000,
+                 password: str = DEFAULT_PASSWORD, password_hash: str = None,
+                 method: str = 'bulk', using: str = 'default', **options) -> int:
+    """
+    Insert count users in batches with one shared, precomputed password hash.
+    Hashing once instead of per row makes seeding millions of rows practical.
+    """
+    password_hash = password_hash or make_password(password)
+    rng = random.Random(start)
+    now = timezone.now()
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        users = build_users(start + offset, size, password_hash, rng, now, **options)
+        insert_users(users, method, using)
+    return count
+
+
+def seed_chunk(task: tuple) -> int:
+    """Process-pool entry point: insert one (start, count, ...) slice."""
+    start, count, batch_size, password_hash, method, options = task
+    try:
+        return create_users(
+            count, start, batch_size, password_hash=password_hash, method=method, **options
+        )
+    finally:
+        # Each worker process owns its connection
+        connections.close_all()
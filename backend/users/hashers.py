@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+def _cost(name: str, default: int) -> int:
+    """Read a cost parameter from PASSWORD_HASHING, falling back to Django's default."""
+    return settings.PASSWORD_HASHING.get(name) or default
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with iterations taken from settings.
+    Keeps the pbkdf2_sha256 algorithm name, so existing hashes verify as-is
+    and get re-encoded on the next login when the iteration count changes.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return _cost('PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with time/memory/parallelism taken from settings (needs argon2-cffi)."""
+
+    @property
+    def time_cost(self) -> int:
+        return _cost('ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self) -> int:
+        return _cost('ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self) -> int:
+        return _cost('ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt with its work factor (N) taken from settings."""
+
+    @property
+    def work_factor(self) -> int:
+        return _cost('SCRYPT_WORK_FACTOR', ScryptPasswordHasher.work_factor)
+
+
+# PASSWORD_HASHER setting value -> Django base hasher (used for benchmarking)
+HASHER_BASES = {
+    'pbkdf2': PBKDF2PasswordHasher,
+    'argon2': Argon2PasswordHasher,
+    'scrypt': ScryptPasswordHasher,
+}
@@ -0,0 +1,167 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .instrumentation import timed
+
+
+class HashingPoolSaturated(APIException):
+    """Raised instead of queueing a hash when the pool is full."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server is busy, please retry shortly.'
+    default_code = 'hashing_pool_saturated'
+    # DRF's exception handler turns `wait` into a Retry-After header
+    wait = 1
+
+
+def _init_process_worker():
+    # Spawned workers need settings loaded before make_password/verify_password
+    import django
+    django.setup()
+
+
+class HashingPool:
+    """
+    Bounded executor for password hashing and verification.
+
+    At most WORKERS hashes run at once and MAX_QUEUE more may wait; anything
+    beyond that fails fast with HashingPoolSaturated (503) so a login storm
+    cannot tie up every request thread. hashlib/scrypt/argon2 release the GIL,
+    so the thread executor scales across cores; the process executor isolates
+    hashing from the web workers entirely.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self.configure()
+
+    def configure(self) -> None:
+        config = settings.PASSWORD_HASHING_POOL
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.enabled = config['ENABLED']
+            self.executor_type = config['EXECUTOR']
+            self.workers = config['WORKERS']
+            self.max_queue = config['MAX_QUEUE']
+            self.timeout = config['TIMEOUT']
+            self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+            self.in_flight = 0
+            self.completed = 0
+            self.rejected = 0
+            self.timed_out = 0
+            self.wait_seconds_total = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.executor_type == 'process':
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, initializer=_init_process_worker
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='hashing'
+                    )
+            return self._executor
+
+    def _reject(self) -> HashingPoolSaturated:
+        with self._lock:
+            self.rejected += 1
+        return HashingPoolSaturated()
+
+    def _submit(self, fn, *args):
+        """
+        Take a slot and submit fn(*args). The slot is held until the work
+        itself finishes or is cancelled, not until the caller stops waiting,
+        so abandoned hashes still count against the bound.
+        """
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise self._reject()
+        with self._lock:
+            self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(slots, submitted, None)
+            raise
+        future.add_done_callback(functools.partial(self._release, slots, submitted))
+        return future
+
+    def _release(self, slots, submitted: float, future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.wait_seconds_total += time.perf_counter() - submitted
+            if future is not None and not future.cancelled() and not getattr(future, 'timed_out', False):
+                self.completed += 1
+        slots.release()
+
+    def _time_out(self, future) -> HashingPoolSaturated:
+        # Drop the work if it is still queued; a running hash keeps its slot
+        future.timed_out = True
+        future.cancel()
+        with self._lock:
+            self.timed_out += 1
+        return HashingPoolSaturated()
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for the result, or reject immediately."""
+        future = self._submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise self._time_out(future)
+
+    async def arun(self, fn, *args):
+        """
+        Await fn(*args) off the event loop.
+        Uses the bounded pool when enabled, the loop's default executor otherwise.
+        """
+        with timed('hash'):
+            if not self.enabled:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, functools.partial(fn, *args))
+
+            future = self._submit(fn, *args)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            except asyncio.TimeoutError:
+                raise self._time_out(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                # Submissions beyond the worker count are waiting for a thread/process
+                'queue_depth': max(0, self.in_flight - self.workers),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'wait_seconds_total': self.wait_seconds_total,
+            }
+
+
+hashing_pool = HashingPool()
+
+
+@receiver(setting_changed)
+def reset_hashing_pool(*, setting, **kwargs):
+    if setting == 'PASSWORD_HASHING_POOL':
+        hashing_pool.configure()
@@ -0,0 +1,184 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# =============================================================================
+# PER-REQUEST COLLECTION
+# =============================================================================
+
+class RequestMetrics:
+    """Time spent in each layer of one request."""
+
+    __slots__ = ('started', 'db_queries', 'db_seconds', 'hash_seconds',
+                 'serializer_seconds', '_active')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self._active = set()
+
+    @property
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+
+# Propagates into sync_to_async threads, so async views are measured too
+_current = ContextVar('users_request_metrics', default=None)
+
+
+def start_request() -> tuple:
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def timed(kind: str):
+    """
+    Add the block's duration to <kind>_seconds of the current request.
+    No-op outside an instrumented request; nested blocks of the same kind
+    (a serializer rendering a nested serializer) are counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or kind in metrics._active:
+        yield
+        return
+
+    metrics._active.add(kind)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics._active.discard(kind)
+        setattr(metrics, f'{kind}_seconds', getattr(metrics, f'{kind}_seconds') + elapsed)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper hook counting queries and their duration."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_seconds += time.perf_counter() - start
+        metrics.db_queries += 1
+
+
+class TimedSerializerMixin:
+    """
+    Attributes a response serializer's rendering time to the request.
+    Meant for the output serializers of hot views only; input validation
+    mostly waits on queries and hashing, which have their own metrics.
+    """
+
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
+
+
+# =============================================================================
+# AGGREGATION
+# =============================================================================
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HISTOGRAMS = {
+    # name: (help, buckets, RequestMetrics attribute)
+    'users_request_duration_seconds': ('Wall time per request', LATENCY_BUCKETS, 'total_seconds'),
+    'users_request_db_seconds': ('Database time per request', LATENCY_BUCKETS, 'db_seconds'),
+    'users_request_db_queries': ('Database queries per request', QUERY_BUCKETS, 'db_queries'),
+    'users_request_hash_seconds': ('Password hashing time per request', LATENCY_BUCKETS, 'hash_seconds'),
+    'users_request_serializer_seconds': ('Serializer time per request', LATENCY_BUCKETS, 'serializer_seconds'),
+}
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram (non-cumulative counts internally)."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Per-process histograms keyed by view name.
+    Each gunicorn worker keeps its own; the scraper sums across workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, view: str, metrics: RequestMetrics, total_seconds: float) -> None:
+        with self._lock:
+            for name, (_, buckets, attr) in HISTOGRAMS.items():
+                key = (name, view)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(buckets)
+                value = total_seconds if attr == 'total_seconds' else getattr(metrics, attr)
+                histogram.observe(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> list:
+        """Prometheus text exposition lines for every histogram."""
+        with self._lock:
+            snapshot = {
+                key: (list(h.counts), h.sum, h.count, h.buckets)
+                for key, h in self._histograms.items()
+            }
+
+        lines = []
+        for name, (help_text, _, _) in HISTOGRAMS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, view), (counts, total, count, buckets) in sorted(snapshot.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{view="{view}",le="+Inf"}} {count}')
+                lines.append(f'{name}_sum{{view="{view}"}} {total}')
+                lines.append(f'{name}_count{{view="{view}"}} {count}')
+        return lines
+
+
+registry = MetricsRegistry()
+
+
+def render_gauges(name: str, help_text: str, values: dict, metric_type: str = 'gauge') -> list:
+    """Exposition lines for a family of unlabeled-by-view values."""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+    for labels, value in values.items():
+        label = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}{label} {float(value)}')
+    return lines
@@ -0,0 +1,145 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import CustomUser
+from .versions import resource_versions
+
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Coalesces last_login writes per user and flushes them in bulk.
+
+    Repeated logins by the same account collapse into one pending timestamp,
+    and a flush writes every pending user with a single bulk_update (one
+    UPDATE ... CASE WHEN statement per BATCH_SIZE users). A flush happens when
+    BATCH_SIZE users are pending or the oldest pending value is MAX_STALENESS
+    seconds old. Flushes run on a background timer thread, never on the login
+    request (so record() is safe to call from the event loop), and values
+    from a failed flush are kept for the next one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._oldest = None
+        self._timer = None
+        self._timer_due = False
+        self.flushes = 0
+        self.rows_written = 0
+        self.logins_recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.LAST_LOGIN_BUFFER['ENABLED']
+
+    def record(self, user_id, timestamp) -> None:
+        config = settings.LAST_LOGIN_BUFFER
+        with self._lock:
+            self.logins_recorded += 1
+            current = self._pending.get(user_id)
+            if current is None or timestamp > current:
+                self._pending[user_id] = timestamp
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = (
+                len(self._pending) >= config['BATCH_SIZE']
+                or time.monotonic() - self._oldest >= config['MAX_STALENESS']
+            )
+            if due:
+                self._schedule_now()
+            else:
+                self._schedule(config['MAX_STALENESS'])
+
+    def _schedule(self, delay: float) -> None:
+        # Caller holds the lock
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _schedule_now(self) -> None:
+        # Caller holds the lock; replaces a pending staleness timer once
+        if self._timer_due:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._timer_due = True
+        self._schedule(0)
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Failed to flush buffered last_login values')
+        finally:
+            # The timer thread owns its own DB connection
+            close_old_connections()
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            oldest, self._oldest = self._oldest, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._timer_due = False
+
+        if not pending:
+            return 0
+
+        users = [CustomUser(pk=user_id, last_login=ts) for user_id, ts in pending.items()]
+        try:
+            CustomUser.objects.bulk_update(
+                users, ['last_login'], batch_size=settings.LAST_LOGIN_BUFFER['BATCH_SIZE']
+            )
+        except Exception:
+            self._restore(pending, oldest)
+            raise
+        # bulk_update skips post_save; the admin list shows last_login
+        resource_versions.touch(pending)
+
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += len(users)
+        return len(users)
+
+    def _restore(self, pending: dict, oldest) -> None:
+        """Merge values from a failed flush back, keeping the newer timestamps."""
+        with self._lock:
+            for user_id, timestamp in pending.items():
+                current = self._pending.get(user_id)
+                if current is None or timestamp > current:
+                    self._pending[user_id] = timestamp
+            if oldest is not None and (self._oldest is None or oldest < self._oldest):
+                self._oldest = oldest
+            self._schedule(settings.LAST_LOGIN_BUFFER['MAX_STALENESS'])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'flushes': self.flushes,
+                'rows_written': self.rows_written,
+                'logins_recorded': self.logins_recorded,
+            }
+
+
+last_login_buffer = LastLoginBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    # Don't lose buffered values on a graceful worker shutdown
+    try:
+        last_login_buffer.flush()
+    except Exception:
+        logger.exception('Failed to flush buffered last_login values at exit')
@@ -0,0 +1,111 @@
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from users.benchmarks import SCENARIOS, BenchmarkRunner, compare
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """
+    Latency and query-count benchmark for every route in users/urls.py.
+    Runs in a throwaway test database, seeded up to each --sizes value in
+    turn. Save a run with --output and check later runs against it with
+    --baseline; any regression beyond the thresholds fails the command.
+    """
+    help = 'Benchmark API endpoints at several table sizes and detect regressions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,100000,1000000',
+                            help='Comma-separated user table sizes')
+        parser.add_argument('--requests', type=int, default=20, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per scenario')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Only run scenarios whose name contains this (repeatable)')
+        parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+        parser.add_argument('--latency-threshold', type=float, default=0.25,
+                            help='Allowed p95 growth as a fraction (default 0.25)')
+        parser.add_argument('--query-threshold', type=int, default=0,
+                            help='Allowed extra queries per request (default 0)')
+        parser.add_argument('--fast-hashing', action='store_true',
+                            help='Use cheap PBKDF2 so hashing does not dominate auth timings')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers')
+        if min(sizes) < 1 or options['requests'] < 1:
+            raise CommandError('--sizes and --requests must be positive')
+
+        scenarios = SCENARIOS
+        if options['scenarios']:
+            scenarios = [s for s in SCENARIOS if any(f in s.name for f in options['scenarios'])]
+            if not scenarios:
+                raise CommandError('No scenario matches --scenario')
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as handle:
+                baseline = json.load(handle)['results']
+
+        # Every benchmark request comes from one IP and a handful of accounts
+        overrides = {'AUTH_THROTTLE': {**settings.AUTH_THROTTLE, 'ENABLED': False}}
+        if options['fast_hashing']:
+            overrides['PASSWORD_HASHING'] = {'PBKDF2_ITERATIONS': 1000}
+        runner = BenchmarkRunner(
+            sizes, options['requests'], options['warmup'], scenarios, stdout=self.stdout
+        )
+        with override_settings(**overrides):
+            # Same isolation as the test runner: testserver host, throwaway DB
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                results = runner.run()
+            finally:
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        report = {
+            'meta': {
+                'commit': current_commit(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'requests': options['requests'],
+                'fast_hashing': options['fast_hashing'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        failed = [
+            f'{name} @ {size}: {row["errors"]} failed requests'
+            for size, rows in results.items() for name, row in rows.items() if row['errors']
+        ]
+        if baseline is not None:
+            failed += compare(
+                results, baseline, options['latency_threshold'], options['query_threshold']
+            )
+        if failed:
+            raise CommandError('Benchmark regressions:\n  ' + '\n  '.join(failed))
+        self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,102 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers_by_algorithm
+from django.core.management.base import BaseCommand, CommandError
+
+from users.benchmarks import percentile
+from users.hashers import HASHER_BASES
+
+
+class Command(BaseCommand):
+    """
+    Benchmark password hashers to size gunicorn workers.
+    Each config is "<hasher>[:param=value,...]", e.g. pbkdf2:iterations=600000
+    or argon2:time_cost=2,memory_cost=65536. Without configs, every hasher is
+    measured with the cost settings currently in effect.
+    """
+    help = 'Report hashes/sec and login (verify) latency per hasher configuration'
+
+    def add_arguments(self, parser):
+        parser.add_argument('configs', nargs='*', help='Hasher configs to compare')
+        parser.add_argument('--rounds', type=int, default=20, help='Hashes per config')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        configs = options['configs'] or list(HASHER_BASES)
+        rounds = options['rounds']
+        if rounds < 1:
+            raise CommandError('--rounds must be at least 1')
+
+        results = [self.benchmark(config, rounds) for config in configs]
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'config':<40} {'hashes/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'logins/s/core':>14}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['config']:<40} {row['hashes_per_sec']:>10.1f} "
+                f"{row['login_p50_ms']:>9.1f} {row['login_p99_ms']:>9.1f} "
+                f"{row['logins_per_sec_per_core']:>14.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Preferred hasher: {settings.PASSWORD_HASHER}. '
+            'Each sync worker serves at most logins/s/core while hashing.'
+        ))
+
+    def build_hasher(self, config: str):
+        name, _, params = config.partition(':')
+        if name not in HASHER_BASES:
+            raise CommandError(f'Unknown hasher {name!r}, expected one of {sorted(HASHER_BASES)}')
+
+        # Start from the configured (tunable) costs, then apply overrides
+        current = next(
+            hasher for hasher in get_hashers_by_algorithm().values()
+            if isinstance(hasher, HASHER_BASES[name])
+        )
+        base = HASHER_BASES[name]
+        attrs = {
+            attr: getattr(current, attr)
+            for attr in ('iterations', 'time_cost', 'memory_cost', 'parallelism', 'work_factor')
+            if hasattr(base, attr)
+        }
+        for pair in filter(None, params.split(',')):
+            key, _, value = pair.partition('=')
+            if key not in attrs:
+                raise CommandError(f'{name} has no cost parameter {key!r}')
+            attrs[key] = int(value)
+
+        label = name + ':' + ','.join(f'{key}={value}' for key, value in attrs.items())
+        return label, type(f'Benchmark{base.__name__}', (base,), attrs)()
+
+    def benchmark(self, config: str, rounds: int) -> dict:
+        label, hasher = self.build_hasher(config)
+        password = 'BenchmarkPass123'
+
+        try:
+            start = time.perf_counter()
+            encoded = [hasher.encode(password, hasher.salt()) for _ in range(rounds)]
+            hash_seconds = time.perf_counter() - start
+        except ValueError as exc:
+            # Missing optional library (argon2-cffi) surfaces as ValueError
+            raise CommandError(f'{label}: {exc}')
+
+        latencies = []
+        for value in encoded:
+            start = time.perf_counter()
+            hasher.verify(password, value)
+            latencies.append(time.perf_counter() - start)
+
+        return {
+            'config': label,
+            'hashes_per_sec': rounds / hash_seconds,
+            'login_p50_ms': statistics.median(latencies) * 1000,
+            'login_p99_ms': percentile(latencies, 99) * 1000,
+            'logins_per_sec_per_core': 1 / statistics.median(latencies),
+        }
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from users.stats import user_stats
+
+
+class Command(BaseCommand):
+    """
+    Recompute the dashboard rollups (UserCounter, UserSignupDay) from the
+    user table. Writes keep them current incrementally; run this after
+    manual SQL changes, or periodically (e.g. nightly cron) as a reconciler.
+    """
+    help = 'Rebuild user statistics rollups and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to rebuild')
+
+    def handle(self, *args, **options):
+        drift = user_stats.rebuild(options['database'])
+        for name, (stored, actual) in drift.items():
+            self.stdout.write(self.style.WARNING(f'{name}: {stored} -> {actual}'))
+        self.stdout.write(self.style.SUCCESS(
+            'Rebuilt user stats' + (f' ({len(drift)} counter(s) had drifted)' if drift else ' (no drift)')
+        ))
@@ -0,0 +1,86 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from users.factories import DEFAULT_PASSWORD, create_users, next_factory_number, seed_chunk
+from users.hashing import _init_process_worker
+from users.models import CustomUser
+from users.pagination import clear_cached_count
+from users.versions import resource_versions
+
+
+class Command(BaseCommand):
+    """
+    Generate synthetic users for load testing.
+    Every row shares one precomputed password hash. On PostgreSQL, slices of
+    the range are written with COPY by one process per core; SQLite allows a
+    single writer, so rows are bulk_created in-process there.
+    """
+    help = 'Seed the users table with realistic synthetic accounts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help='Number of users to create')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Writer processes (PostgreSQL only)')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per transaction')
+        parser.add_argument('--method', choices=['auto', 'copy', 'bulk'], default='auto',
+                            help='COPY on PostgreSQL, bulk_create elsewhere (default: auto)')
+        parser.add_argument('--start', type=int, help='First user number (default: after the highest seeded one)')
+        parser.add_argument('--domain', default='example.com', help='Email domain for seeded users')
+        parser.add_argument('--days', type=int, default=3 * 365, help='Spread date_joined over this many days')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password shared by every seeded user')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        batch_size = options['batch_size']
+        if count < 1 or batch_size < 1 or options['workers'] < 1:
+            raise CommandError('count, --batch-size and --workers must be positive')
+
+        connection = connections['default']
+        is_postgres = connection.vendor == 'postgresql'
+        method = options['method']
+        if method == 'auto':
+            method = 'copy' if is_postgres else 'bulk'
+        if method == 'copy' and not is_postgres:
+            raise CommandError('--method copy requires PostgreSQL')
+        workers = options['workers'] if is_postgres else 1
+
+        start = options['start']
+        if start is None:
+            start = next_factory_number(options['domain'])
+        password_hash = make_password(options['password'])
+        build_options = {'days': options['days'], 'domain': options['domain']}
+
+        started = time.perf_counter()
+        if workers == 1:
+            create_users(count, start, batch_size, password_hash=password_hash,
+                         method=method, **build_options)
+        else:
+            # One slice per batch; forked workers must not share the parent's socket
+            connections.close_all()
+            tasks = [
+                (start + offset, min(batch_size, count - offset), batch_size,
+                 password_hash, method, build_options)
+                for offset in range(0, count, batch_size)
+            ]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_process_worker) as pool:
+                for _ in pool.map(seed_chunk, tasks):
+                    pass
+        elapsed = time.perf_counter() - started
+
+        if is_postgres:
+            # Refresh reltuples so estimated counts see the new rows
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(CustomUser._meta.db_table)}')
+        for alias in connections:  # replicas memoize their own count
+            clear_cached_count(alias)
+        resource_versions.touch()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {count} users ({method}, {workers} worker(s)) in {elapsed:.2f}s '
+            f'({count / elapsed:,.0f} rows/sec)'
+        ))
@@ -0,0 +1,200 @@
+import json
+import logging
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .diagnostics import end_query_log, inspect_execute, report, start_query_log
+from .instrumentation import db_execute_wrapper, end_request, registry, start_request
+from .routers import end_write_tracking, primary_pins, replica_configured, start_write_tracking
+
+
+logger = logging.getLogger('users.performance')
+
+
+class PerformanceMiddleware:
+    """
+    Per-request timing: wall time, DB queries and DB time (execute_wrapper),
+    password hashing and serializer time.
+
+    Results go out as a Server-Timing header, an optional structured log
+    line and per-view histograms served by the admin metrics endpoint.
+    Disabled entirely (MiddlewareNotUsed) unless PERFORMANCE_INSTRUMENTATION
+    is enabled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = settings.PERFORMANCE_INSTRUMENTATION
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.server_timing = config['SERVER_TIMING']
+        self.log_threshold = config['LOG_THRESHOLD_MS']
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics, token = start_request()
+        try:
+            with self.wrap_connections():
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+        try:
+            with self.wrap_connections():
+                response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, metrics)
+
+    def wrap_connections(self) -> ExitStack:
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(db_execute_wrapper))
+        return stack
+
+    def finish(self, request, response, metrics):
+        total = metrics.total_seconds
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unmatched'
+        registry.observe(view, metrics, total)
+
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics.db_seconds * 1000:.2f};desc="{metrics.db_queries} queries"',
+                f'hash;dur={metrics.hash_seconds * 1000:.2f}',
+                f'serializer;dur={metrics.serializer_seconds * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+            ])
+
+        if self.log_threshold is not None and total * 1000 >= self.log_threshold:
+            logger.info(json.dumps({
+                'event': 'request',
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'db_ms': round(metrics.db_seconds * 1000, 2),
+                'db_queries': metrics.db_queries,
+                'hash_ms': round(metrics.hash_seconds * 1000, 2),
+                'serializer_ms': round(metrics.serializer_seconds * 1000, 2),
+            }))
+        return response
+
+
+class QueryInspectionMiddleware:
+    """
+    Development/staging query checks for views of the users app: flags
+    query shapes repeated within one request (N+1) and logs queries slower
+    than SLOW_QUERY_MS with their EXPLAIN plan. With RAISE set, repeated
+    shapes raise NPlusOneDetected instead, failing the test that hit them.
+    Disabled entirely (MiddlewareNotUsed) unless QUERY_INSPECTION is enabled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = settings.QUERY_INSPECTION
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.threshold = config['N_PLUS_ONE_THRESHOLD']
+        self.slow_ms = config['SLOW_QUERY_MS']
+        self.explain = config['EXPLAIN']
+        self.raise_on_repeat = config['RAISE']
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        log, token = start_query_log(self.slow_ms, self.explain)
+        try:
+            with self.wrap_connections():
+                response = self.get_response(request)
+        finally:
+            end_query_log(token)
+        return self.finish(request, response, log)
+
+    async def __acall__(self, request):
+        log, token = start_query_log(self.slow_ms, self.explain)
+        try:
+            with self.wrap_connections():
+                response = await self.get_response(request)
+        finally:
+            end_query_log(token)
+        return self.finish(request, response, log)
+
+    def wrap_connections(self) -> ExitStack:
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(inspect_execute))
+        return stack
+
+    def finish(self, request, response, log):
+        match = request.resolver_match
+        if match and match.func.__module__.startswith('users.'):
+            report(log, request, self.threshold, self.raise_on_repeat)
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    Sticky primary reads for DATABASE_REPLICA_URL deployments: when a request
+    writes to the database (as seen by ReplicaRouter), its authenticated user
+    is pinned to the primary for DATABASE_REPLICA_STICKY_SECONDS, so the
+    admin views show them their own changes instead of a lagging replica.
+    Disabled entirely (MiddlewareNotUsed) when no replica is configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        writes, token = start_write_tracking()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_write_tracking(token)
+        # DRF copies the authenticated user back onto the Django request
+        user = getattr(request, 'user', None)
+        if writes and user is not None and user.is_authenticated:
+            primary_pins.pin(user.pk)
+        return response
+
+    async def __acall__(self, request):
+        writes, token = start_write_tracking()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_write_tracking(token)
+        user = getattr(request, 'user', None)
+        if writes and user is not None and user.is_authenticated:
+            await primary_pins.apin(user.pk)
+        return response
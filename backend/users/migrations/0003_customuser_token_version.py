@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_list_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="token_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+
+# CONCURRENTLY builds without blocking writes to the table; it cannot run in a
+# transaction, hence Migration.atomic = False. A failed build leaves an INVALID
+# index behind: drop it before re-running the migration.
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # Expressions match what icontains compiles to: UPPER(col::text) LIKE UPPER(%s)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS users_email_trgm_idx ON users_customuser "
+    "USING gin (UPPER(email::text) gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS users_full_name_trgm_idx ON users_customuser "
+    "USING gin (UPPER(full_name::text) gin_trgm_ops)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX CONCURRENTLY IF EXISTS users_email_trgm_idx",
+    "DROP INDEX CONCURRENTLY IF EXISTS users_full_name_trgm_idx",
+]
+
+# Prefix fallback: NOCASE indexes let SQLite serve istartswith (LIKE 'x%')
+SQLITE_PREFIX_FORWARD = [
+    "CREATE INDEX IF NOT EXISTS users_email_nocase_idx ON users_customuser (email COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS users_full_name_nocase_idx ON users_customuser (full_name COLLATE NOCASE)",
+]
+# External-content FTS5 table over the user rows, kept in sync by triggers.
+# The trigram tokenizer (SQLite 3.34+) gives case-insensitive substring matches.
+SQLITE_FTS_FORWARD = [
+    "CREATE VIRTUAL TABLE users_customuser_fts USING fts5("
+    "email, full_name, content='users_customuser', content_rowid='rowid', tokenize='trigram')",
+    "INSERT INTO users_customuser_fts(users_customuser_fts) VALUES ('rebuild')",
+    "CREATE TRIGGER users_customuser_fts_ai AFTER INSERT ON users_customuser BEGIN "
+    "INSERT INTO users_customuser_fts(rowid, email, full_name) "
+    "VALUES (new.rowid, new.email, new.full_name); END",
+    "CREATE TRIGGER users_customuser_fts_ad AFTER DELETE ON users_customuser BEGIN "
+    "INSERT INTO users_customuser_fts(users_customuser_fts, rowid, email, full_name) "
+    "VALUES ('delete', old.rowid, old.email, old.full_name); END",
+    "CREATE TRIGGER users_customuser_fts_au AFTER UPDATE OF email, full_name ON users_customuser BEGIN "
+    "INSERT INTO users_customuser_fts(users_customuser_fts, rowid, email, full_name) "
+    "VALUES ('delete', old.rowid, old.email, old.full_name); "
+    "INSERT INTO users_customuser_fts(rowid, email, full_name) "
+    "VALUES (new.rowid, new.email, new.full_name); END",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS users_customuser_fts_ai",
+    "DROP TRIGGER IF EXISTS users_customuser_fts_ad",
+    "DROP TRIGGER IF EXISTS users_customuser_fts_au",
+    "DROP TABLE IF EXISTS users_customuser_fts",
+    "DROP INDEX IF EXISTS users_email_nocase_idx",
+    "DROP INDEX IF EXISTS users_full_name_nocase_idx",
+]
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """AddIndexConcurrently on PostgreSQL, a plain AddIndex elsewhere."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRES_FORWARD:
+            schema_editor.execute(sql)
+    elif vendor == "sqlite":
+        for sql in SQLITE_PREFIX_FORWARD:
+            schema_editor.execute(sql)
+        try:
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize='trigram')")
+                cursor.execute("DROP TABLE temp.fts5_probe")
+        except OperationalError:
+            # No FTS5/trigram support: search falls back to the prefix indexes
+            return
+        for sql in SQLITE_FTS_FORWARD:
+            schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRES_REVERSE:
+            schema_editor.execute(sql)
+    elif vendor == "sqlite":
+        for sql in SQLITE_REVERSE:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0003_customuser_token_version"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name="customuser",
+            index=models.Index(fields=["last_login"], name="users_last_login_idx"),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
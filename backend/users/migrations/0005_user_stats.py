@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:21
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def backfill_user_stats(apps, schema_editor):
+    # Seed the rollups from existing users; later writes keep them current.
+    # Self-contained on purpose: users.stats may change after this migration.
+    db = schema_editor.connection.alias
+    users = apps.get_model('users', 'CustomUser')._default_manager.using(db)
+    counters = users.aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+        admins=Count('pk', filter=Q(role='admin')),
+    )
+    days = dict(
+        users.order_by().annotate(day=TruncDate('date_joined'))
+        .values_list('day').annotate(count=Count('pk'))
+    )
+    UserCounter = apps.get_model('users', 'UserCounter')
+    UserCounter._default_manager.using(db).bulk_create(
+        UserCounter(name=name, value=value) for name, value in counters.items()
+    )
+    UserSignupDay = apps.get_model('users', 'UserSignupDay')
+    UserSignupDay._default_manager.using(db).bulk_create(
+        UserSignupDay(day=day, value=count) for day, count in days.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounter',
+            fields=[
+                ('name', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserSignupDay',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('value', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
 import uuid
+from django.contrib.auth.hashers import make_password, verify_password
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 
+from .hashing import hashing_pool
+from .instrumentation import timed
+
 
 class CustomUserManager(BaseUserManager):
     """
@@ -75,6 +79,9 @@ class CustomUser(AbstractUser):
     # Soft-delete capability via is_active (inherited, but noted for clarity)
     # is_active = models.BooleanField(default=True)
     
+    # Bumped to revoke outstanding access tokens in stateless JWT mode
+    token_version = models.PositiveIntegerField(default=0)
+    
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['full_name']
     
@@ -84,6 +91,58 @@ class CustomUser(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-date_joined']
+        indexes = [
+            # Composite index backing keyset pagination on the admin user list
+            models.Index(fields=['-date_joined', '-id'], name='users_joined_id_idx'),
+            # Range filter on the admin user list
+            models.Index(fields=['last_login'], name='users_last_login_idx'),
+        ]
     
     def __str__(self) -> str:
         return self.email
+    
+    def set_password(self, raw_password):
+        with timed('hash'):
+            if not hashing_pool.enabled or raw_password is None:
+                return super().set_password(raw_password)
+            
+            # Hash on the bounded pool; raises HashingPoolSaturated (503) when full
+            self.password = hashing_pool.run(make_password, raw_password)
+            self._password = raw_password
+    
+    def check_password(self, raw_password):
+        with timed('hash'):
+            if not hashing_pool.enabled:
+                return super().check_password(raw_password)
+            
+            is_correct, must_update = hashing_pool.run(verify_password, raw_password, self.password)
+        if is_correct and must_update:
+            # Same transparent upgrade Django's check_password setter performs
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        return is_correct
+
+
+class UserCounter(models.Model):
+    """
+    Running user totals for the admin dashboard: one row per counter
+    (total, active, admins), kept current by users.stats on every write
+    path so stats never aggregate the user table.
+    """
+    
+    name = models.CharField(max_length=32, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    
+    def __str__(self) -> str:
+        return f'{self.name}={self.value}'
+
+
+class UserSignupDay(models.Model):
+    """Users who joined on each day (in TIME_ZONE), maintained like UserCounter."""
+    
+    day = models.DateField(primary_key=True)
+    value = models.IntegerField(default=0)
+    
+    def __str__(self) -> str:
+        return f'{self.day}={self.value}'
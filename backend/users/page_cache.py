@@ -0,0 +1,62 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .routers import replica_may_lag
+from .versions import request_stamp, resource_versions
+
+
+class UserListPageCache:
+    """
+    Rendered admin list pages in their own cache alias (LRU-culled locmem,
+    file or Redis; entries expire after TTL).
+
+    Keys embed the users-table version stamp, so every write path that
+    expires it (signals, status UPDATEs, imports, last_login flushes)
+    orphans all cached pages at once; orphans age out through LRU/TTL.
+    Stamps are per process without SHARED_CACHE, and other workers would
+    serve pages from before a write, so pages are cached only with it.
+    Hit/miss counters are per process, like the auth user cache.
+    """
+
+    key_prefix = 'users:list:page:'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def config(self) -> dict:
+        return settings.USER_LIST_PAGE_CACHE
+
+    @property
+    def cache(self):
+        return caches[self.config['ALIAS']]
+
+    def key(self, request):
+        """Cache key for this request, or None when it must not be cached."""
+        if not (self.config['ENABLED'] and settings.SHARED_CACHE):
+            return None
+        if request.accepted_renderer.format != 'json':
+            return None
+        # Absolute URI: page, filters, page size and the host in next/previous links
+        stamp = request_stamp(request, resource_versions.table)
+        if replica_may_lag(stamp):
+            return None
+        variant = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+        return f'{self.key_prefix}{stamp}:{variant}'
+
+    def get(self, key: str):
+        content = self.cache.get(key)
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return content
+
+    def set(self, key: str, content: bytes) -> None:
+        self.cache.set(key, content, self.config['TTL'])
+
+
+user_list_pages = UserListPageCache()
@@ -0,0 +1,251 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+# =============================================================================
+# COUNT STRATEGIES
+# =============================================================================
+
+def _count_key(using: str) -> str:
+    return f'users:list:count:{using}'
+
+
+def cached_exact_count(queryset) -> int:
+    """
+    Exact COUNT(*) memoized in the shared cache.
+    Used where the database keeps no cheap row estimate (SQLite).
+    """
+    return cache.get_or_set(
+        _count_key(queryset.db), queryset.count, settings.USER_LIST_COUNT_CACHE_TTL
+    )
+
+
+def clear_cached_count(using: str = 'default') -> None:
+    """Forget the memoized count after a bulk change to the table."""
+    cache.delete(_count_key(using))
+
+
+def capped_count(queryset, cap: int) -> int:
+    """
+    COUNT(*) over at most cap + 1 rows.
+    A result above cap means "cap+" and lets the scan stop early.
+    """
+    return queryset[:cap + 1].count()
+
+
+def estimated_count(queryset):
+    """
+    Planner row estimate for the unfiltered user table.
+    Returns None when no usable estimate exists.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+
+    # reltuples is -1 for tables that have never been vacuumed/analyzed
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+# =============================================================================
+# PAGINATORS
+# =============================================================================
+
+def get_user_list_page_size(query_params) -> int:
+    """
+    ?page_size=N capped at USER_LIST_MAX_PAGE_SIZE, else USER_LIST_PAGE_SIZE.
+    Bulk tooling can pull large pages without a separate endpoint.
+    """
+    try:
+        page_size = int(query_params['page_size'])
+    except (KeyError, ValueError):
+        return settings.USER_LIST_PAGE_SIZE
+    if page_size < 1:
+        return settings.USER_LIST_PAGE_SIZE
+    return min(page_size, settings.USER_LIST_MAX_PAGE_SIZE)
+
+
+class UserListPageSizeMixin:
+    """Page size from get_user_list_page_size for the admin list paginators."""
+
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request) -> int:
+        return get_user_list_page_size(request.query_params)
+
+
+class LookaheadPage(Page):
+    """Page whose has_next() comes from fetching one extra row, not the count."""
+
+    def __init__(self, object_list, number, paginator, has_next: bool):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+
+class UserCountPaginator(Paginator):
+    """
+    Paginator that avoids a full COUNT(*) on large tables.
+
+    Modes:
+        estimated - pg_class.reltuples on PostgreSQL, cached exact count elsewhere
+        capped    - exact up to USER_LIST_COUNT_CAP, then "cap+"
+        none      - no count at all
+
+    Page existence is decided by fetching page_size + 1 rows, so an
+    inaccurate count never hides or invents pages.
+    """
+
+    def __init__(self, object_list, per_page, count_mode: str, count_cap: int):
+        super().__init__(object_list, per_page)
+        self.count_mode = count_mode
+        self.count_cap = count_cap
+        self.count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+
+        if self.count_mode == 'none':
+            self.count_is_approximate = True
+            return None
+
+        if self.count_mode == 'estimated' and not queryset.query.has_filters():
+            estimate = estimated_count(queryset)
+            if estimate is None:
+                return cached_exact_count(queryset)
+            if estimate >= self.count_cap:
+                self.count_is_approximate = True
+                return estimate
+
+        # Small or filtered tables: count, but never scan past the cap
+        total = capped_count(queryset, self.count_cap)
+        if total > self.count_cap:
+            self.count_is_approximate = True
+            return self.count_cap
+        return total
+
+    def validate_number(self, number) -> int:
+        # Only the lower bound is known without an exact count
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage('That page number is not an integer')
+        if number < 1:
+            raise InvalidPage('That page number is less than 1')
+        return number
+
+    def page(self, number) -> LookaheadPage:
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+
+        if number > 1 and not rows:
+            raise InvalidPage('That page contains no results')
+
+        return LookaheadPage(
+            rows[:self.per_page], number, self, has_next=len(rows) > self.per_page
+        )
+
+
+class UserPageNumberPagination(UserListPageSizeMixin, PageNumberPagination):
+    """
+    Classic ?page=N pagination for the admin user table.
+    Cheap and familiar for small tables, but OFFSET cost grows with page depth.
+    USER_LIST_COUNT switches off the exact COUNT(*) for large tables.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        count_mode = settings.USER_LIST_COUNT
+        if count_mode == 'exact':
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = UserCountPaginator(
+            queryset, page_size, count_mode, settings.USER_LIST_COUNT_CAP
+        )
+        page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        # Numbered page controls need num_pages, which needs an exact count
+        self.display_page_controls = False
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        if not isinstance(paginator, UserCountPaginator):
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_is_approximate', paginator.count_is_approximate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class UserCursorPagination(UserListPageSizeMixin, CursorPagination):
+    """
+    Keyset pagination on date_joined for large user tables.
+    DRF's cursor holds only the first ordering field: each page seeks past
+    the previous date_joined through the (date_joined, id) index, and users
+    sharing that instant are stepped over with the cursor's offset. id only
+    makes the order deterministic, so latency stays flat however deep the
+    client pages.
+    """
+
+    ordering = ('-date_joined', '-id')
+
+
+PAGINATION_MODES = {
+    'page': UserPageNumberPagination,
+    'cursor': UserCursorPagination,
+}
+
+
+def get_user_list_pagination_class(request):
+    """
+    Resolve the paginator for the admin user list.
+    ?pagination=cursor|page overrides the USER_LIST_PAGINATION setting.
+    """
+    default = PAGINATION_MODES.get(settings.USER_LIST_PAGINATION, UserPageNumberPagination)
+    return PAGINATION_MODES.get(request.query_params.get('pagination'), default)
+
+
+@checks.register()
+def check_user_list_pagination(app_configs, **kwargs):
+    if settings.USER_LIST_PAGINATION in PAGINATION_MODES:
+        return []
+    return [checks.Warning(
+        f'USER_LIST_PAGINATION={settings.USER_LIST_PAGINATION!r} is not one of '
+        f'{", ".join(PAGINATION_MODES)}; the admin user list falls back to page.',
+        id='users.W001',
+    )]
@@ -0,0 +1,63 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_pool(using: str = 'default'):
+    """The psycopg ConnectionPool behind an alias, or None when not pooled."""
+    return getattr(connections[using], 'pool', None)
+
+
+def pool_stats(using: str = 'default'):
+    """psycopg_pool counters (sizes, waits, errors) or None when not pooled."""
+    pool = get_pool(using)
+    return pool.get_stats() if pool is not None else None
+
+
+class PoolHealthChecker:
+    """
+    Background pool.check() every DATABASE_POOL_CHECK_INTERVAL seconds.
+
+    Idle pooled connections are verified off the request path, so checkouts
+    need no health-check round trip (CONN_HEALTH_CHECKS stays off).
+    Started lazily from the first pooled connection in each worker process,
+    which keeps it alive across gunicorn's fork.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pids = {}
+
+    def ensure_started(self, using: str) -> None:
+        interval = settings.DATABASE_POOL_CHECK_INTERVAL
+        if not interval or self._pids.get(using) == os.getpid():
+            return
+        with self._lock:
+            if self._pids.get(using) == os.getpid() or get_pool(using) is None:
+                return
+            self._pids[using] = os.getpid()
+        thread = threading.Thread(
+            target=self._run, args=(using, interval), name=f'db-pool-check-{using}', daemon=True
+        )
+        thread.start()
+
+    def _run(self, using: str, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            pool = get_pool(using)
+            if pool is None:
+                return
+            try:
+                pool.check()
+            except Exception:
+                logger.exception('Database pool health check failed for %s', using)
+
+
+pool_health_checker = PoolHealthChecker()
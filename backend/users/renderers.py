@@ -0,0 +1,28 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional; DRF's stdlib encoder is used instead
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+    Output is byte-identical to JSONRenderer (compact, UTF-8, U+2028/U+2029
+    escaped); indented output, non-default JSON settings and anything orjson
+    cannot encode go through the stdlib path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            body = orjson.dumps(data)
+        except TypeError:  # orjson.JSONEncodeError: lazy strings, big ints, ...
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Valid JSON but not valid JavaScript; JSONRenderer escapes them too
+        return body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,156 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+
+REPLICA = 'replica'
+
+# Alias for the current request's read-only queries (None: primary)
+_read_alias = ContextVar('users_read_alias', default=None)
+# Models written during the current request (None outside middleware)
+_request_writes = ContextVar('users_request_writes', default=None)
+
+
+def replica_configured() -> bool:
+    return REPLICA in connections.settings
+
+
+# =============================================================================
+# STICKY PRIMARY
+# =============================================================================
+
+class PrimaryPins:
+    """
+    Users whose reads must stay on the primary, kept in the shared cache.
+
+    A pin lasts DATABASE_REPLICA_STICKY_SECONDS from the user's last write,
+    which should exceed the replica's worst replication lag, so their next
+    reads on any worker see their own changes.
+    """
+
+    key_prefix = 'users:db:primary:'
+
+    def _key(self, user_id) -> str:
+        return f'{self.key_prefix}{user_id}'
+
+    def pin(self, user_id) -> None:
+        cache.set(self._key(user_id), 1, settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+    async def apin(self, user_id) -> None:
+        await cache.aset(self._key(user_id), 1, settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+    def is_pinned(self, user_id) -> bool:
+        return cache.get(self._key(user_id)) is not None
+
+    async def ais_pinned(self, user_id) -> bool:
+        return await cache.aget(self._key(user_id)) is not None
+
+
+primary_pins = PrimaryPins()
+
+
+def read_alias(user) -> str:
+    """Alias for an admin's read-only queries: the replica unless pinned."""
+    if not replica_configured() or primary_pins.is_pinned(user.pk):
+        return 'default'
+    return REPLICA
+
+
+async def aread_alias(user) -> str:
+    if not replica_configured() or await primary_pins.ais_pinned(user.pk):
+        return 'default'
+    return REPLICA
+
+
+@contextmanager
+def reads_from(alias: str):
+    """Route reads without an explicit using() to alias inside the block."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_may_lag(stamp: int) -> bool:
+    """
+    Whether the current reads could predate the write that produced a
+    version stamp (nanoseconds): they go to the replica and the stamp is
+    younger than the sticky window. Such responses must not be cached.
+    """
+    return (
+        _read_alias.get() == REPLICA
+        and time.time_ns() - stamp < settings.DATABASE_REPLICA_STICKY_SECONDS * 1e9
+    )
+
+
+def start_write_tracking():
+    writes = set()
+    return writes, _request_writes.set(writes)
+
+
+def end_write_tracking(token) -> None:
+    _request_writes.reset(token)
+
+
+# =============================================================================
+# ROUTER
+# =============================================================================
+
+class ReplicaRouter:
+    """
+    Primary/replica routing for DATABASE_REPLICA_URL deployments.
+
+    Reads go to the replica only inside reads_from(), which the admin list,
+    count and export views enter; everything else, and every write, uses
+    the primary. Once a request has written, its remaining reads return to
+    the primary too. The replica is never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _request_writes.get():
+            return None
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes.add(model._meta.label)
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes from the primary
+        return False if db == REPLICA else None
+
+
+# =============================================================================
+# DRF VIEWS
+# =============================================================================
+
+class ReplicaReadMixin:
+    """
+    Runs a view's handler with reads routed to the replica, unless the
+    admin is pinned to the primary. Authentication still reads the primary.
+    The chosen alias is kept on self.read_alias for work that outlives the
+    handler, such as streamed responses.
+    """
+
+    read_alias = 'default'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.read_alias = read_alias(request.user)
+        self._read_alias_token = _read_alias.set(self.read_alias)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Not finalize_response(): DRF skips it for unhandled exceptions
+            token = self.__dict__.pop('_read_alias_token', None)
+            if token is not None:
+                _read_alias.reset(token)
@@ -0,0 +1,82 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import CustomUser
+from .serializers import UserListFilterSerializer
+
+
+FTS_TABLE = 'users_customuser_fts'
+
+# Trigram matching (pg_trgm / FTS5 trigram tokenizer) needs 3+ characters
+MIN_TRIGRAM_LENGTH = 3
+
+_fts_available = {}
+
+
+def has_fts_table(alias: str) -> bool:
+    """
+    Whether the SQLite FTS5 shadow table and its sync triggers exist
+    (memoized per database). A table rebuild by a later schema migration drops
+    the triggers; search then degrades to prefix matching instead of going stale.
+    """
+    if alias not in _fts_available:
+        names = [FTS_TABLE] + [f'{FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au')]
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                'SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s)', names
+            )
+            _fts_available[alias] = cursor.fetchone()[0] == len(names)
+    return _fts_available[alias]
+
+
+def prefix_search(term: str) -> Q:
+    # Served by the NOCASE prefix indexes on SQLite
+    return Q(email__istartswith=term) | Q(full_name__istartswith=term)
+
+
+def search_users(queryset, term: str):
+    """
+    Case-insensitive substring search over email and full_name.
+
+    PostgreSQL: icontains compiles to UPPER(col::text) LIKE UPPER('%term%'),
+    which the pg_trgm GIN expression indexes serve without a sequential scan.
+    SQLite: matches go through the FTS5 trigram shadow table; terms shorter
+    than a trigram, or databases without FTS5, fall back to prefix matching.
+    """
+    if connections[queryset.db].vendor == 'sqlite':
+        if len(term) < MIN_TRIGRAM_LENGTH or not has_fts_table(queryset.db):
+            return queryset.filter(prefix_search(term))
+        # Quoted as one FTS5 string so operators in the term are literal
+        phrase = '"' + term.replace('"', '""') + '"'
+        table = CustomUser._meta.db_table
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT id FROM {table} WHERE rowid IN '
+            f'(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+            [phrase]
+        ))
+
+    return queryset.filter(Q(email__icontains=term) | Q(full_name__icontains=term))
+
+
+def filter_users(queryset, params):
+    """
+    Apply ?search=, ?role=, ?is_active= and ?last_login_after/before= to the
+    admin user list. Invalid values raise a 400 ValidationError.
+    """
+    # A plain dict, so an absent is_active stays absent instead of False
+    serializer = UserListFilterSerializer(data=params.dict())
+    serializer.is_valid(raise_exception=True)
+    filters = serializer.validated_data
+
+    if filters.get('search'):
+        queryset = search_users(queryset, filters['search'])
+    if 'role' in filters:
+        queryset = queryset.filter(role=filters['role'])
+    if 'is_active' in filters:
+        queryset = queryset.filter(is_active=filters['is_active'])
+    if 'last_login_after' in filters:
+        queryset = queryset.filter(last_login__gte=filters['last_login_after'])
+    if 'last_login_before' in filters:
+        queryset = queryset.filter(last_login__lt=filters['last_login_before'])
+    return queryset
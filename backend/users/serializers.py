@@ -1,6 +1,9 @@
 import re
+from django.utils.functional import cached_property
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import add_user_claims, resolve_user
+from .instrumentation import TimedSerializerMixin, timed
 from .models import CustomUser
 
 
@@ -35,7 +38,28 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         )
 
 
-class UserResponseSerializer(serializers.ModelSerializer):
+class UserImportRowSerializer(UserRegistrationSerializer):
+    """
+    Registration rules for one bulk-import row.
+    Email uniqueness is checked per batch by the importer instead of a
+    SELECT per row.
+    """
+    
+    class Meta(UserRegistrationSerializer.Meta):
+        extra_kwargs = {'email': {'validators': []}}
+
+
+class LoginCredentialsSerializer(serializers.Serializer):
+    """
+    Login input for the async login view.
+    Mirrors TokenObtainPairSerializer's fields without its sync authenticate().
+    """
+    
+    email = serializers.CharField()
+    password = serializers.CharField(write_only=True, trim_whitespace=False)
+
+
+class UserResponseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for returning user data in responses.
     """
@@ -58,7 +82,7 @@ def get_tokens_for_user(user: CustomUser) -> dict:
     Generate JWT token pair for a user.
     Called after registration for auto-login functionality.
     """
-    refresh = RefreshToken.for_user(user)
+    refresh = add_user_claims(RefreshToken.for_user(user), user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -69,7 +93,7 @@ def get_tokens_for_user(user: CustomUser) -> dict:
 # ADMIN SERIALIZERS
 # =============================================================================
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Optimized serializer for admin user table.
     Includes only fields needed for the dashboard display.
@@ -81,6 +105,46 @@ class UserListSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+_list_datetime = serializers.DateTimeField()
+
+
+def user_list_data(rows) -> list:
+    """
+    UserListSerializer output for values_list rows of its Meta.fields
+    (extra trailing columns are ignored), without per-row field machinery.
+    Must stay in step with UserListSerializer.
+    """
+    to_datetime = _list_datetime.to_representation
+    with timed('serializer'):
+        return [
+            {
+                'id': str(pk),
+                'full_name': full_name,
+                'email': email,
+                'role': role,
+                'is_active': is_active,
+                'last_login': None if last_login is None else to_datetime(last_login),
+            }
+            for pk, full_name, email, role, is_active, last_login, *_ in rows
+        ]
+
+
+class UserListFilterSerializer(serializers.Serializer):
+    """Query parameters accepted by the admin user list."""
+    
+    search = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    role = serializers.ChoiceField(choices=CustomUser.ROLE_CHOICES, required=False)
+    is_active = serializers.BooleanField(required=False)
+    last_login_after = serializers.DateTimeField(required=False)
+    last_login_before = serializers.DateTimeField(required=False)
+
+
+class UserStatsQuerySerializer(serializers.Serializer):
+    """Query parameters accepted by the dashboard statistics endpoint."""
+    
+    days = serializers.IntegerField(min_value=1, default=30)
+
+
 class UserStatusSerializer(serializers.ModelSerializer):
     """
     Minimal serializer for toggling user active status.
@@ -92,7 +156,39 @@ class UserStatusSerializer(serializers.ModelSerializer):
         fields = ['is_active']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class BulkStatusFilterSerializer(serializers.Serializer):
+    """Set-based selection for bulk status changes; all given criteria must match."""
+    
+    email_domain = serializers.CharField(required=False, max_length=255)
+    role = serializers.ChoiceField(choices=CustomUser.ROLE_CHOICES, required=False)
+    joined_before = serializers.DateTimeField(required=False)
+    
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('Provide at least one filter criterion.')
+        return attrs
+
+
+class BulkUserStatusSerializer(serializers.Serializer):
+    """
+    Ban/activate many users at once, selected by explicit IDs or a filter.
+    """
+    
+    MAX_IDS = 10000
+    
+    is_active = serializers.BooleanField()
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False, max_length=MAX_IDS
+    )
+    filter = BulkStatusFilterSerializer(required=False)
+    
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either ids or filter.')
+        return attrs
+
+
+class UserProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for users to view/update their own profile.
     Email changes trigger re-validation requirements in production.
@@ -102,6 +198,18 @@ class UserProfileSerializer(serializers.ModelSerializer):
         model = CustomUser
         fields = ['id', 'email', 'full_name', 'role', 'is_active', 'date_joined']
         read_only_fields = ['id', 'role', 'is_active', 'date_joined']
+    
+    def update(self, instance, validated_data):
+        # Write only the columns that actually changed
+        changed = [
+            field for field, value in validated_data.items()
+            if getattr(instance, field) != value
+        ]
+        for field in changed:
+            setattr(instance, field, validated_data[field])
+        if changed:
+            instance.save(update_fields=changed)
+        return instance
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -113,8 +221,13 @@ class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(write_only=True)
     new_password = serializers.CharField(write_only=True, min_length=8)
     
+    @cached_property
+    def user(self) -> CustomUser:
+        # request.user may be a token-backed ClaimsUser in stateless mode
+        return resolve_user(self.context['request'].user)
+    
     def validate_old_password(self, value: str) -> str:
-        user = self.context['request'].user
+        user = self.user
         if not user.check_password(value):
             raise serializers.ValidationError('Current password is incorrect')
         return value
@@ -127,7 +240,7 @@ class ChangePasswordSerializer(serializers.Serializer):
         return value
     
     def save(self):
-        user = self.context['request'].user
+        user = self.user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         return user
@@ -0,0 +1,94 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .authentication import token_versions, user_cache
+from .models import CustomUser
+from .pooling import pool_health_checker
+from .stats import user_stats
+from .versions import resource_versions
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drop the cached auth row and ETag version whenever a user is written.
+    Covers registration, bans, profile edits and password changes through
+    save(). Queryset .update() bypasses signals and must invalidate explicitly.
+    """
+    user_cache.invalidate(instance.pk)
+    resource_versions.touch([instance.pk])
+
+
+# Fields whose changes move the dashboard counters and void stateless tokens
+STATS_FIELDS = ('role', 'is_active')
+
+
+def _stats_state(instance):
+    # Read from __dict__ so deferred fields never trigger a query
+    values = vars(instance)
+    if all(field in values for field in STATS_FIELDS):
+        return tuple(values[field] for field in STATS_FIELDS)
+    return None
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_stats_state(sender, instance, **kwargs):
+    """Note role and status as loaded, so a later save() can diff them."""
+    instance._stats_state = _stats_state(instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def revoke_tokens_on_access_change(sender, instance, created, using, update_fields=None, **kwargs):
+    """
+    Void tokens carrying stale role/is_active claims when save() changes
+    them (Django admin, create_admin). Connected before update_user_stats,
+    which resets the remembered state.
+    """
+    previous = getattr(instance, '_stats_state', None)
+    if created or previous is None or previous == _stats_state(instance):
+        return
+    if update_fields is not None and not set(STATS_FIELDS) & set(update_fields):
+        return
+    token_versions.revoke([instance.pk], using)
+    # Keep the instance in step, so a later full save() does not undo the bump
+    if 'token_version' in vars(instance):
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=CustomUser)
+def update_user_stats(sender, instance, created, using, update_fields=None, **kwargs):
+    """
+    Keep the dashboard rollups current for save(): registrations, role
+    changes and bans made outside the status views (e.g. Django admin).
+    """
+    previous = getattr(instance, '_stats_state', None)
+    if created:
+        user_stats.record_created([instance], using)
+    elif update_fields is not None and not set(STATS_FIELDS) & set(update_fields):
+        return  # last_login, password and profile saves
+    elif previous is not None and previous != _stats_state(instance):
+        user_stats.record_changed(instance, previous, using)
+    instance._stats_state = _stats_state(instance)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def load_deleted_stats_state(sender, instance, using, **kwargs):
+    # The instance may predate a queryset UPDATE (bans); count what is stored
+    instance._deleted_row = sender._default_manager.using(using).filter(pk=instance.pk).values(
+        *STATS_FIELDS, 'date_joined'
+    ).first()
+
+
+@receiver(post_delete, sender=CustomUser)
+def remove_user_stats(sender, instance, using, **kwargs):
+    row = getattr(instance, '_deleted_row', None)
+    if row is not None:
+        user_stats.record_deleted(sender(**row), using)
+
+
+@receiver(connection_created)
+def start_pool_health_checks(sender, connection, **kwargs):
+    """Start background checks for a pooled alias once per worker process."""
+    pool_health_checker.ensure_started(connection.alias)
@@ -0,0 +1,150 @@
+import datetime
+
+from django.db import connections, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import CustomUser, UserCounter, UserSignupDay
+
+
+COUNTERS = ('total', 'active', 'admins')
+
+
+def signup_day(joined: datetime.datetime) -> datetime.date:
+    """The day a user joined, in TIME_ZONE (what TruncDate groups by)."""
+    return timezone.localdate(joined) if timezone.is_aware(joined) else joined.date()
+
+
+def user_deltas(user, sign: int = 1) -> dict:
+    """Counter changes for adding (sign=1) or removing (sign=-1) one user."""
+    return {
+        'total': sign,
+        'active': sign if user.is_active else 0,
+        'admins': sign if user.role == 'admin' else 0,
+    }
+
+
+def aggregate_user_stats(users) -> tuple:
+    """Counter values and per-day signups computed from scratch (full scans)."""
+    counters = users.aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+        admins=Count('pk', filter=Q(role='admin')),
+    )
+    # order_by() drops Meta.ordering, which would otherwise split the groups
+    days = dict(
+        users.order_by().annotate(day=TruncDate('date_joined'))
+        .values_list('day').annotate(count=Count('pk'))
+    )
+    return counters, days
+
+
+class UserStats:
+    """
+    Dashboard statistics kept in the UserCounter and UserSignupDay rollups.
+
+    Write paths report deltas (signals for saves and deletes, the status
+    views for their UPDATEs, the importer and seeder for bulk inserts), each
+    applied with one upsert per table, so reads cost two small queries at
+    any table size. Deltas are not transactional with every user write;
+    rebuild_user_stats recomputes the rollups and reports any drift.
+    """
+
+    def _add(self, model, field: str, deltas: dict, using: str) -> None:
+        # INSERT ... ON CONFLICT DO UPDATE (PostgreSQL, SQLite 3.24+): adds
+        # atomically and creates missing rows, such as a new signup day.
+        # Sorted keys keep row locks in a consistent order.
+        deltas = {key: delta for key, delta in sorted(deltas.items()) if delta}
+        if not deltas:
+            return
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        key = quote(model._meta.pk.column)
+        value = quote(model._meta.get_field(field).column)
+        params = []
+        for name, delta in deltas.items():
+            params += [model._meta.pk.get_db_prep_value(name, connection), delta]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({key}, {value}) VALUES '
+                f'{", ".join(["(%s, %s)"] * len(deltas))} '
+                f'ON CONFLICT ({key}) DO UPDATE SET {value} = {table}.{value} + excluded.{value}',
+                params
+            )
+
+    def add(self, counters: dict, days: dict = None, using: str = 'default') -> None:
+        self._add(UserCounter, 'value', counters, using)
+        if days:
+            self._add(UserSignupDay, 'value', days, using)
+
+    def record_created(self, users, using: str = 'default') -> None:
+        """Count newly inserted users (bulk_create and COPY skip post_save)."""
+        counters = dict.fromkeys(COUNTERS, 0)
+        days = {}
+        for user in users:
+            for name, delta in user_deltas(user).items():
+                counters[name] += delta
+            day = signup_day(user.date_joined)
+            days[day] = days.get(day, 0) + 1
+        self.add(counters, days, using)
+
+    def record_deleted(self, user, using: str = 'default') -> None:
+        self.add(user_deltas(user, -1), {signup_day(user.date_joined): -1}, using)
+
+    def record_changed(self, user, previous: tuple, using: str = 'default') -> None:
+        """Apply a saved change of (role, is_active) from previous."""
+        role, is_active = previous
+        self.add({
+            'active': int(user.is_active) - int(is_active),
+            'admins': int(user.role == 'admin') - int(role == 'admin'),
+        }, using=using)
+
+    def record_status_change(self, updated: int, is_active: bool) -> None:
+        """Count users moved to is_active by a status UPDATE."""
+        self.add({'active': updated if is_active else -updated})
+
+    def read(self, days: int) -> dict:
+        """Totals and zero-filled signups for the last days (oldest first)."""
+        values = dict(UserCounter.objects.values_list('name', 'value'))
+        total, active, admins = (values.get(name, 0) for name in COUNTERS)
+        today = timezone.localdate()
+        start = today - datetime.timedelta(days=days - 1)
+        signups = dict(UserSignupDay.objects.filter(day__gte=start).values_list('day', 'value'))
+        return {
+            'total': total,
+            'active': active,
+            'banned': total - active,
+            'admins': admins,
+            'users': total - admins,
+            'signups': [
+                {'date': day.isoformat(), 'count': signups.get(day, 0)}
+                for day in (start + datetime.timedelta(days=offset) for offset in range(days))
+            ],
+        }
+
+    def rebuild(self, using: str = 'default') -> dict:
+        """
+        Recompute both rollups from the user table; returns the counters
+        that had drifted as {name: (stored, actual)}. Increments racing a
+        rebuild can be lost or doubled, so run it when writes are quiet.
+        """
+        counters, days = aggregate_user_stats(CustomUser.objects.using(using))
+        with transaction.atomic(using=using):
+            stored = dict(UserCounter.objects.using(using).values_list('name', 'value'))
+            UserCounter.objects.using(using).all().delete()
+            UserCounter.objects.using(using).bulk_create(
+                UserCounter(name=name, value=counters[name]) for name in COUNTERS
+            )
+            UserSignupDay.objects.using(using).all().delete()
+            UserSignupDay.objects.using(using).bulk_create(
+                UserSignupDay(day=day, value=count) for day, count in days.items()
+            )
+        return {
+            name: (stored.get(name, 0), counters[name])
+            for name in COUNTERS if stored.get(name, 0) != counters[name]
+        }
+
+
+user_stats = UserStats()
@@ -1,8 +1,64 @@
+import importlib
+import json
+import sqlite3
+import threading
+import time
+from io import StringIO
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import F
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
-from users.models import CustomUser
+from rest_framework_simplejwt.tokens import AccessToken
+from users import exporting, renderers
+from users import urls as users_urls
+from users.async_views import AsyncLoginView
+from users.authentication import token_versions, user_cache
+from users.benchmarks import SCENARIOS, BenchmarkRunner, compare
+from users.diagnostics import NPlusOneDetected, query_shape
+from users.factories import DEFAULT_PASSWORD, _copy_value, create_users
+from users.hashing import HashingPoolSaturated, hashing_pool
+from users.instrumentation import registry
+from users.last_login import last_login_buffer
+from users.models import CustomUser, UserCounter, UserSignupDay
+from users.page_cache import user_list_pages
+from users.pagination import check_user_list_pagination
+from users.pooling import PoolHealthChecker
+from users.routers import (
+    REPLICA, ReplicaRouter, end_write_tracking, primary_pins, reads_from, start_write_tracking
+)
+from users.search import search_users
+from users.serializers import UserListSerializer, get_tokens_for_user
+from users.stats import aggregate_user_stats, signup_day, user_stats
+from users.throttling import rejections, token_buckets
+from users.versions import resource_versions
+from users.views import AdminUserListView, UserProfileView
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(settings):
+    """Isolate tests from cached auth rows, counts, versions and pages."""
+    # Tests run in one process, so locmem behaves like a shared cache
+    settings.SHARED_CACHE = True
+    cache.clear()
+    caches['user_list_pages'].clear()
+    user_cache.clear_local()
+    token_versions.clear_local()
+    yield
+    cache.clear()
+    caches['user_list_pages'].clear()
+    user_cache.clear_local()
+    token_versions.clear_local()
 
 
 @pytest.fixture
@@ -228,3 +284,1621 @@ class TestUserProfile:
         response = api_client.get(url)
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    """Keyset pagination mode for the admin user list."""
+    
+    def test_cursor_mode_walks_all_users(self, admin_client, admin_user):
+        """Verify cursor pages cover every user exactly once."""
+        for i in range(14):
+            CustomUser.objects.create_user(
+                email=f'cursor{i}@example.com',
+                password=None,
+                full_name=f'Cursor {i}'
+            )
+        
+        url = reverse('admin-user-list') + '?pagination=cursor'
+        seen = []
+        while url:
+            response = admin_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.data
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        
+        assert len(seen) == 15
+        assert len(set(seen)) == 15
+    
+    def test_cursor_mode_from_setting(self, admin_client, admin_user, settings):
+        """Verify USER_LIST_PAGINATION selects the default mode."""
+        settings.USER_LIST_PAGINATION = 'cursor'
+        url = reverse('admin-user-list')
+        
+        response = admin_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        assert response.data['previous'] is None
+    
+    def test_invalid_mode_setting_falls_back_to_pages(self, admin_client, admin_user, settings):
+        """Verify a bad USER_LIST_PAGINATION is flagged by checks and serves page mode."""
+        settings.USER_LIST_PAGINATION = 'offset'
+        
+        response = admin_client.get(reverse('admin-user-list'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+        assert [error.id for error in check_user_list_pagination(None)] == ['users.W001']
+
+
+@pytest.mark.django_db
+class TestUserListCount:
+    """COUNT(*) avoidance strategies on the admin user list."""
+    
+    @pytest.fixture
+    def many_users(self, admin_user):
+        for i in range(12):
+            CustomUser.objects.create_user(
+                email=f'count{i}@example.com',
+                password=None,
+                full_name=f'Count {i}'
+            )
+    
+    def test_capped_count(self, admin_client, many_users, settings):
+        """Verify counts above the cap are reported as approximate."""
+        settings.USER_LIST_COUNT = 'capped'
+        settings.USER_LIST_COUNT_CAP = 5
+        
+        response = admin_client.get(reverse('admin-user-list'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 5
+        assert response.data['count_is_approximate'] is True
+        assert len(response.data['results']) == 10
+        assert response.data['next'] is not None
+    
+    def test_no_count_uses_lookahead(self, admin_client, many_users, settings):
+        """Verify has-next comes from the N+1 row without any COUNT."""
+        settings.USER_LIST_COUNT = 'none'
+        url = reverse('admin-user-list')
+        
+        first = admin_client.get(url)
+        last = admin_client.get(url + '?page=2')
+        
+        assert first.data['count'] is None
+        assert first.data['next'] is not None
+        assert len(last.data['results']) == 3
+        assert last.data['next'] is None
+        assert admin_client.get(url + '?page=3').status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_estimated_count_falls_back_on_sqlite(self, admin_client, many_users, settings):
+        """Verify estimated mode returns an exact (cached) total without pg_class."""
+        settings.USER_LIST_COUNT = 'estimated'
+        
+        response = admin_client.get(reverse('admin-user-list'))
+        
+        assert response.data['count'] == 13
+        assert response.data['count_is_approximate'] is False
+
+
+@pytest.mark.django_db
+class TestCachedAuthentication:
+    """Cached JWT user lookups and their invalidation."""
+    
+    def bearer(self, api_client, user):
+        token = get_tokens_for_user(user)['access']
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return api_client
+    
+    def test_repeat_requests_skip_user_query(self, api_client, created_user, django_assert_num_queries):
+        """Verify only the first authenticated request loads the user row."""
+        client = self.bearer(api_client, created_user)
+        url = reverse('user-profile')
+        
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['email'] == created_user.email
+    
+    def test_ban_takes_effect_immediately(self, api_client, created_user, admin_user):
+        """Verify a cached user is rejected right after being banned."""
+        user_client = self.bearer(APIClient(), created_user)
+        admin_client = self.bearer(api_client, admin_user)
+        profile_url = reverse('user-profile')
+        
+        assert user_client.get(profile_url).status_code == status.HTTP_200_OK
+        
+        admin_client.patch(
+            reverse('admin-user-status', kwargs={'pk': created_user.id}),
+            {'is_active': False},
+            format='json'
+        )
+        
+        assert user_client.get(profile_url).status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_no_shared_layer_without_shared_cache(self, api_client, created_user, settings):
+        """Verify per-process caches never serve a row another worker has changed."""
+        settings.SHARED_CACHE = False
+        client = self.bearer(api_client, created_user)
+        url = reverse('user-profile')
+        assert client.get(url).status_code == status.HTTP_200_OK
+        
+        # A ban handled by another worker only invalidates that worker's cache
+        CustomUser.objects.filter(pk=created_user.pk).update(is_active=False)
+        
+        assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+        assert cache.get(user_cache._key(created_user.pk)) is None
+    
+    def test_local_layer_is_opt_in(self, api_client, created_user):
+        """Verify workers keep no private copy of the row by default, so bans reach all of them."""
+        self.bearer(api_client, created_user).get(reverse('user-profile'))
+        
+        assert user_cache.local.get(user_cache._key(created_user.pk)) is None
+        assert cache.get(user_cache._key(created_user.pk)) is not None
+    
+    def test_profile_update_refreshes_cache(self, api_client, created_user):
+        """Verify the next request sees the updated profile, not the cached row."""
+        client = self.bearer(api_client, created_user)
+        url = reverse('user-profile')
+        
+        client.get(url)
+        client.patch(url, {'full_name': 'Renamed User'}, format='json')
+        
+        assert client.get(url).data['full_name'] == 'Renamed User'
+
+
+@pytest.mark.django_db
+class TestStatelessClaims:
+    """Opt-in role/is_active claims in access tokens."""
+    
+    @pytest.fixture(autouse=True)
+    def stateless(self, settings):
+        settings.JWT_STATELESS_AUTH = True
+    
+    def bearer(self, client, user):
+        token = get_tokens_for_user(user)['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+    
+    def test_login_token_carries_claims(self, api_client, test_user_data, created_user):
+        """Verify login issues access tokens with role, is_active and version."""
+        response = api_client.post(reverse('auth-login'), {
+            'email': test_user_data['email'],
+            'password': test_user_data['password']
+        }, format='json')
+        token = AccessToken(response.data['access'])
+        
+        assert token['role'] == 'user'
+        assert token['is_active'] is True
+        assert token['ver'] == 0
+    
+    def test_admin_check_without_user_query(self, api_client, admin_user, django_assert_num_queries):
+        """Verify admin endpoints authorize from claims, not the users table."""
+        client = self.bearer(api_client, admin_user)
+        url = reverse('admin-user-list')
+        
+        client.get(url)
+        # Only the page COUNT and SELECT remain
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+    
+    def test_revocation_on_another_worker_without_shared_cache(self, api_client, admin_user, settings):
+        """Verify a revoked token only outlives the local memo when the cache is per-process."""
+        settings.SHARED_CACHE = False
+        client = self.bearer(api_client, admin_user)
+        url = reverse('admin-user-list')
+        assert client.get(url).status_code == status.HTTP_200_OK
+
+        # Revoked by another worker, whose forget() cannot reach this one
+        CustomUser.objects.filter(pk=admin_user.pk).update(token_version=F('token_version') + 1)
+        token_versions.clear_local()  # TOKEN_VERSION_CHECK_INTERVAL has passed
+
+        assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+        assert cache.get(token_versions._key(admin_user.pk)) is None
+
+    def test_ban_revokes_stateless_token(self, api_client, created_user, admin_user):
+        """Verify a banned user's claims token stops working."""
+        user_client = self.bearer(APIClient(), created_user)
+        admin_client = self.bearer(api_client, admin_user)
+        profile_url = reverse('user-profile')
+        
+        assert user_client.get(profile_url).status_code == status.HTTP_200_OK
+        
+        admin_client.patch(
+            reverse('admin-user-status', kwargs={'pk': created_user.id}),
+            {'is_active': False},
+            format='json'
+        )
+        
+        assert user_client.get(profile_url).status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_demotion_through_save_revokes_tokens(self, api_client, admin_user):
+        """Verify a role change made with save() voids tokens carrying the old role."""
+        refresh = get_tokens_for_user(admin_user)['refresh']
+        client = self.bearer(api_client, admin_user)
+        url = reverse('admin-user-list')
+        assert client.get(url).status_code == status.HTTP_200_OK
+
+        admin_user.role = 'user'
+        admin_user.save()
+
+        assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+        # Access tokens minted from the old refresh token copy its stale version
+        access = APIClient().post(reverse('token-refresh'), {'refresh': refresh}, format='json').data['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+        admin_user.save()
+        assert CustomUser.objects.get(pk=admin_user.pk).token_version == 1
+
+    def test_admin_cannot_ban_self_with_claims(self, api_client, admin_user):
+        """Verify self-lockout protection compares UUIDs from claims."""
+        client = self.bearer(api_client, admin_user)
+        url = reverse('admin-user-status', kwargs={'pk': admin_user.id})
+        
+        response = client.patch(url, {'is_active': False}, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestPasswordHashing:
+    """Configurable hashers and transparent rehash on login."""
+    
+    @pytest.fixture(autouse=True)
+    def cheap_costs(self, settings):
+        settings.PASSWORD_HASHING = {
+            'PBKDF2_ITERATIONS': 1000,
+            'SCRYPT_WORK_FACTOR': 2 ** 10,
+        }
+    
+    def login(self, api_client, email, password):
+        return api_client.post(reverse('auth-login'), {
+            'email': email,
+            'password': password
+        }, format='json')
+    
+    def test_tunable_iterations(self, created_user):
+        """Verify PBKDF2 uses the configured iteration count."""
+        assert created_user.password.startswith('pbkdf2_sha256$1000$')
+    
+    def test_rehash_on_login_after_hasher_change(self, api_client, settings, created_user, test_user_data):
+        """Verify a login re-encodes passwords from an outdated hasher."""
+        settings.PASSWORD_HASHERS = [
+            'users.hashers.TunableScryptPasswordHasher',
+            'users.hashers.TunablePBKDF2PasswordHasher',
+        ]
+        
+        response = self.login(api_client, test_user_data['email'], test_user_data['password'])
+        
+        assert response.status_code == status.HTTP_200_OK
+        created_user.refresh_from_db()
+        assert created_user.password.startswith('scrypt$')
+        assert created_user.check_password(test_user_data['password'])
+    
+    def test_rehash_on_login_after_cost_change(self, api_client, settings, created_user, test_user_data):
+        """Verify a login re-encodes passwords hashed with an old cost."""
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 2000}
+        
+        self.login(api_client, test_user_data['email'], test_user_data['password'])
+        
+        created_user.refresh_from_db()
+        assert created_user.password.startswith('pbkdf2_sha256$2000$')
+    
+    def test_benchmark_command(self):
+        """Verify the benchmark command reports each configuration."""
+        out = StringIO()
+        call_command('benchmark_hashers', 'pbkdf2', 'scrypt:work_factor=1024', rounds=2, json=True, stdout=out)
+        
+        results = json.loads(out.getvalue())
+        assert [row['config'].split(':')[0] for row in results] == ['pbkdf2', 'scrypt']
+        assert all(row['hashes_per_sec'] > 0 for row in results)
+
+
+@pytest.mark.django_db
+class TestHashingPool:
+    """Bounded hashing pool with fast rejection under load."""
+    
+    @pytest.fixture(autouse=True)
+    def pool(self, settings):
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+        settings.PASSWORD_HASHING_POOL = {
+            'ENABLED': True,
+            'EXECUTOR': 'thread',
+            'WORKERS': 1,
+            'MAX_QUEUE': 0,
+            'TIMEOUT': 5,
+        }
+    
+    def test_login_hashes_on_pool(self, api_client, created_user, test_user_data):
+        """Verify logins verify passwords through the pool."""
+        response = api_client.post(reverse('auth-login'), {
+            'email': test_user_data['email'],
+            'password': test_user_data['password']
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert hashing_pool.stats()['completed'] >= 1
+    
+    def test_saturated_pool_rejects_fast(self, api_client, created_user, test_user_data):
+        """Verify a full pool returns 503 with Retry-After instead of queueing."""
+        gate = threading.Event()
+        blocker = threading.Thread(target=hashing_pool.run, args=(gate.wait, 5))
+        blocker.start()
+        while hashing_pool.stats()['in_flight'] == 0:
+            time.sleep(0.01)
+        
+        try:
+            response = api_client.post(reverse('auth-login'), {
+                'email': test_user_data['email'],
+                'password': test_user_data['password']
+            }, format='json')
+        finally:
+            gate.set()
+            blocker.join()
+        
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
+        assert hashing_pool.stats()['rejected'] == 1
+
+    def test_timed_out_work_keeps_its_slot(self, settings):
+        """Verify a timeout cancels queued work but a running hash holds its slot until done."""
+        settings.PASSWORD_HASHING_POOL = {**settings.PASSWORD_HASHING_POOL, 'MAX_QUEUE': 1, 'TIMEOUT': 0.05}
+        gate = threading.Event()
+
+        try:
+            with pytest.raises(HashingPoolSaturated):
+                hashing_pool.run(gate.wait, 5)
+            # Queued behind the running hash, then cancelled on timeout
+            with pytest.raises(HashingPoolSaturated):
+                hashing_pool.run(time.sleep, 0)
+            assert hashing_pool.stats()['in_flight'] == 1
+        finally:
+            gate.set()
+
+        while hashing_pool.stats()['in_flight']:
+            time.sleep(0.01)
+        stats = hashing_pool.stats()
+        assert stats['timed_out'] == 2
+        assert stats['completed'] == 0
+        assert stats['rejected'] == 0
+
+
+@pytest.mark.django_db
+class TestLastLoginBuffer:
+    """Coalesced last_login writes."""
+    
+    def login_times(self, api_client, test_user_data, times):
+        url = reverse('auth-login')
+        payload = {
+            'email': test_user_data['email'],
+            'password': test_user_data['password']
+        }
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(times):
+                assert api_client.post(url, payload, format='json').status_code == status.HTTP_200_OK
+        return [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+    
+    def test_unbuffered_writes_every_login(self, api_client, test_user_data, created_user):
+        """Verify the default path issues one UPDATE per login."""
+        assert len(self.login_times(api_client, test_user_data, 3)) == 3
+    
+    def test_buffer_coalesces_logins(self, api_client, test_user_data, created_user, settings):
+        """Verify repeated logins flush as a single UPDATE with the latest time."""
+        settings.LAST_LOGIN_BUFFER = {'ENABLED': True, 'BATCH_SIZE': 100, 'MAX_STALENESS': 60}
+        
+        updates = self.login_times(api_client, test_user_data, 3)
+        assert updates == []
+        
+        with CaptureQueriesContext(connection) as queries:
+            assert last_login_buffer.flush() == 1
+        assert len(queries.captured_queries) == 1
+        
+        created_user.refresh_from_db()
+        assert created_user.last_login is not None
+    
+    def test_buffer_flushes_at_batch_size(self, created_user, admin_user, settings, monkeypatch):
+        """Verify reaching BATCH_SIZE hands the flush to the timer thread, not the caller."""
+        settings.LAST_LOGIN_BUFFER = {'ENABLED': True, 'BATCH_SIZE': 2, 'MAX_STALENESS': 60}
+        now = timezone.now()
+        flushed_on = []
+        flushed = threading.Event()
+        monkeypatch.setattr(last_login_buffer, 'flush', lambda: (
+            flushed_on.append(threading.current_thread()), flushed.set()
+        ))
+        
+        last_login_buffer.record(created_user.pk, now)
+        last_login_buffer.record(admin_user.pk, now)
+        
+        assert flushed.wait(2)
+        assert flushed_on == [flushed_on[0]] and flushed_on[0] is not threading.current_thread()
+        monkeypatch.undo()
+        assert last_login_buffer.flush() == 2
+        admin_user.refresh_from_db()
+        assert admin_user.last_login == now
+    
+    def test_failed_flush_keeps_pending_values(self, created_user, settings, monkeypatch):
+        """Verify values survive a database error and are written by the next flush."""
+        settings.LAST_LOGIN_BUFFER = {'ENABLED': True, 'BATCH_SIZE': 100, 'MAX_STALENESS': 60}
+        now = timezone.now()
+        last_login_buffer.record(created_user.pk, now)
+        
+        def fail(*args, **kwargs):
+            raise DatabaseError('connection lost')
+        monkeypatch.setattr(CustomUser.objects, 'bulk_update', fail)
+        with pytest.raises(DatabaseError):
+            last_login_buffer.flush()
+        assert last_login_buffer.stats()['pending'] == 1
+        
+        monkeypatch.undo()
+        assert last_login_buffer.flush() == 1
+        created_user.refresh_from_db()
+        assert created_user.last_login == now
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    """Async-native variants of the hot endpoints."""
+    
+    @pytest.fixture(autouse=True)
+    def cheap_costs(self, settings):
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+    
+    def test_flag_keeps_sync_views_for_unported_features(self, settings):
+        """Verify ASYNC_VIEWS swaps only the routes whose async views match the sync ones."""
+        settings.ASYNC_VIEWS = True
+        try:
+            routes = {route.name: route.callback.view_class for route in importlib.reload(users_urls).urlpatterns}
+        finally:
+            settings.ASYNC_VIEWS = False
+            importlib.reload(users_urls)
+        
+        assert routes['auth-login'] is AsyncLoginView
+        assert routes['admin-user-list'] is AdminUserListView
+        assert routes['user-profile'] is UserProfileView
+    
+    def call(self, method, url, user=None, **kwargs):
+        client = AsyncClient()
+        if user is not None:
+            token = get_tokens_for_user(user)['access']
+            kwargs['headers'] = {'Authorization': f'Bearer {token}'}
+        return async_to_sync(getattr(client, method))(url, content_type='application/json', **kwargs)
+    
+    def test_register_and_login(self, test_user_data):
+        """Verify async register creates a usable account and login returns tokens."""
+        response = self.call('post', reverse('async-auth-register'), data=test_user_data)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert 'access' in response.json()['tokens']
+        
+        response = self.call('post', reverse('async-auth-login'), data={
+            'email': test_user_data['email'],
+            'password': test_user_data['password']
+        })
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['user']['role'] == 'user'
+        assert CustomUser.objects.get(email=test_user_data['email']).last_login is not None
+    
+    def test_login_with_due_last_login_buffer(self, created_user, test_user_data, settings, monkeypatch):
+        """Verify a login that fills the buffer succeeds and leaves the flush to the timer thread."""
+        settings.LAST_LOGIN_BUFFER = {'ENABLED': True, 'BATCH_SIZE': 1, 'MAX_STALENESS': 60}
+        flushed_on = []
+        flushed = threading.Event()
+        monkeypatch.setattr(last_login_buffer, 'flush', lambda: (
+            flushed_on.append(threading.current_thread()), flushed.set()
+        ))
+        
+        response = self.call('post', reverse('async-auth-login'), data={
+            'email': test_user_data['email'],
+            'password': test_user_data['password']
+        })
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert flushed.wait(2)
+        assert isinstance(flushed_on[0], threading.Timer)
+        monkeypatch.undo()
+        assert last_login_buffer.flush() == 1
+    
+    def test_login_invalid_credentials(self, created_user):
+        """Verify wrong passwords get the same 401 as the sync view."""
+        response = self.call('post', reverse('async-auth-login'), data={
+            'email': created_user.email,
+            'password': 'WrongPassword123'
+        })
+        
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert 'WWW-Authenticate' in response
+    
+    def test_profile_matches_sync_view(self, api_client, created_user):
+        """Verify the async profile body matches the sync endpoint."""
+        token = get_tokens_for_user(created_user)['access']
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        
+        sync_response = api_client.get(reverse('user-profile'))
+        async_response = self.call('get', reverse('async-user-profile'), user=created_user)
+        
+        assert async_response.content == sync_response.content
+    
+    def test_profile_update(self, created_user):
+        """Verify async PATCH writes the changed field."""
+        response = self.call('patch', reverse('async-user-profile'), user=created_user,
+                             data={'full_name': 'Async Name'})
+        
+        assert response.status_code == status.HTTP_200_OK
+        created_user.refresh_from_db()
+        assert created_user.full_name == 'Async Name'
+    
+    def test_admin_list_requires_admin(self, created_user, admin_user):
+        """Verify RBAC and pagination on the async admin list."""
+        url = reverse('async-admin-user-list')
+        
+        assert self.call('get', url).status_code == status.HTTP_401_UNAUTHORIZED
+        assert self.call('get', url, user=created_user).status_code == status.HTTP_403_FORBIDDEN
+        
+        response = self.call('get', url, user=admin_user)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == 2
+        assert len(response.json()['results']) == 2
+
+
+@pytest.mark.django_db
+class TestUserImport:
+    """Batched bulk import from CSV/JSONL."""
+    
+    CSV = (
+        'email,full_name,password\n'
+        'one@example.com,User One,ImportPass123\n'
+        'two@example.com,User Two,ImportPass123\n'
+        'one@example.com,Duplicate One,ImportPass123\n'
+        'bad-email,Bad Email,ImportPass123\n'
+        'three@example.com,User Three,short\n'
+        'test@example.com,Existing User,ImportPass123\n'
+    )
+    
+    @pytest.fixture(autouse=True)
+    def cheap_costs(self, settings):
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+    
+    def test_command_reports_row_errors(self, tmp_path, created_user):
+        """Verify valid rows are created and each bad row is reported by number."""
+        source = tmp_path / 'users.csv'
+        source.write_text(self.CSV)
+        errors_file = tmp_path / 'errors.jsonl'
+        out = StringIO()
+        
+        call_command('import_users', str(source), '--threads', '--batch-size', '2',
+                     '--errors-file', str(errors_file), stdout=out)
+        
+        assert 'rows/sec' in out.getvalue()
+        assert set(CustomUser.objects.values_list('email', flat=True)) == {
+            'one@example.com', 'two@example.com', 'test@example.com'
+        }
+        errors = [json.loads(line) for line in errors_file.read_text().splitlines()]
+        assert sorted(error['row'] for error in errors) == [3, 4, 5, 6]
+        assert CustomUser.objects.get(email='two@example.com').check_password('ImportPass123')
+    
+    def test_resume_from_checkpoint(self, tmp_path):
+        """Verify a rerun skips rows already committed according to the checkpoint."""
+        source = tmp_path / 'users.jsonl'
+        source.write_text('\n'.join(json.dumps({
+            'email': f'user{i}@example.com', 'full_name': f'User {i}', 'password': 'ImportPass123'
+        }) for i in range(5)))
+        checkpoint = tmp_path / 'import.checkpoint'
+        checkpoint.write_text(json.dumps({'rows_done': 3, 'created': 3, 'failed': 0}))
+        
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_users', str(source), '--threads', '--checkpoint', str(checkpoint),
+                         stdout=StringIO())
+        
+        assert sorted(CustomUser.objects.values_list('email', flat=True)) == [
+            'user3@example.com', 'user4@example.com'
+        ]
+        assert len([q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "users_customuser"')]) == 1
+        assert json.loads(checkpoint.read_text()) == {'rows_done': 5, 'created': 5, 'failed': 0}
+    
+    def test_resume_appends_errors_file(self, tmp_path):
+        """Verify a resumed run keeps the rejects written by the earlier run."""
+        source = tmp_path / 'users.jsonl'
+        source.write_text('5\n' + json.dumps({
+            'email': 'one@example.com', 'full_name': 'User One', 'password': 'ImportPass123'
+        }) + '\n7\n')
+        checkpoint = tmp_path / 'import.checkpoint'
+        checkpoint.write_text(json.dumps({'rows_done': 2, 'created': 1, 'failed': 1}))
+        errors_file = tmp_path / 'errors.jsonl'
+        errors_file.write_text(json.dumps({'row': 1, 'errors': {}}) + '\n')
+        
+        call_command('import_users', str(source), '--threads', '--checkpoint', str(checkpoint),
+                     '--errors-file', str(errors_file), stdout=StringIO())
+        
+        errors = [json.loads(line) for line in errors_file.read_text().splitlines()]
+        assert [error['row'] for error in errors] == [1, 3]
+    
+    def test_admin_upload(self, api_client, admin_client, created_user):
+        """Verify the admin endpoint imports an uploaded file and is admin-only."""
+        url = reverse('admin-user-import')
+        upload = SimpleUploadedFile('users.csv', self.CSV.encode(), content_type='text/csv')
+        
+        response = admin_client.post(url, {'file': upload}, format='multipart')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 2
+        assert response.data['failed'] == 4
+        
+        api_client.force_authenticate(user=created_user)
+        assert api_client.post(url, {}, format='multipart').status_code == status.HTTP_403_FORBIDDEN
+
+    def test_upload_rejects_non_utf8(self, admin_client):
+        """Verify an undecodable upload is a 400, not a server error."""
+        upload = SimpleUploadedFile(
+            'users.csv', 'email,full_name,password\nzoë@example.com,Zoë,ImportPass123\n'.encode('latin-1'),
+            content_type='text/csv'
+        )
+
+        response = admin_client.post(reverse('admin-user-import'), {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'file' in response.data
+
+    def test_jsonl_scalar_rows_are_row_errors(self, admin_client):
+        """Verify JSONL lines that are not objects are reported per row."""
+        content = '5\n["a"]\n' + json.dumps({
+            'email': 'one@example.com', 'full_name': 'User One', 'password': 'ImportPass123'
+        })
+        upload = SimpleUploadedFile('users.jsonl', content.encode(), content_type='application/x-ndjson')
+
+        response = admin_client.post(reverse('admin-user-import'), {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert [error['row'] for error in response.data['errors']] == [1, 2]
+
+
+@pytest.mark.django_db
+class TestUserExport:
+    """Streaming user directory export."""
+    
+    def test_csv_export_streams_all_users(self, admin_client, created_user, admin_user):
+        """Verify the CSV export streams a header plus one row per user."""
+        response = admin_client.get(reverse('admin-user-export'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == 'text/csv'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == 'id,full_name,email,role,is_active,last_login'
+        assert sorted(line.split(',')[2] for line in lines[1:]) == [
+            'admin@example.com', 'test@example.com'
+        ]
+    
+    def test_jsonl_export_matches_list_serializer(self, admin_client, created_user):
+        """Verify JSONL rows match the admin list representation."""
+        created_user.last_login = timezone.now()
+        created_user.save()
+        
+        response = admin_client.get(reverse('admin-user-export'), {'output': 'jsonl'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        
+        expected = json.loads(json.dumps(UserListSerializer(created_user).data))
+        assert expected in rows
+    
+    def test_export_requires_admin(self, authenticated_client):
+        """Verify standard users cannot export."""
+        response = authenticated_client.get(reverse('admin-user-export'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_first_row_is_sent_before_query_finishes(self, monkeypatch):
+        """Verify the first JSONL chunk goes out after one row, not a full chunk."""
+        create_users(10)
+        fetched = []
+        source = exporting.iter_user_rows
+
+        def counting_rows(*args, **kwargs):
+            for row in source(*args, **kwargs):
+                fetched.append(row)
+                yield row
+
+        monkeypatch.setattr(exporting, 'iter_user_rows', counting_rows)
+        chunks = exporting.iter_export('jsonl')
+
+        assert len(next(chunks).splitlines()) == 1
+        assert len(fetched) == 1
+        assert sum(len(chunk.splitlines()) for chunk in chunks) == 9
+
+    def test_command_keyset_fallback(self, created_user, admin_user, monkeypatch):
+        """Verify the keyset path is used without server-side cursors and exports every row once."""
+        monkeypatch.setitem(connection.settings_dict, 'DISABLE_SERVER_SIDE_CURSORS', True)
+        out = StringIO()
+        
+        with CaptureQueriesContext(connection) as queries:
+            call_command('export_users', '--format', 'jsonl', '--chunk-size', '1', stdout=out)
+        
+        emails = [json.loads(line)['email'] for line in out.getvalue().splitlines()]
+        assert sorted(emails) == ['admin@example.com', 'test@example.com']
+        # One query per single-row chunk plus the final empty one
+        assert len(queries.captured_queries) == 3
+
+
+@pytest.mark.django_db
+class TestBulkUserStatus:
+    """Set-based ban/activate."""
+    
+    def make_users(self, count, domain='spam.example'):
+        return CustomUser.objects.bulk_create([
+            CustomUser(email=f'user{i}@{domain}', full_name=f'User {i}', password='!')
+            for i in range(count)
+        ])
+    
+    def test_ids_single_update_with_results(self, admin_client, admin_user, created_user):
+        """Verify one UPDATE and a result for every requested ID."""
+        users = self.make_users(3)
+        users[2].is_active = False
+        users[2].save()
+        missing = '00000000-0000-0000-0000-000000000000'
+        ids = [str(users[0].id), str(users[1].id), str(users[2].id), missing, str(admin_user.id)]
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                reverse('admin-user-bulk-status'), {'is_active': False, 'ids': ids}, format='json'
+            )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['updated'] == 2
+        assert response.data['results'] == {
+            ids[0]: 'updated', ids[1]: 'updated', ids[2]: 'unchanged',
+            missing: 'not_found', ids[4]: 'forbidden_self',
+        }
+        assert len([q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]) == 1
+        assert not CustomUser.objects.filter(email__endswith='@spam.example', is_active=True).exists()
+        assert CustomUser.objects.get(pk=admin_user.pk).is_active
+    
+    def test_filter_by_domain_revokes_cached_auth(self, admin_client, admin_user):
+        """Verify a filtered ban invalidates cached users and bumps token versions."""
+        target = self.make_users(1)[0]
+        token = get_tokens_for_user(target)['access']
+        user_client = APIClient()
+        user_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert user_client.get(reverse('user-profile')).status_code == status.HTTP_200_OK
+        
+        response = admin_client.post(reverse('admin-user-bulk-status'), {
+            'is_active': False, 'filter': {'email_domain': 'spam.example', 'role': 'user'}
+        }, format='json')
+        
+        assert response.data['results'] == {str(target.id): 'updated'}
+        target.refresh_from_db()
+        assert target.token_version == 1
+        assert user_client.get(reverse('user-profile')).status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_filter_skips_requesting_admin(self, admin_client, admin_user):
+        """Verify a filter matching the admin never bans them."""
+        response = admin_client.post(reverse('admin-user-bulk-status'), {
+            'is_active': False, 'filter': {'role': 'admin'}
+        }, format='json')
+        
+        assert response.data['updated'] == 0
+        assert response.data['results'] == {str(admin_user.id): 'forbidden_self'}
+    
+    def test_requires_ids_or_filter(self, admin_client):
+        """Verify exactly one of ids or filter must be given."""
+        url = reverse('admin-user-bulk-status')
+        assert admin_client.post(url, {'is_active': False}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+        response = admin_client.post(url, {'is_active': False, 'ids': [], 'filter': {}}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_requires_admin(self, authenticated_client):
+        """Verify standard users cannot bulk ban."""
+        response = authenticated_client.post(
+            reverse('admin-user-bulk-status'), {'is_active': False, 'filter': {'role': 'user'}}, format='json'
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestUserSearch:
+    """Indexed ?search= and filters on the admin user list."""
+    
+    @pytest.fixture
+    def users(self):
+        now = timezone.now()
+        return CustomUser.objects.bulk_create([
+            CustomUser(email='alice.smith@acme.io', full_name='Alice Smith', password='!',
+                       last_login=now - timezone.timedelta(days=40)),
+            CustomUser(email='bob@example.com', full_name='Robert Jones', password='!',
+                       last_login=now),
+            CustomUser(email='carol@acme.io', full_name='Carol Smithers', password='!',
+                       role='admin', is_active=False),
+        ])
+    
+    def emails(self, client, **params):
+        response = client.get(reverse('admin-user-list'), params)
+        assert response.status_code == status.HTTP_200_OK
+        return sorted(row['email'] for row in response.data['results'])
+    
+    def test_substring_search(self, admin_client, users):
+        """Verify search matches substrings of email or name, case-insensitively."""
+        assert self.emails(admin_client, search='SMITH') == ['alice.smith@acme.io', 'carol@acme.io']
+        assert self.emails(admin_client, search='acme.io') == ['alice.smith@acme.io', 'carol@acme.io']
+        assert self.emails(admin_client, search='jones') == ['bob@example.com']
+    
+    def test_search_follows_updates(self, admin_client, users):
+        """Verify the FTS shadow table is kept in sync by triggers."""
+        users[1].full_name = 'Bobby Tables'
+        users[1].save()
+        CustomUser.objects.filter(pk=users[0].pk).delete()
+        
+        assert self.emails(admin_client, search='tables') == ['bob@example.com']
+        assert self.emails(admin_client, search='jones') == []
+        assert self.emails(admin_client, search='alice') == []
+    
+    def test_short_term_uses_prefix(self, admin_client, users):
+        """Verify terms shorter than a trigram fall back to prefix matching."""
+        assert self.emails(admin_client, search='bo') == ['bob@example.com']
+        assert self.emails(admin_client, search='ob') == []
+    
+    def test_filters(self, admin_client, admin_user, users):
+        """Verify role, is_active and last_login range filters combine."""
+        assert self.emails(admin_client, role='admin', is_active='false') == ['carol@acme.io']
+        since = (timezone.now() - timezone.timedelta(days=7)).isoformat()
+        assert self.emails(admin_client, last_login_after=since) == ['bob@example.com']
+        assert self.emails(admin_client, last_login_before=since) == ['alice.smith@acme.io']
+        
+        response = admin_client.get(reverse('admin-user-list'), {'role': 'owner'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_search_uses_fts_index(self, users):
+        """Verify SQLite search goes through FTS5 rather than a LIKE scan."""
+        if connection.vendor != 'sqlite':
+            pytest.skip('SQLite-specific index')
+        queryset = search_users(CustomUser.objects.all(), 'smith')
+        
+        plan = queryset.explain()
+        assert 'users_customuser_fts VIRTUAL TABLE INDEX' in plan
+
+
+@pytest.mark.django_db
+class TestNarrowUpdates:
+    """Write paths issue minimal UPDATEs."""
+    
+    def test_status_change_is_single_conditional_update(self, admin_client, created_user,
+                                                        django_assert_num_queries):
+        """Verify a status change costs one UPDATE touching only status columns, plus the stats upsert."""
+        url = reverse('admin-user-status', kwargs={'pk': created_user.id})
+        
+        with django_assert_num_queries(2) as queries:
+            response = admin_client.patch(url, {'is_active': False}, format='json')
+        
+        assert response.data == {'is_active': False}
+        sql = queries.captured_queries[0]['sql']
+        assert sql.startswith('UPDATE') and 'full_name' not in sql and 'is_active' in sql
+        assert 'users_usercounter' in queries.captured_queries[1]['sql']
+        created_user.refresh_from_db()
+        assert not created_user.is_active
+        assert created_user.token_version == 1
+    
+    def test_status_unchanged_writes_nothing(self, admin_client, created_user,
+                                             django_assert_num_queries):
+        """Verify setting the current status matches no rows and keeps tokens valid."""
+        url = reverse('admin-user-status', kwargs={'pk': created_user.id})
+        
+        with django_assert_num_queries(2):
+            response = admin_client.patch(url, {'is_active': True}, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        created_user.refresh_from_db()
+        assert created_user.token_version == 0
+    
+    def test_status_unknown_user(self, admin_client):
+        """Verify unknown IDs still return 404."""
+        url = reverse('admin-user-status', kwargs={'pk': '00000000-0000-0000-0000-000000000000'})
+        response = admin_client.patch(url, {'is_active': False}, format='json')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_profile_update_writes_changed_columns(self, authenticated_client,
+                                                   django_assert_num_queries):
+        """Verify profile saves update only changed fields, and skip no-op saves."""
+        url = reverse('user-profile')
+        
+        with django_assert_num_queries(1) as queries:
+            authenticated_client.patch(url, {'full_name': 'Narrow Name'}, format='json')
+        sql = queries.captured_queries[0]['sql']
+        assert sql.startswith('UPDATE') and 'full_name' in sql and 'password' not in sql
+        
+        with django_assert_num_queries(0):
+            authenticated_client.patch(url, {'full_name': 'Narrow Name'}, format='json')
+    
+    def test_password_change_updates_password_only(self, authenticated_client, test_user_data,
+                                                   django_assert_num_queries):
+        """Verify a password change writes just the password column."""
+        with django_assert_num_queries(1) as queries:
+            response = authenticated_client.post(reverse('change-password'), {
+                'old_password': test_user_data['password'],
+                'new_password': 'NewSecurePass456'
+            }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        sql = queries.captured_queries[0]['sql']
+        assert sql.startswith('UPDATE') and 'password' in sql and 'is_active' not in sql
+
+
+@pytest.mark.django_db
+class TestBenchmarks:
+    """Endpoint benchmark runner and regression check."""
+    
+    def test_factory_and_runner(self, settings):
+        """Verify seeding and per-scenario latency/query metrics."""
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+        scenarios = [s for s in SCENARIOS if s.name in (
+            'admin-user-list:get', 'admin-user-status:patch', 'user-profile:get'
+        )]
+        
+        results = BenchmarkRunner([30], requests=2, warmup=1, scenarios=scenarios).run()
+        
+        assert CustomUser.objects.filter(email__startswith='user').count() == 30
+        rows = results['30']
+        assert set(rows) == {s.name for s in scenarios}
+        assert all(row['errors'] == 0 for row in rows.values())
+        # The user UPDATE plus the dashboard counter upsert
+        assert rows['admin-user-status:patch']['queries'] == 2
+        assert rows['admin-user-list:get']['p50_ms'] <= rows['admin-user-list:get']['p99_ms']
+    
+    def test_compare_flags_regressions(self):
+        """Verify query growth and real latency growth fail, noise does not."""
+        baseline = {'1000': {
+            'list': {'queries': 2, 'p95_ms': 10.0},
+            'profile': {'queries': 0, 'p95_ms': 0.5},
+        }}
+        current = {'1000': {
+            'list': {'queries': 3, 'p95_ms': 20.0, 'errors': 0},
+            'profile': {'queries': 0, 'p95_ms': 0.9, 'errors': 0},
+            'new': {'queries': 9, 'p95_ms': 99.0, 'errors': 0},
+        }}
+        
+        regressions = compare(current, baseline, latency_threshold=0.25)
+        
+        assert regressions == [
+            'list @ 1000: queries 2 -> 3',
+            'list @ 1000: p95 10.0ms -> 20.0ms',
+        ]
+
+
+@pytest.mark.django_db
+class TestSeedUsers:
+    """Synthetic data generation for load tests."""
+    
+    def test_seed_command(self, settings, created_user):
+        """Verify rows are appended after existing ones and share a working hash."""
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+        out = StringIO()
+        
+        call_command('seed_users', '500', '--batch-size', '200', stdout=out)
+        
+        assert 'rows/sec' in out.getvalue()
+        assert CustomUser.objects.count() == 501
+        assert CustomUser.objects.filter(email='user1@example.com').exists()
+        assert CustomUser.objects.values('password').distinct().count() == 2
+        seeded = CustomUser.objects.get(email='user1@example.com')
+        assert seeded.check_password(DEFAULT_PASSWORD)
+        assert CustomUser.objects.filter(is_active=True).count() > 400
+    
+    def test_seed_after_deletes_continues_numbering(self, settings):
+        """Verify a second seed starts after the highest factory email, not at the row count."""
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+        call_command('seed_users', '5', stdout=StringIO())
+        CustomUser.objects.filter(email='user1@example.com').delete()
+        CustomUser.objects.create_user(email='user99@other.com', full_name='Other', password='OtherPass123')
+        
+        call_command('seed_users', '2', stdout=StringIO())
+        
+        assert CustomUser.objects.filter(email__in=['user5@example.com', 'user6@example.com']).count() == 2
+        assert CustomUser.objects.count() == 7
+    
+    def test_mixed_case_domain_reseeds(self, settings):
+        """Verify a mixed-case --domain continues numbering instead of colliding."""
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+        call_command('seed_users', '2', '--domain', 'Example.ORG', stdout=StringIO())
+        call_command('seed_users', '2', '--domain', 'Example.ORG', stdout=StringIO())
+        
+        assert sorted(CustomUser.objects.values_list('email', flat=True)) == [
+            f'user{number}@example.org' for number in range(4)
+        ]
+    
+    def test_copy_value_escaping(self):
+        """Verify COPY text-format escaping of special values."""
+        assert _copy_value(None) == '\\N'
+        assert _copy_value(True) == 't'
+        assert _copy_value('tab\there\nline\\') == 'tab\\there\\nline\\\\'
+
+
+@pytest.mark.django_db
+class TestPerformanceInstrumentation:
+    """Server-Timing headers, structured logs and the metrics endpoint."""
+    
+    @pytest.fixture(autouse=True)
+    def enabled(self, settings):
+        settings.PERFORMANCE_INSTRUMENTATION = {
+            'ENABLED': True, 'SERVER_TIMING': True, 'LOG_THRESHOLD_MS': 0
+        }
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+        registry.clear()
+    
+    def timings(self, response) -> dict:
+        parts = [part.strip().split(';') for part in response['Server-Timing'].split(',')]
+        return {name: float(dur.split('=')[1]) for name, dur, *_ in parts}
+    
+    def test_server_timing_and_log(self, admin_client, created_user, caplog):
+        """Verify DB time/query count are reported in the header and a JSON log line."""
+        with caplog.at_level('INFO', logger='users.performance'):
+            response = admin_client.get(reverse('admin-user-list'))
+        
+        assert 'queries"' in response['Server-Timing']
+        assert self.timings(response)['total'] >= self.timings(response)['db'] > 0
+        entry = json.loads(caplog.records[-1].getMessage())
+        assert entry['view'] == 'admin-user-list'
+        assert entry['db_queries'] == 2
+        assert entry['serializer_ms'] > 0
+    
+    def test_hash_time_recorded(self, api_client, test_user_data, created_user):
+        """Verify password verification time shows up as hash time, sync and async."""
+        payload = {'email': test_user_data['email'], 'password': test_user_data['password']}
+        
+        response = api_client.post(reverse('auth-login'), payload, format='json')
+        assert self.timings(response)['hash'] > 0
+        # Credential validation is input, not response rendering
+        assert self.timings(response)['serializer'] == 0
+        
+        response = async_to_sync(AsyncClient().post)(
+            reverse('async-auth-login'), payload, content_type='application/json'
+        )
+        assert self.timings(response)['hash'] > 0
+        assert 'db;dur=0.00' not in response['Server-Timing']
+    
+    def test_metrics_endpoint(self, admin_client):
+        """Verify histograms and component counters are exposed in Prometheus format."""
+        admin_client.get(reverse('admin-user-list'))
+        
+        response = admin_client.get(reverse('admin-metrics'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        body = response.content.decode()
+        assert 'users_request_duration_seconds_count{view="admin-user-list"} 1' in body
+        assert 'users_request_db_queries_bucket{view="admin-user-list",le="+Inf"} 1' in body
+        assert 'users_hashing_pool_rejected_total' in body
+        assert 'users_auth_cache_hits_total{layer="local"}' in body
+    
+    def test_metrics_requires_admin(self, authenticated_client):
+        """Verify standard users cannot read metrics."""
+        assert authenticated_client.get(reverse('admin-metrics')).status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_disabled_by_default(self, api_client, settings, created_user):
+        """Verify the middleware is skipped when instrumentation is off."""
+        settings.PERFORMANCE_INSTRUMENTATION = {
+            'ENABLED': False, 'SERVER_TIMING': True, 'LOG_THRESHOLD_MS': None
+        }
+        api_client.force_authenticate(user=created_user)
+        assert 'Server-Timing' not in api_client.get(reverse('user-profile'))
+
+
+@pytest.mark.django_db
+class TestQueryInspection:
+    """N+1 detection and slow-query logging for users app views."""
+    
+    @pytest.fixture(autouse=True)
+    def enabled(self, settings):
+        settings.QUERY_INSPECTION = {
+            'ENABLED': True, 'N_PLUS_ONE_THRESHOLD': 3, 'SLOW_QUERY_MS': None,
+            'EXPLAIN': True, 'RAISE': True,
+        }
+        return settings.QUERY_INSPECTION
+    
+    def test_query_shape(self):
+        """Verify literals and IN lists are normalized away."""
+        first = query_shape('SELECT * FROM t WHERE id IN (%s, %s) AND name = \'a\' LIMIT 21')
+        second = query_shape('SELECT * FROM t WHERE id IN (%s) AND name = \'b\' LIMIT 41')
+        assert first == second
+    
+    def test_list_has_no_repeated_queries(self, admin_client):
+        """Verify a JWT-authenticated admin list page stays free of N+1 queries."""
+        CustomUser.objects.bulk_create([
+            CustomUser(email=f'inspect{i}@example.com', full_name=f'Inspect {i}') for i in range(30)
+        ])
+        tokens = get_tokens_for_user(CustomUser.objects.get(role='admin'))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        
+        assert client.get(reverse('admin-user-list')).status_code == status.HTTP_200_OK
+    
+    def test_repeated_shape_raises(self, admin_client, enabled):
+        """Verify repeated shapes raise when RAISE is set."""
+        enabled['N_PLUS_ONE_THRESHOLD'] = 1
+        
+        with pytest.raises(NPlusOneDetected):
+            admin_client.get(reverse('admin-user-list'))
+    
+    def test_slow_query_logged_with_plan(self, admin_client, enabled, caplog):
+        """Verify slow queries are logged together with their EXPLAIN output."""
+        enabled['SLOW_QUERY_MS'] = 0
+        
+        with caplog.at_level('WARNING', logger='users.queries'):
+            admin_client.get(reverse('admin-user-list'))
+        
+        messages = [record.getMessage() for record in caplog.records]
+        assert any('Slow query' in m and 'not explained' not in m for m in messages)
+
+
+@pytest.mark.django_db
+class TestFastUserList:
+    """values_list + orjson rendering of the admin list and configurable page size."""
+    
+    @pytest.fixture
+    def tricky_users(self):
+        CustomUser.objects.bulk_create([
+            CustomUser(email='fast1@example.com', full_name='Zoë "Q" \\ \u2028 \x01 日本'),
+            CustomUser(email='fast2@example.com', full_name='Plain', last_login=timezone.now()),
+        ])
+    
+    def expected_results(self) -> bytes:
+        users = CustomUser.objects.order_by('-date_joined', '-id')[:10]
+        return JSONRenderer().render(UserListSerializer(users, many=True).data)
+    
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_matches_serializer_output(self, admin_user, tricky_users, monkeypatch, use_orjson):
+        """Verify sync and async bodies are byte-identical to the serializer + JSONRenderer path."""
+        if not use_orjson:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        token = f'Bearer {get_tokens_for_user(admin_user)["access"]}'
+        
+        response = APIClient().get(reverse('admin-user-list'), HTTP_AUTHORIZATION=token)
+        async_response = async_to_sync(AsyncClient().get)(
+            reverse('async-admin-user-list'), headers={'Authorization': token}
+        )
+        
+        assert response.content.endswith(b'"results":' + self.expected_results() + b'}')
+        assert async_response.content.endswith(b'"results":' + self.expected_results() + b'}')
+    
+    def test_page_size_param_and_cap(self, admin_client, settings):
+        """Verify ?page_size= is honored up to USER_LIST_MAX_PAGE_SIZE."""
+        CustomUser.objects.bulk_create([
+            CustomUser(email=f'page{i}@example.com', full_name=f'Page {i}') for i in range(12)
+        ])
+        settings.USER_LIST_PAGE_SIZE = 4
+        settings.USER_LIST_MAX_PAGE_SIZE = 8
+        url = reverse('admin-user-list')
+        
+        assert len(admin_client.get(url).data['results']) == 4
+        assert len(admin_client.get(url, {'page_size': 6}).data['results']) == 6
+        assert len(admin_client.get(url, {'page_size': 1000}).data['results']) == 8
+        for invalid in ('0', '-3', 'x'):
+            assert len(admin_client.get(url, {'page_size': invalid}).data['results']) == 4
+        response = admin_client.get(url, {'page_size': 8, 'pagination': 'cursor'})
+        assert len(response.data['results']) == 8
+        assert 'page_size=8' in response.data['next']
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """ETag revalidation of the profile and admin list."""
+    
+    def test_profile_not_modified_until_updated(self, authenticated_client, django_assert_num_queries,
+                                                django_capture_on_commit_callbacks):
+        """Verify an unchanged profile is a 304 without queries, and edits change the ETag."""
+        url = reverse('user-profile')
+        response = authenticated_client.get(url)
+        etag = response['ETag']
+        assert not response.has_header('Last-Modified')
+        assert 'private' in response['Cache-Control']
+        
+        with django_assert_num_queries(0):
+            response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        
+        # Stamps expire once the write commits
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.patch(url, {'full_name': 'Renamed'}, format='json')
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['full_name'] == 'Renamed'
+    
+    def test_list_etag_per_page_and_invalidated_by_writes(self, admin_client, created_user,
+                                                          django_capture_on_commit_callbacks):
+        """Verify list ETags differ per query and change after status updates and signups."""
+        url = reverse('admin-user-list')
+        etag = admin_client.get(url)['ETag']
+        assert admin_client.get(url, {'role': 'user'})['ETag'] != etag
+        assert admin_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.patch(reverse('admin-user-status', kwargs={'pk': created_user.id}),
+                               {'is_active': False}, format='json')
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        
+        etag = response['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            CustomUser.objects.create_user(email='late@example.com', password='LatePass123', full_name='Late')
+        assert admin_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+    
+    def test_rolled_back_write_keeps_stamp(self, created_user):
+        """Verify stamps expire on commit, not when a write that rolls back runs."""
+        stamp = resource_versions.get(created_user.pk)
+        
+        with pytest.raises(DatabaseError), transaction.atomic():
+            created_user.full_name = 'Never Saved'
+            created_user.save()
+            raise DatabaseError
+        
+        assert resource_versions.get(created_user.pk) == stamp
+    
+    def test_no_etag_without_shared_cache(self, authenticated_client, admin_client, settings):
+        """Verify per-process stamps are never used to answer 304."""
+        settings.SHARED_CACHE = False
+        
+        assert not authenticated_client.get(reverse('user-profile')).has_header('ETag')
+        assert not admin_client.get(reverse('admin-user-list')).has_header('ETag')
+    
+    def test_lost_version_never_serves_stale(self, admin_client):
+        """Verify a cleared cache yields a new ETag rather than a false 304."""
+        url = reverse('admin-user-list')
+        etag = admin_client.get(url)['ETag']
+        cache.clear()
+        
+        assert admin_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestUserListPageCache:
+    """Shared cache of rendered admin list pages."""
+    
+    @pytest.fixture(autouse=True)
+    def enabled(self, settings):
+        settings.USER_LIST_PAGE_CACHE = {'ENABLED': True, 'ALIAS': 'user_list_pages', 'TTL': 60}
+        user_list_pages.hits = user_list_pages.misses = 0
+    
+    def test_second_request_served_from_cache(self, admin_client, created_user, django_assert_num_queries):
+        """Verify a repeated page is identical and needs no queries; filters are cached separately."""
+        url = reverse('admin-user-list')
+        first = admin_client.get(url)
+        
+        with django_assert_num_queries(0):
+            second = admin_client.get(url)
+        admin_client.get(url, {'role': 'user'})
+        
+        assert second.status_code == status.HTTP_200_OK
+        assert second.content == first.content
+        assert second['Content-Type'] == 'application/json'
+        assert (user_list_pages.hits, user_list_pages.misses) == (1, 2)
+    
+    def test_writes_invalidate_pages(self, admin_client, created_user, django_capture_on_commit_callbacks):
+        """Verify status changes, profile edits and signups show up immediately."""
+        url = reverse('admin-user-list')
+        admin_client.get(url)
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.patch(reverse('admin-user-status', kwargs={'pk': created_user.id}),
+                               {'is_active': False}, format='json')
+        rows = {row['email']: row for row in admin_client.get(url).data['results']}
+        assert rows[created_user.email]['is_active'] is False
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            created_user.full_name = 'Edited Name'
+            created_user.save(update_fields=['full_name'])
+            CustomUser.objects.create_user(email='new@example.com', password='NewPass123', full_name='New')
+        rows = {row['email']: row for row in admin_client.get(url).data['results']}
+        assert rows[created_user.email]['full_name'] == 'Edited Name'
+        assert 'new@example.com' in rows
+        assert user_list_pages.hits == 0
+    
+    def test_off_without_shared_cache(self, admin_client, settings):
+        """Verify pages keyed by per-process stamps are never cached."""
+        settings.SHARED_CACHE = False
+        url = reverse('admin-user-list')
+        admin_client.get(url)
+        admin_client.get(url)
+        
+        assert user_list_pages.hits == user_list_pages.misses == 0
+    
+    def test_counters_in_metrics(self, admin_client):
+        """Verify hit/miss counters are exported for tuning."""
+        admin_client.get(reverse('admin-user-list'))
+        admin_client.get(reverse('admin-user-list'))
+        
+        body = admin_client.get(reverse('admin-metrics')).content.decode()
+        assert 'users_list_page_cache_hits_total 1.0' in body
+        assert 'users_list_page_cache_misses_total 1.0' in body
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+    """Token-bucket throttles on login and registration."""
+    
+    @pytest.fixture(autouse=True)
+    def rates(self, settings):
+        settings.AUTH_THROTTLE = {
+            'ENABLED': True,
+            'RATES': {'login_ip': '5/min', 'login_email': '2/min', 'register_ip': '1/hour'},
+        }
+        rejections.clear()
+    
+    def test_token_bucket_refills(self, monkeypatch):
+        """Verify burst capacity, rejection with a wait, and refill over time."""
+        now = [1_000_000.0]
+        monkeypatch.setattr('users.throttling.time.time', lambda: now[0])
+        
+        assert [token_buckets.consume('test', 3, 60) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert token_buckets.consume('test', 3, 60) == pytest.approx(20.0)
+        now[0] += 20
+        assert token_buckets.consume('test', 3, 60) == 0.0
+        assert token_buckets.consume('test', 3, 60) > 0
+    
+    def test_spoofed_forwarded_for_shares_bucket(self, api_client):
+        """Verify rotating X-Forwarded-For values does not yield fresh per-IP buckets."""
+        url = reverse('auth-register')
+        responses = [
+            api_client.post(url, {
+                'email': f'spoof{i}@example.com', 'password': 'SpoofPass123', 'full_name': 'Spoof'
+            }, format='json', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}')
+            for i in range(2)
+        ]
+        
+        assert responses[0].status_code == status.HTTP_201_CREATED
+        assert responses[1].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    
+    def test_login_rejected_before_db_and_hash(self, api_client, created_user, django_assert_num_queries):
+        """Verify the per-email bucket rejects with 429 and Retry-After, skipping all work."""
+        payload = {'email': created_user.email, 'password': 'WrongPass123'}
+        for _ in range(2):
+            api_client.post(reverse('auth-login'), payload, format='json')
+        
+        with django_assert_num_queries(0):
+            response = api_client.post(reverse('auth-login'), payload, format='json')
+        
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) > 0
+        other = {'email': 'other@example.com', 'password': 'WrongPass123'}
+        assert api_client.post(reverse('auth-login'), other, format='json').status_code == status.HTTP_401_UNAUTHORIZED
+        assert rejections['login_email'] == 1
+    
+    def test_async_routes_share_buckets(self, api_client, test_user_data):
+        """Verify sync and async registration draw from the same per-IP bucket."""
+        assert api_client.post(reverse('auth-register'), test_user_data, format='json').status_code == status.HTTP_201_CREATED
+        
+        response = async_to_sync(AsyncClient().post)(
+            reverse('async-auth-register'), {**test_user_data, 'email': 'second@example.com'},
+            content_type='application/json'
+        )
+        
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 'Retry-After' in response
+        assert not CustomUser.objects.filter(email='second@example.com').exists()
+    
+    def test_rejections_in_metrics(self, admin_client):
+        """Verify rejection counters are exported per scope."""
+        rejections['login_ip'] = 3
+        
+        body = admin_client.get(reverse('admin-metrics')).content.decode()
+        
+        assert 'users_throttle_rejected_total{scope="login_ip"} 3.0' in body
+
+
+class FakePool:
+    """Stands in for psycopg_pool.ConnectionPool."""
+    
+    def __init__(self):
+        self.checks = 0
+    
+    def get_stats(self) -> dict:
+        return {'pool_size': 4, 'pool_available': 1, 'requests_num': 50, 'requests_wait_ms': 1500}
+    
+    def check(self) -> None:
+        self.checks += 1
+
+
+@pytest.mark.django_db
+class TestConnectionPool:
+    """Pool metrics and background health checks."""
+    
+    def test_pool_metrics(self, admin_client, monkeypatch):
+        """Verify pool sizes and wait time are exported per alias when pooling is on."""
+        url = reverse('admin-metrics')
+        assert 'users_db_pool_size' not in admin_client.get(url).content.decode()
+        
+        monkeypatch.setattr(connection, 'pool', FakePool(), raising=False)
+        body = admin_client.get(url).content.decode()
+        
+        assert 'users_db_pool_size{alias="default"} 4.0' in body
+        assert 'users_db_pool_requests_total{alias="default"} 50.0' in body
+        assert 'users_db_pool_wait_seconds_total{alias="default"} 1.5' in body
+        assert 'users_db_pool_timeouts_total{alias="default"} 0.0' in body
+    
+    def test_background_health_checks(self, monkeypatch, settings):
+        """Verify pool.check() runs on the interval, started once per process."""
+        settings.DATABASE_POOL_CHECK_INTERVAL = 0.01
+        pool = FakePool()
+        monkeypatch.setattr(type(connections['default']), 'pool', pool, raising=False)
+        checker = PoolHealthChecker()
+        
+        checker.ensure_started('default')
+        checker.ensure_started('default')
+        time.sleep(0.2)
+        
+        assert pool.checks >= 2
+        assert sum(t.name == 'db-pool-check-default' for t in threading.enumerate()) == 1
+
+
+@pytest.fixture(scope='class')
+def replica_alias(django_db_setup, tmp_path_factory):
+    """
+    A second SQLite file registered as the replica alias. Class-scoped so it
+    exists before the test databases are chosen; after django_db_setup so
+    test database creation does not replace it.
+    """
+    path = tmp_path_factory.mktemp('replica') / 'replica.sqlite3'
+    connections.settings[REPLICA] = {**connections['default'].settings_dict, 'NAME': str(path)}
+    yield path
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+@pytest.mark.django_db(transaction=True, databases='__all__')
+@pytest.mark.usefixtures('replica_alias')
+class TestReadReplica:
+    """Admin reads from a replica with sticky primary reads after writes."""
+    
+    @pytest.fixture
+    def replica(self, replica_alias):
+        """Snapshot the primary into the replica file; call the value to replicate again."""
+        def replicate():
+            connections['default'].ensure_connection()
+            target = sqlite3.connect(replica_alias)
+            connections['default'].connection.backup(target)
+            target.close()
+        
+        replicate()
+        return replicate
+    
+    def create_late_user(self):
+        # Written to the primary after the snapshot: the replica lags behind
+        return CustomUser.objects.create_user(email='late@example.com', password='LatePass123', full_name='Late')
+    
+    def test_admin_list_reads_replica_until_own_write(self, admin_client, admin_user, created_user, replica):
+        """Verify the list comes from the replica, and from the primary right after the admin writes."""
+        self.create_late_user()
+        url = reverse('admin-user-list')
+        assert admin_client.get(url).data['count'] == 2
+        
+        response = admin_client.patch(reverse('admin-user-status', kwargs={'pk': created_user.id}),
+                                      {'is_active': False}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert primary_pins.is_pinned(admin_user.pk)
+        response = admin_client.get(url)
+        assert response.data['count'] == 3
+        assert {row['email']: row['is_active'] for row in response.data['results']}['test@example.com'] is False
+        
+        # Sticky window over: back on the (still lagging) replica
+        cache.clear()
+        assert admin_client.get(url).data['count'] == 2
+    
+    def test_export_and_async_list_read_replica(self, admin_client, admin_user, created_user, replica):
+        """Verify streamed exports and the async list also read the replica."""
+        self.create_late_user()
+        response = admin_client.get(reverse('admin-user-export'))
+        assert b'late@example.com' not in b''.join(response.streaming_content)
+        
+        token = str(get_tokens_for_user(admin_user)['access'])
+        response = async_to_sync(AsyncClient().get)(
+            reverse('async-admin-user-list'), headers={'Authorization': f'Bearer {token}'}
+        )
+        assert json.loads(response.content)['count'] == 2
+        
+        replica()
+        assert b'late@example.com' in b''.join(admin_client.get(reverse('admin-user-export')).streaming_content)
+    
+    def test_no_validators_while_replica_may_lag(self, admin_client, replica, settings):
+        """Verify replica reads within the sticky window of a write carry no ETag."""
+        url = reverse('admin-user-list')
+        response = admin_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.has_header('ETag')
+        
+        settings.DATABASE_REPLICA_STICKY_SECONDS = 0
+        assert admin_client.get(url).has_header('ETag')
+    
+    def test_router_keeps_writes_and_migrations_on_primary(self):
+        """Verify only routed reads reach the replica, and never after a write."""
+        router = ReplicaRouter()
+        assert router.allow_migrate(REPLICA, 'users') is False
+        assert router.db_for_read(CustomUser) is None
+        
+        with reads_from(REPLICA):
+            assert router.db_for_read(CustomUser) == REPLICA
+            assert router.db_for_write(CustomUser) is None
+            writes, token = start_write_tracking()
+            try:
+                router.db_for_write(CustomUser)
+                assert writes == {'users.CustomUser'}
+                assert router.db_for_read(CustomUser) is None
+            finally:
+                end_write_tracking(token)
+
+
+@pytest.mark.django_db
+class TestUserStats:
+    """Incrementally maintained dashboard statistics."""
+    
+    def assert_stats_match_table(self):
+        counters, days = aggregate_user_stats(CustomUser.objects.all())
+        assert dict(UserCounter.objects.values_list('name', 'value')) == counters
+        assert dict(UserSignupDay.objects.values_list('day', 'value')) == days
+    
+    def test_write_paths_keep_rollups_exact(self, admin_client, api_client, created_user, settings):
+        """Verify signups, bans, bulk bans, role changes, imports and deletes all update the rollups."""
+        settings.PASSWORD_HASHING = {'PBKDF2_ITERATIONS': 1000}
+        APIClient().post(reverse('auth-register'), {
+            'email': 'new@example.com', 'password': 'NewPass1234', 'full_name': 'New User'
+        }, format='json')
+        admin_client.patch(reverse('admin-user-status', kwargs={'pk': created_user.id}),
+                           {'is_active': False}, format='json')
+        self.assert_stats_match_table()
+        
+        newcomer = CustomUser.objects.get(email='new@example.com')
+        admin_client.post(reverse('admin-user-bulk-status'),
+                          {'is_active': False, 'ids': [str(newcomer.id)]}, format='json')
+        newcomer = CustomUser.objects.get(pk=newcomer.pk)
+        newcomer.role = 'admin'
+        newcomer.save()
+        upload = SimpleUploadedFile('users.csv', b'email,full_name,password\nimp@example.com,Imp,ImportPass123\n')
+        admin_client.post(reverse('admin-user-import'), {'file': upload}, format='multipart')
+        create_users(5, start=100, batch_size=2)
+        self.assert_stats_match_table()
+        
+        created_user.delete()
+        self.assert_stats_match_table()
+        assert UserCounter.objects.get(name='total').value == 8
+    
+    def test_narrow_saves_skip_stats(self, created_user, django_assert_num_queries):
+        """Verify saves that cannot move a counter issue no stats query."""
+        user = CustomUser.objects.only('id', 'full_name').get(pk=created_user.pk)
+        with django_assert_num_queries(1):
+            user.full_name = 'Renamed'
+            user.save(update_fields=['full_name'])
+    
+    def test_stats_endpoint_reads_rollups(self, admin_client, created_user, django_assert_num_queries):
+        """Verify the endpoint costs two queries and zero-fills the signup window."""
+        url = reverse('admin-user-stats')
+        with django_assert_num_queries(2):
+            response = admin_client.get(url, {'days': 7})
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.data
+        assert (data['total'], data['active'], data['banned'], data['admins'], data['users']) == (2, 2, 0, 1, 1)
+        assert len(data['signups']) == 7
+        assert data['signups'][-1] == {'date': signup_day(created_user.date_joined).isoformat(), 'count': 2}
+        assert sum(day['count'] for day in data['signups']) == 2
+        assert len(admin_client.get(url).data['signups']) == 30
+        assert len(admin_client.get(url, {'days': 1000}).data['signups']) == 365
+        for invalid in ('x', '0'):
+            response = admin_client.get(url, {'days': invalid})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert 'days' in response.data
+    
+    def test_stats_requires_admin(self, authenticated_client):
+        """Verify standard users cannot read stats."""
+        response = authenticated_client.get(reverse('admin-user-stats'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_rebuild_command_repairs_drift(self, created_user, admin_user):
+        """Verify the rebuild command recomputes the rollups and reports drift."""
+        UserCounter.objects.filter(name='total').update(value=99)
+        UserSignupDay.objects.all().delete()
+        out = StringIO()
+        
+        call_command('rebuild_user_stats', stdout=out)
+        
+        assert 'total: 99 -> 2' in out.getvalue()
+        self.assert_stats_match_table()
+        call_command('rebuild_user_stats', stdout=out)
+        assert 'no drift' in out.getvalue()
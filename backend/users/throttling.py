@@ -0,0 +1,166 @@
+import hashlib
+import math
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+# =============================================================================
+# TOKEN BUCKET STORE
+# =============================================================================
+
+def parse_rate(rate: str) -> tuple:
+    """'10/min' -> (10, 60): bucket capacity and seconds to refill it fully."""
+    count, period = rate.split('/')
+    return int(count), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+class TokenBucketStore:
+    """
+    Token buckets kept as one integer per key in the shared cache.
+
+    The integer is the bucket's theoretical arrival time (GCRA) in ms: each
+    request advances it by one token's refill interval with an atomic
+    incr(), and is rejected if that pushes it more than a full bucket past
+    now. Works with any cache that implements incr (locmem, Redis).
+    Concurrent requests can only race while a bucket is full, which may let
+    a few extra through then, never while it is draining.
+    """
+
+    key_prefix = 'users:throttle:'
+
+    def _plan(self, limit: int, period: int) -> tuple:
+        interval = max(1, period * 1000 // limit)
+        return int(time.time() * 1000), interval, limit * interval, period + 1
+
+    def _decide(self, tat: int, now: int, interval: int, burst: int):
+        """Returns (wait seconds or 0, action) for a post-incr arrival time."""
+        if tat - interval < now:
+            # The bucket had refilled completely; restart it from now
+            return 0.0, 'reset'
+        if tat - now > burst:
+            return (tat - now - burst) / 1000, 'undo'
+        return 0.0, 'touch'
+
+    def consume(self, key: str, limit: int, period: int) -> float:
+        """Take one token; returns 0 if allowed, else seconds until one frees up."""
+        now, interval, burst, ttl = self._plan(limit, period)
+        key = f'{self.key_prefix}{key}'
+        if cache.add(key, now + interval, ttl):
+            return 0.0
+        try:
+            tat = cache.incr(key, interval)
+        except ValueError:  # expired since add()
+            cache.set(key, now + interval, ttl)
+            return 0.0
+
+        wait, action = self._decide(tat, now, interval, burst)
+        if action == 'reset':
+            cache.set(key, now + interval, ttl)
+        elif action == 'undo':
+            # Rejected requests don't spend tokens
+            cache.decr(key, interval)
+        else:
+            cache.touch(key, math.ceil((tat - now) / 1000) + 1)
+        return wait
+
+    async def aconsume(self, key: str, limit: int, period: int) -> float:
+        """Async variant of consume() for the ASGI views."""
+        now, interval, burst, ttl = self._plan(limit, period)
+        key = f'{self.key_prefix}{key}'
+        if await cache.aadd(key, now + interval, ttl):
+            return 0.0
+        try:
+            tat = await cache.aincr(key, interval)
+        except ValueError:
+            await cache.aset(key, now + interval, ttl)
+            return 0.0
+
+        wait, action = self._decide(tat, now, interval, burst)
+        if action == 'reset':
+            await cache.aset(key, now + interval, ttl)
+        elif action == 'undo':
+            await cache.adecr(key, interval)
+        else:
+            await cache.atouch(key, math.ceil((tat - now) / 1000) + 1)
+        return wait
+
+
+token_buckets = TokenBucketStore()
+
+# Rejections per scope in this process; each one is a password hash not run
+rejections = Counter()
+
+
+# =============================================================================
+# DRF THROTTLES
+# =============================================================================
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle with its rate in AUTH_THROTTLE['RATES'][scope].
+    DRF checks throttles before the handler runs, so a rejected login or
+    signup costs no query and no hash. The async views call
+    aallow_request() with the parsed body instead.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def bucket_ident(self, request, data):
+        """Bucket identity for this request, or None to skip throttling."""
+        return self.get_ident(request)
+
+    def bucket(self, request, data):
+        config = settings.AUTH_THROTTLE
+        rate = config['RATES'].get(self.scope)
+        if not config['ENABLED'] or not rate:
+            return None
+        ident = self.bucket_ident(request, data)
+        if not ident:
+            return None
+        return (f'{self.scope}:{ident}', *parse_rate(rate))
+
+    def record(self, wait: float) -> bool:
+        if wait:
+            self.wait_seconds = wait
+            rejections[self.scope] += 1
+            return False
+        return True
+
+    def allow_request(self, request, view) -> bool:
+        bucket = self.bucket(request, request.data)
+        return bucket is None or self.record(token_buckets.consume(*bucket))
+
+    async def aallow_request(self, request, data) -> bool:
+        bucket = self.bucket(request, data)
+        return bucket is None or self.record(await token_buckets.aconsume(*bucket))
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    """Per-account bucket; spreading a guess list over many IPs still hits it."""
+
+    scope = 'login_email'
+
+    def bucket_ident(self, request, data):
+        email = data.get('email') if hasattr(data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Hashed: keys stay short and valid whatever the client sends
+        return hashlib.sha1(email.strip().lower().encode()).hexdigest()
+
+
+class RegisterIPThrottle(TokenBucketThrottle):
+    scope = 'register_ip'
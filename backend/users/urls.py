@@ -1,18 +1,35 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from .async_views import (
+    AsyncRegisterView,
+    AsyncLoginView,
+    AsyncAdminUserListView,
+    AsyncUserProfileView
+)
 from .views import (
     RegisterView,
     LoginView,
     AdminUserListView,
     UserStatusUpdateView,
+    BulkUserStatusUpdateView,
+    UserImportView,
+    UserExportView,
+    UserStatsView,
+    MetricsView,
     UserProfileView,
     ChangePasswordView
 )
 
+# ASYNC_VIEWS serves the async-native register/login on the primary routes (run
+# under ASGI). Profile and the admin list keep their sync views there: the async
+# variants lack ETags, cursor pagination and the page cache.
+async_views = settings.ASYNC_VIEWS
+
 urlpatterns = [
     # Auth endpoints
-    path('register/', RegisterView.as_view(), name='auth-register'),
-    path('login/', LoginView.as_view(), name='auth-login'),
+    path('register/', (AsyncRegisterView if async_views else RegisterView).as_view(), name='auth-register'),
+    path('login/', (AsyncLoginView if async_views else LoginView).as_view(), name='auth-login'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
     
     # User profile
@@ -22,4 +39,15 @@ urlpatterns = [
     # Admin endpoints
     path('admin/users/', AdminUserListView.as_view(), name='admin-user-list'),
     path('admin/users/<uuid:pk>/status/', UserStatusUpdateView.as_view(), name='admin-user-status'),
+    path('admin/users/status/', BulkUserStatusUpdateView.as_view(), name='admin-user-bulk-status'),
+    path('admin/users/import/', UserImportView.as_view(), name='admin-user-import'),
+    path('admin/users/export/', UserExportView.as_view(), name='admin-user-export'),
+    path('admin/users/stats/', UserStatsView.as_view(), name='admin-user-stats'),
+    path('admin/metrics/', MetricsView.as_view(), name='admin-metrics'),
+    
+    # Async variants, always reachable for side-by-side rollout
+    path('async/register/', AsyncRegisterView.as_view(), name='async-auth-register'),
+    path('async/login/', AsyncLoginView.as_view(), name='async-auth-login'),
+    path('async/profile/', AsyncUserProfileView.as_view(), name='async-user-profile'),
+    path('async/admin/users/', AsyncAdminUserListView.as_view(), name='async-admin-user-list'),
 ]
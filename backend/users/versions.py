@@ -0,0 +1,79 @@
+import time
+from zlib import crc32
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .routers import replica_may_lag
+
+
+class ResourceVersions:
+    """
+    Change stamps for conditional GETs: one per user (profile) and one for
+    the whole users table (admin list), kept in the shared cache.
+
+    A stamp is the time it was first read after the last change. Writes
+    delete stamps once they commit instead of incrementing them, so an
+    evicted, expired or lost entry can only cost a full 200 response, never
+    a stale 304. A delete reaches only the cache the writer sees, so ETags
+    are emitted only with SHARED_CACHE. Validation is by ETag only:
+    Last-Modified has whole-second precision, so two stamps in the same
+    second would compare equal.
+    """
+
+    key_prefix = 'users:version:'
+    table = 'table'
+
+    def _key(self, name) -> str:
+        return f'{self.key_prefix}{name}'
+
+    def get(self, name) -> int:
+        key = self._key(name)
+        stamp = cache.get(key)
+        if stamp is None:
+            fresh = time.time_ns()
+            # add() so concurrent first readers agree on one stamp
+            cache.add(key, fresh, settings.RESOURCE_VERSION_TTL)
+            stamp = cache.get(key, fresh)
+        return stamp
+
+    def touch(self, user_ids=()) -> None:
+        """
+        Expire the table stamp and those of the given users after the current
+        transaction commits (immediately outside one). Expiring earlier would
+        let a concurrent reader stamp data from before the commit, and a
+        rollback would rotate stamps for nothing.
+        """
+        keys = [self._key(self.table), *(self._key(pk) for pk in user_ids)]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+resource_versions = ResourceVersions()
+
+
+def request_stamp(request, name) -> int:
+    # The ETag and the page cache key share one read per request
+    stamps = request.__dict__.setdefault('_resource_stamps', {})
+    if name not in stamps:
+        stamps[name] = resource_versions.get(name)
+    return stamps[name]
+
+
+def profile_etag(request, *args, **kwargs):
+    if not settings.SHARED_CACHE:
+        # Other workers would keep their own stamps and answer 304 after a change
+        return None
+    return f'profile-{request.user.pk}-{request_stamp(request, request.user.pk)}'
+
+
+def user_list_etag(request, *args, **kwargs):
+    if not settings.SHARED_CACHE:
+        return None
+    stamp = request_stamp(request, resource_versions.table)
+    if replica_may_lag(stamp):
+        # The replica may not have the write yet; don't let clients keep this page
+        return None
+    # Page, filters and renderer are part of the representation
+    variant = f'{request.get_full_path()}|{request.accepted_renderer.format}'
+    return f'users-{stamp}-{crc32(variant.encode()):08x}'
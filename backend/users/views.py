@@ -1,20 +1,55 @@
+import io
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from .authentication import add_user_claims, resolve_user, token_versions, user_cache
+from .exporting import EXPORT_FORMATS, iter_export
+from .hashing import hashing_pool
+from .importing import UserImporter, detect_format, iter_rows
+from .instrumentation import registry, render_gauges
+from .last_login import last_login_buffer
 from .models import CustomUser
+from .page_cache import user_list_pages
+from .pagination import get_user_list_pagination_class
 from .permissions import IsAdminRole
+from .pooling import pool_stats
+from .renderers import FastJSONRenderer
+from .routers import ReplicaReadMixin
+from .search import filter_users
 from .serializers import (
     UserRegistrationSerializer,
     UserResponseSerializer,
     UserListSerializer,
+    UserStatsQuerySerializer,
     UserStatusSerializer,
+    BulkUserStatusSerializer,
     UserProfileSerializer,
     ChangePasswordSerializer,
-    get_tokens_for_user
+    get_tokens_for_user,
+    user_list_data
+)
+from .stats import user_stats
+from .throttling import LoginEmailThrottle, LoginIPThrottle, RegisterIPThrottle, rejections
+from .versions import (
+    profile_etag,
+    resource_versions,
+    user_list_etag
 )
 
 
@@ -26,11 +61,15 @@ class RegisterView(generics.CreateAPIView):
     """
     Public endpoint for user registration.
     Returns JWT tokens immediately for seamless auto-login after signup.
+    Throttled per IP before any validation query or password hash.
     """
     
     queryset = CustomUser.objects.all()
     serializer_class = UserRegistrationSerializer
+    # Public: no token lookup before the throttle runs
+    authentication_classes = []
     permission_classes = [AllowAny]
+    throttle_classes = [RegisterIPThrottle]
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -52,57 +91,107 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     Updates last_login timestamp for audit trail.
     """
     
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+    
     def validate(self, attrs: dict) -> dict:
         data = super().validate(attrs)
         
-        # Update last_login for user activity tracking
+        # Update last_login for user activity tracking; buffered writes
+        # coalesce per user and flush in bulk instead of one UPDATE per login
         self.user.last_login = timezone.now()
-        self.user.save(update_fields=['last_login'])
+        if last_login_buffer.enabled:
+            last_login_buffer.record(self.user.pk, self.user.last_login)
+        else:
+            self.user.save(update_fields=['last_login'])
         
-        data['user'] = {
-            'id': str(self.user.id),
-            'email': self.user.email,
-            'full_name': self.user.full_name,
-            'role': self.user.role,
-        }
+        data['user'] = self.get_user_data(self.user)
         
         return data
+    
+    @staticmethod
+    def get_user_data(user: CustomUser) -> dict:
+        return {
+            'id': str(user.id),
+            'email': user.email,
+            'full_name': user.full_name,
+            'role': user.role,
+        }
 
 
 class LoginView(TokenObtainPairView):
     """
     JWT login endpoint.
     Returns access/refresh tokens plus user role for RBAC.
+    Throttled per IP and per email before the password hash runs.
     """
     
     serializer_class = CustomTokenObtainPairSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
 
 # =============================================================================
 # ADMIN VIEWS
 # =============================================================================
 
-class AdminUserListView(generics.ListAPIView):
+class AdminUserListView(ReplicaReadMixin, generics.ListAPIView):
     """
     Paginated user list for admin dashboard.
     Uses field-level optimization to prevent SELECT * bloat.
+    Supports page-number and keyset (cursor) pagination modes, indexed
+    ?search= and role/is_active/last_login filters, and ?page_size= up to
+    USER_LIST_MAX_PAGE_SIZE. Rows are rendered from values_list tuples
+    (same schema as UserListSerializer) and encoded with orjson if present.
+    GETs carry an ETag from the users-table version, so an
+    unchanged page is answered 304 without touching the database, and
+    rendered pages can be shared through USER_LIST_PAGE_CACHE. Rows and
+    counts are read from the replica when DATABASE_REPLICA_URL is set.
     """
     
     serializer_class = UserListSerializer
     permission_classes = [IsAdminRole]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = get_user_list_pagination_class(self.request)()
+        return self._paginator
     
     def get_queryset(self):
-        # .only() reduces memory footprint for large datasets
-        return CustomUser.objects.only(
-            'id', 'full_name', 'email', 'role', 'is_active', 'last_login'
-        ).order_by('-date_joined')
+        # id breaks ties between users who joined at the same instant
+        queryset = CustomUser.objects.order_by('-date_joined', '-id')
+        return filter_users(queryset, self.request.query_params)
+    
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=user_list_etag))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    def list(self, request, *args, **kwargs):
+        cache_key = user_list_pages.key(request)
+        if cache_key is not None:
+            content = user_list_pages.get(cache_key)
+            if content is not None:
+                return HttpResponse(content, content_type=request.accepted_renderer.media_type)
+        
+        # Named rows, so cursor pagination can read date_joined for positions
+        rows = self.paginate_queryset(self.get_queryset().values_list(
+            *UserListSerializer.Meta.fields, 'date_joined', named=True
+        ))
+        response = self.get_paginated_response(user_list_data(rows))
+        if cache_key is not None:
+            response.add_post_render_callback(lambda r: user_list_pages.set(cache_key, r.content))
+        return response
 
 
 class UserStatusUpdateView(generics.UpdateAPIView):
     """
     Toggle user active status (ban/unban).
     Admin-only endpoint with self-lockout protection.
+    Writes with one conditional UPDATE and no preceding SELECT.
     """
     
     queryset = CustomUser.objects.all()
@@ -111,16 +200,258 @@ class UserStatusUpdateView(generics.UpdateAPIView):
     lookup_field = 'pk'
     
     def update(self, request, *args, **kwargs):
-        target_user = self.get_object()
+        pk = self.kwargs[self.lookup_field]
         
         # Prevent admin self-lockout
-        if target_user.id == request.user.id:
+        if pk == request.user.id:
             return Response(
                 {'detail': 'Cannot modify your own status.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        return super().update(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, partial=kwargs.get('partial', False))
+        serializer.is_valid(raise_exception=True)
+        if 'is_active' not in serializer.validated_data:
+            # Empty PATCH: nothing to write, report the current status
+            return Response(self.get_serializer(self.get_object()).data)
+        
+        is_active = serializer.validated_data['is_active']
+        # UPDATE ... WHERE id = pk AND is_active != new; the token_version bump
+        # revokes stateless access tokens in the same statement
+        with transaction.atomic(savepoint=False):
+            updated = CustomUser.objects.filter(pk=pk).exclude(is_active=is_active).update(
+                is_active=is_active, token_version=F('token_version') + 1
+            )
+            user_stats.record_status_change(updated, is_active)
+        if updated:
+            # QuerySet.update() skips post_save, so invalidate explicitly
+            user_cache.invalidate(pk)
+            token_versions.forget([pk])
+            resource_versions.touch([pk])
+        elif not CustomUser.objects.filter(pk=pk).exists():
+            raise NotFound()
+        
+        return Response({'is_active': is_active})
+
+
+class BulkUserStatusUpdateView(generics.GenericAPIView):
+    """
+    Ban/activate many users with one set-based UPDATE.
+    Targets are explicit IDs or a filter (email domain, role, joined before).
+    The requesting admin is always skipped, and every ID gets a result:
+    updated, unchanged, not_found or forbidden_self.
+    """
+    
+    serializer_class = BulkUserStatusSerializer
+    permission_classes = [IsAdminRole]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        is_active = data['is_active']
+        
+        if 'ids' in data:
+            results = self.resolve_ids(data['ids'], is_active)
+        else:
+            results = self.resolve_filter(data['filter'], is_active)
+        
+        to_update = [pk for pk, result in results.items() if result == 'updated']
+        updated = 0
+        if to_update:
+            # Bumping token_version revokes stateless tokens in the same statement
+            with transaction.atomic(savepoint=False):
+                updated = CustomUser.objects.filter(pk__in=to_update).exclude(
+                    is_active=is_active
+                ).update(is_active=is_active, token_version=F('token_version') + 1)
+                user_stats.record_status_change(updated, is_active)
+            # QuerySet.update() skips post_save, so invalidate explicitly
+            user_cache.invalidate_many(to_update)
+            token_versions.forget(to_update)
+            resource_versions.touch(to_update)
+        
+        return Response({
+            'is_active': is_active,
+            'updated': updated,
+            'results': {str(pk): result for pk, result in results.items()},
+        }, status=status.HTTP_200_OK)
+    
+    def resolve_ids(self, ids, is_active) -> dict:
+        current = dict(CustomUser.objects.filter(pk__in=ids).values_list('pk', 'is_active'))
+        results = {}
+        for pk in ids:
+            if pk == self.request.user.id:
+                results[pk] = 'forbidden_self'
+            elif pk not in current:
+                results[pk] = 'not_found'
+            elif current[pk] == is_active:
+                results[pk] = 'unchanged'
+            else:
+                results[pk] = 'updated'
+        return results
+    
+    def resolve_filter(self, criteria, is_active) -> dict:
+        queryset = CustomUser.objects.exclude(is_active=is_active)
+        if 'email_domain' in criteria:
+            queryset = queryset.filter(email__iendswith='@' + criteria['email_domain'].lstrip('@'))
+        if 'role' in criteria:
+            queryset = queryset.filter(role=criteria['role'])
+        if 'joined_before' in criteria:
+            queryset = queryset.filter(date_joined__lt=criteria['joined_before'])
+        
+        limit = BulkUserStatusSerializer.MAX_IDS
+        matched = list(queryset.values_list('pk', flat=True)[:limit + 1])
+        if len(matched) > limit:
+            raise ValidationError({'filter': [f'Matches more than {limit} users; narrow the filter.']})
+        
+        return {
+            pk: 'forbidden_self' if pk == self.request.user.id else 'updated'
+            for pk in matched
+        }
+
+
+class UserImportView(generics.GenericAPIView):
+    """
+    Bulk import users from an uploaded CSV or JSONL file.
+    The upload is streamed row by row into the batched importer; hashing runs
+    on threads so the request worker does not fork.
+    """
+    
+    permission_classes = [IsAdminRole]
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': ['No file was submitted.']})
+        
+        file_format = request.data.get('format') or detect_format(upload.name)
+        if file_format not in ('csv', 'jsonl'):
+            raise ValidationError({'format': ['Expected csv or jsonl.']})
+        
+        try:
+            batch_size = int(request.data.get('batch_size', 1000))
+        except ValueError:
+            batch_size = 0
+        if batch_size < 1:
+            raise ValidationError({'batch_size': ['Must be a positive integer.']})
+        
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        importer = UserImporter(batch_size=batch_size, use_processes=False, max_errors=100)
+        try:
+            report = importer.run(iter_rows(stream, file_format))
+        except UnicodeDecodeError:
+            # Batches before the undecodable one are already committed
+            raise ValidationError({
+                'file': ['File is not valid UTF-8.'],
+                'processed': importer.processed,
+                'created': importer.created,
+            })
+        
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class UserExportView(ReplicaReadMixin, APIView):
+    """
+    Stream the full user directory as CSV (default) or JSONL (?output=jsonl).
+    Rows come from a server-side cursor, so memory stays flat at any table size,
+    on the replica when one is configured.
+    """
+    
+    permission_classes = [IsAdminRole]
+    
+    def get(self, request, *args, **kwargs):
+        # ?format= is reserved for DRF's renderer negotiation
+        file_format = request.query_params.get('output', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({'output': ['Expected csv or jsonl.']})
+        
+        response = StreamingHttpResponse(
+            iter_export(file_format, using=self.read_alias), content_type=EXPORT_FORMATS[file_format]
+        )
+        filename = f'users-{timezone.now():%Y%m%d}.{file_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Let reverse proxies pass chunks through instead of buffering the body
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class UserStatsView(ReplicaReadMixin, APIView):
+    """
+    Dashboard totals (active/banned, admins/users) and daily signups for the
+    last ?days= days (default 30, up to 365), read from the rollup tables:
+    two small queries however many users exist.
+    """
+    
+    permission_classes = [IsAdminRole]
+    MAX_DAYS = 365
+    
+    def get(self, request, *args, **kwargs):
+        serializer = UserStatsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        days = min(serializer.validated_data['days'], self.MAX_DAYS)
+        return Response(user_stats.read(days))
+
+
+class MetricsView(APIView):
+    """
+    Prometheus text exposition of this worker's request histograms plus
+    hashing pool, last_login buffer, cache, throttle and DB pool counters.
+    """
+    
+    permission_classes = [IsAdminRole]
+    
+    def get(self, request, *args, **kwargs):
+        pool = hashing_pool.stats()
+        login_buffer = last_login_buffer.stats()
+        lines = registry.render()
+        lines += render_gauges('users_hashing_pool_in_flight', 'Hashes running or queued', {'': pool['in_flight']})
+        lines += render_gauges('users_hashing_pool_queue_depth', 'Hashes waiting for a worker', {'': pool['queue_depth']})
+        lines += render_gauges('users_hashing_pool_completed_total', 'Hashes completed', {'': pool['completed']}, 'counter')
+        lines += render_gauges('users_hashing_pool_rejected_total', 'Hashes rejected with 503', {'': pool['rejected']}, 'counter')
+        lines += render_gauges('users_hashing_pool_timed_out_total', 'Hashes abandoned after TIMEOUT', {'': pool['timed_out']}, 'counter')
+        lines += render_gauges('users_hashing_pool_wait_seconds_total', 'Time spent in the hashing pool', {'': pool['wait_seconds_total']}, 'counter')
+        lines += render_gauges('users_last_login_pending', 'Buffered last_login values', {'': login_buffer['pending']})
+        lines += render_gauges('users_last_login_flushes_total', 'last_login buffer flushes', {'': login_buffer['flushes']}, 'counter')
+        lines += render_gauges('users_last_login_rows_written_total', 'last_login rows written', {'': login_buffer['rows_written']}, 'counter')
+        lines += render_gauges('users_auth_cache_hits_total', 'Auth user cache hits', {
+            f'layer="{layer}"': count for layer, count in user_cache.hits.items()
+        }, 'counter')
+        lines += render_gauges('users_auth_cache_misses_total', 'Auth user cache misses', {'': user_cache.misses}, 'counter')
+        lines += render_gauges('users_throttle_rejected_total', 'Auth requests rejected before hashing', {
+            f'scope="{scope}"': rejections[scope] for scope in settings.AUTH_THROTTLE['RATES']
+        }, 'counter')
+        lines += render_gauges('users_list_page_cache_hits_total', 'Admin list page cache hits', {'': user_list_pages.hits}, 'counter')
+        lines += render_gauges('users_list_page_cache_misses_total', 'Admin list page cache misses', {'': user_list_pages.misses}, 'counter')
+        lines += self.pool_lines()
+        
+        return HttpResponse(
+            '\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+    
+    # (metric, help, psycopg_pool stat, scale, type)
+    POOL_METRICS = [
+        ('users_db_pool_size', 'Open pooled connections', 'pool_size', 1, 'gauge'),
+        ('users_db_pool_available', 'Idle pooled connections', 'pool_available', 1, 'gauge'),
+        ('users_db_pool_requests_waiting', 'Requests waiting for a connection', 'requests_waiting', 1, 'gauge'),
+        ('users_db_pool_requests_total', 'Connection checkouts', 'requests_num', 1, 'counter'),
+        ('users_db_pool_requests_queued_total', 'Checkouts that had to wait', 'requests_queued', 1, 'counter'),
+        ('users_db_pool_wait_seconds_total', 'Time spent waiting for a connection', 'requests_wait_ms', 0.001, 'counter'),
+        ('users_db_pool_timeouts_total', 'Checkouts that timed out', 'requests_errors', 1, 'counter'),
+        ('users_db_pool_connections_lost_total', 'Connections found broken', 'connections_lost', 1, 'counter'),
+    ]
+    
+    def pool_lines(self) -> list:
+        stats = {alias: pool_stats(alias) for alias in settings.DATABASES}
+        stats = {alias: values for alias, values in stats.items() if values is not None}
+        if not stats:
+            return []
+        lines = []
+        for name, help_text, key, scale, metric_type in self.POOL_METRICS:
+            lines += render_gauges(name, help_text, {
+                f'alias="{alias}"': values.get(key, 0) * scale for alias, values in stats.items()
+            }, metric_type)
+        return lines
 
 
 # =============================================================================
@@ -131,14 +462,20 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     """
     Authenticated user's own profile.
     Users can update their email and full_name only.
+    GETs are conditional on the user's version stamp (ETag).
     """
     
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
     
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=profile_etag))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_object(self):
         # Returns the authenticated user's own record
-        return self.request.user
+        return resolve_user(self.request.user)
 
 
 class ChangePasswordView(generics.GenericAPIView):
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { Users, ChevronLeft, ChevronRight, RefreshCw } from 'lucide-react';
+import { Users, ChevronLeft, ChevronRight, RefreshCw, Search, UserCheck, UserX, Shield } from 'lucide-react';
 import axiosInstance from '../../utils/axiosInstance';
 import ConfirmationModal from '../../components/ConfirmationModal';
 import toast from 'react-hot-toast';
@@ -8,22 +8,43 @@ const Dashboard = () => {
     const [users, setUsers] = useState([]);
     const [currentPage, setCurrentPage] = useState(1);
     const [totalCount, setTotalCount] = useState(0);
+    // Server may return an estimated/capped count (or none) on large tables
+    const [countIsApproximate, setCountIsApproximate] = useState(false);
+    const [hasNext, setHasNext] = useState(false);
     const [isLoading, setIsLoading] = useState(true);
 
+    // Totals and daily signups from the stats rollups (constant cost at any table size)
+    const [stats, setStats] = useState(null);
+
+    // Server-side search/filters
+    const [searchInput, setSearchInput] = useState('');
+    const [search, setSearch] = useState('');
+    const [statusFilter, setStatusFilter] = useState('');
+
     // Modal state
     const [modalOpen, setModalOpen] = useState(false);
     const [selectedUser, setSelectedUser] = useState(null);
     const [pendingAction, setPendingAction] = useState(null);
 
+    // Bulk selection (current page); applied with one request
+    const [selectedIds, setSelectedIds] = useState([]);
+    const [isBulkAction, setIsBulkAction] = useState(false);
+
     const pageSize = 10;
-    const totalPages = Math.ceil(totalCount / pageSize);
+    const totalPages = totalCount === null ? null : Math.ceil(totalCount / pageSize);
 
     const fetchUsers = async (page = 1) => {
         setIsLoading(true);
         try {
-            const response = await axiosInstance.get(`/auth/admin/users/?page=${page}`);
+            const params = new URLSearchParams({ page });
+            if (search) params.set('search', search);
+            if (statusFilter) params.set('is_active', statusFilter);
+            const response = await axiosInstance.get(`/auth/admin/users/?${params}`);
             setUsers(response.data.results);
             setTotalCount(response.data.count);
+            setCountIsApproximate(!!response.data.count_is_approximate);
+            setHasNext(!!response.data.next);
+            setSelectedIds([]);
         } catch (err) {
             toast.error('Failed to fetch users');
         } finally {
@@ -31,9 +52,37 @@ const Dashboard = () => {
         }
     };
 
+    const fetchStats = async () => {
+        try {
+            const response = await axiosInstance.get('/auth/admin/users/stats/');
+            setStats(response.data);
+        } catch (err) {
+            // Stats are supplementary; the user table still works without them
+            setStats(null);
+        }
+    };
+
+    const refresh = () => {
+        fetchUsers(currentPage);
+        fetchStats();
+    };
+
     useEffect(() => {
         fetchUsers(currentPage);
-    }, [currentPage]);
+    }, [currentPage, search, statusFilter]);
+
+    useEffect(() => {
+        fetchStats();
+    }, []);
+
+    // Debounce typing so each keystroke doesn't hit the API
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            setSearch(searchInput.trim());
+            setCurrentPage(1);
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [searchInput]);
 
     const handleStatusToggle = (user) => {
         setSelectedUser(user);
@@ -41,7 +90,47 @@ const Dashboard = () => {
         setModalOpen(true);
     };
 
+    const toggleSelected = (userId) => {
+        setSelectedIds((ids) =>
+            ids.includes(userId) ? ids.filter((id) => id !== userId) : [...ids, userId]
+        );
+    };
+
+    const toggleSelectAll = () => {
+        setSelectedIds((ids) => (ids.length === users.length ? [] : users.map((u) => u.id)));
+    };
+
+    const handleBulkAction = (action) => {
+        setIsBulkAction(true);
+        setPendingAction(action);
+        setModalOpen(true);
+    };
+
+    const confirmBulkStatusChange = async () => {
+        try {
+            const response = await axiosInstance.post('/auth/admin/users/status/', {
+                is_active: pendingAction === 'activate',
+                ids: selectedIds,
+            });
+
+            const skipped = Object.values(response.data.results).filter((r) => r === 'forbidden_self').length;
+            toast.success(
+                `${response.data.updated} user(s) ${pendingAction === 'ban' ? 'banned' : 'activated'}` +
+                (skipped ? ' (your own account was skipped)' : '')
+            );
+
+            refresh();
+        } catch (err) {
+            const message = err.response?.data?.detail || 'Action failed';
+            toast.error(message);
+        }
+
+        setIsBulkAction(false);
+        setPendingAction(null);
+    };
+
     const confirmStatusChange = async () => {
+        if (isBulkAction) return confirmBulkStatusChange();
         if (!selectedUser) return;
 
         try {
@@ -55,7 +144,7 @@ const Dashboard = () => {
                     : `${selectedUser.full_name} has been activated`
             );
 
-            fetchUsers(currentPage);
+            refresh();
         } catch (err) {
             const message = err.response?.data?.detail || 'Action failed';
             toast.error(message);
@@ -65,6 +154,14 @@ const Dashboard = () => {
         setPendingAction(null);
     };
 
+    const formatCount = (count) => {
+        if (count === null) return 'Many';
+        return countIsApproximate ? `${count.toLocaleString()}+` : count.toLocaleString();
+    };
+
+    // Tallest bar in the signup chart
+    const maxSignups = stats ? Math.max(1, ...stats.signups.map((day) => day.count)) : 1;
+
     const formatDate = (dateString) => {
         if (!dateString) return 'Never';
         return new Date(dateString).toLocaleDateString('en-US', {
@@ -85,11 +182,13 @@ const Dashboard = () => {
                         </div>
                         <div>
                             <h1 className="text-2xl font-bold text-gray-900">User Management</h1>
-                            <p className="text-sm text-gray-500">{totalCount} total users</p>
+                            <p className="text-sm text-gray-500">
+                                {stats ? stats.total.toLocaleString() : formatCount(totalCount)} total users
+                            </p>
                         </div>
                     </div>
                     <button
-                        onClick={() => fetchUsers(currentPage)}
+                        onClick={refresh}
                         disabled={isLoading}
                         className="flex items-center space-x-2 px-4 py-2 bg-white border border-gray-300 rounded-lg hover:bg-gray-50 disabled:opacity-50"
                     >
@@ -98,12 +197,106 @@ const Dashboard = () => {
                     </button>
                 </div>
 
+                {/* Stats */}
+                {stats && (
+                    <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-4 mb-6">
+                        {[
+                            { label: 'Active', value: stats.active, icon: UserCheck, tone: 'text-green-600 bg-green-100' },
+                            { label: 'Banned', value: stats.banned, icon: UserX, tone: 'text-red-600 bg-red-100' },
+                            { label: 'Admins', value: stats.admins, icon: Shield, tone: 'text-amber-600 bg-amber-100' },
+                        ].map(({ label, value, icon: Icon, tone }) => (
+                            <div key={label} className="bg-white rounded-xl shadow p-4 flex items-center space-x-3">
+                                <div className={`w-10 h-10 rounded-lg flex items-center justify-center ${tone}`}>
+                                    <Icon className="w-5 h-5" />
+                                </div>
+                                <div>
+                                    <p className="text-sm text-gray-500">{label}</p>
+                                    <p className="text-xl font-semibold text-gray-900">{value.toLocaleString()}</p>
+                                </div>
+                            </div>
+                        ))}
+                        <div className="bg-white rounded-xl shadow p-4">
+                            <p className="text-sm text-gray-500">
+                                Signups (30 days): {stats.signups.reduce((sum, day) => sum + day.count, 0).toLocaleString()}
+                            </p>
+                            <div className="flex items-end h-10 mt-2 space-x-0.5">
+                                {stats.signups.map((day) => (
+                                    <div
+                                        key={day.date}
+                                        title={`${day.date}: ${day.count}`}
+                                        className="flex-1 bg-indigo-400 rounded-sm"
+                                        style={{
+                                            height: `${Math.max(4, (day.count / maxSignups) * 100)}%`,
+                                        }}
+                                    />
+                                ))}
+                            </div>
+                        </div>
+                    </div>
+                )}
+
+                {/* Search & filters */}
+                <div className="flex flex-col sm:flex-row gap-3 mb-4">
+                    <div className="relative flex-1">
+                        <Search className="w-4 h-4 text-gray-400 absolute left-3 top-1/2 -translate-y-1/2" />
+                        <input
+                            type="search"
+                            value={searchInput}
+                            onChange={(e) => setSearchInput(e.target.value)}
+                            placeholder="Search by email or name"
+                            className="w-full pl-9 pr-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-indigo-500"
+                        />
+                    </div>
+                    <select
+                        value={statusFilter}
+                        onChange={(e) => {
+                            setStatusFilter(e.target.value);
+                            setCurrentPage(1);
+                        }}
+                        className="px-3 py-2 border border-gray-300 rounded-lg bg-white focus:outline-none focus:ring-2 focus:ring-indigo-500"
+                    >
+                        <option value="">All statuses</option>
+                        <option value="true">Active</option>
+                        <option value="false">Banned</option>
+                    </select>
+                </div>
+
+                {/* Bulk actions */}
+                {selectedIds.length > 0 && (
+                    <div className="flex items-center justify-between mb-4 px-4 py-3 bg-indigo-50 border border-indigo-200 rounded-lg">
+                        <span className="text-sm text-indigo-800">{selectedIds.length} selected</span>
+                        <div className="flex space-x-2">
+                            <button
+                                onClick={() => handleBulkAction('ban')}
+                                className="px-3 py-1.5 rounded-md text-sm font-medium bg-red-100 text-red-700 hover:bg-red-200"
+                            >
+                                Ban selected
+                            </button>
+                            <button
+                                onClick={() => handleBulkAction('activate')}
+                                className="px-3 py-1.5 rounded-md text-sm font-medium bg-green-100 text-green-700 hover:bg-green-200"
+                            >
+                                Activate selected
+                            </button>
+                        </div>
+                    </div>
+                )}
+
                 {/* Table */}
                 <div className="bg-white rounded-xl shadow-lg overflow-hidden">
                     <div className="overflow-x-auto">
                         <table className="min-w-full divide-y divide-gray-200">
                             <thead className="bg-gray-50">
                                 <tr>
+                                    <th className="pl-6 py-3 w-4">
+                                        <input
+                                            type="checkbox"
+                                            aria-label="Select all users on this page"
+                                            checked={users.length > 0 && selectedIds.length === users.length}
+                                            onChange={toggleSelectAll}
+                                            className="rounded border-gray-300 text-indigo-600"
+                                        />
+                                    </th>
                                     <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                                         User
                                     </th>
@@ -124,7 +317,7 @@ const Dashboard = () => {
                             <tbody className="bg-white divide-y divide-gray-200">
                                 {isLoading ? (
                                     <tr>
-                                        <td colSpan={5} className="px-6 py-12 text-center">
+                                        <td colSpan={6} className="px-6 py-12 text-center">
                                             <div className="flex justify-center">
                                                 <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-indigo-600" />
                                             </div>
@@ -132,13 +325,22 @@ const Dashboard = () => {
                                     </tr>
                                 ) : users.length === 0 ? (
                                     <tr>
-                                        <td colSpan={5} className="px-6 py-12 text-center text-gray-500">
+                                        <td colSpan={6} className="px-6 py-12 text-center text-gray-500">
                                             No users found
                                         </td>
                                     </tr>
                                 ) : (
                                     users.map((user) => (
                                         <tr key={user.id} className="hover:bg-gray-50">
+                                            <td className="pl-6 py-4 w-4">
+                                                <input
+                                                    type="checkbox"
+                                                    aria-label={`Select ${user.full_name}`}
+                                                    checked={selectedIds.includes(user.id)}
+                                                    onChange={() => toggleSelected(user.id)}
+                                                    className="rounded border-gray-300 text-indigo-600"
+                                                />
+                                            </td>
                                             <td className="px-6 py-4 whitespace-nowrap">
                                                 <div className="flex items-center">
                                                     <div className="w-10 h-10 bg-indigo-100 rounded-full flex items-center justify-center">
@@ -190,10 +392,12 @@ const Dashboard = () => {
                     </div>
 
                     {/* Pagination */}
-                    {totalPages > 1 && (
+                    {(currentPage > 1 || hasNext) && (
                         <div className="bg-gray-50 px-6 py-4 flex items-center justify-between border-t border-gray-200">
                             <div className="text-sm text-gray-500">
-                                Page {currentPage} of {totalPages}
+                                {totalPages === null
+                                    ? `Page ${currentPage}`
+                                    : `Page ${currentPage} of ${countIsApproximate ? '~' : ''}${totalPages.toLocaleString()}`}
                             </div>
                             <div className="flex space-x-2">
                                 <button
@@ -205,8 +409,8 @@ const Dashboard = () => {
                                     Previous
                                 </button>
                                 <button
-                                    onClick={() => setCurrentPage((p) => Math.min(totalPages, p + 1))}
-                                    disabled={currentPage === totalPages || isLoading}
+                                    onClick={() => setCurrentPage((p) => p + 1)}
+                                    disabled={!hasNext || isLoading}
                                     className="flex items-center px-3 py-1.5 border border-gray-300 rounded-md text-sm font-medium text-gray-700 bg-white hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
                                 >
                                     Next
@@ -225,15 +429,18 @@ const Dashboard = () => {
                     setModalOpen(false);
                     setSelectedUser(null);
                     setPendingAction(null);
+                    setIsBulkAction(false);
                 }}
                 onConfirm={confirmStatusChange}
-                title={pendingAction === 'ban' ? 'Ban User' : 'Activate User'}
+                title={`${pendingAction === 'ban' ? 'Ban' : 'Activate'} ${isBulkAction ? 'Users' : 'User'}`}
                 message={
-                    pendingAction === 'ban'
-                        ? `Are you sure you want to ban ${selectedUser?.full_name}? They will no longer be able to access the system.`
-                        : `Are you sure you want to activate ${selectedUser?.full_name}? They will regain access to the system.`
+                    isBulkAction
+                        ? `Are you sure you want to ${pendingAction} ${selectedIds.length} selected user(s)?`
+                        : pendingAction === 'ban'
+                            ? `Are you sure you want to ban ${selectedUser?.full_name}? They will no longer be able to access the system.`
+                            : `Are you sure you want to activate ${selectedUser?.full_name}? They will regain access to the system.`
                 }
-                confirmText={pendingAction === 'ban' ? 'Ban User' : 'Activate User'}
+                confirmText={`${pendingAction === 'ban' ? 'Ban' : 'Activate'} ${isBulkAction ? 'Users' : 'User'}`}
                 confirmStyle={pendingAction === 'ban' ? 'danger' : 'success'}
             />
         </div>
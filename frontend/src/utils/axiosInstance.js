@@ -1,37 +1,148 @@
 import axios from 'axios';
 
+const baseURL = import.meta.env.VITE_API_BASE_URL;
+
+// Conditional GET cache: full URL -> { etag, data }. Bounded; oldest entries go first.
+const ETAG_CACHE_SIZE = 50;
+const etagCache = new Map();
+
+// Refresh this many seconds before the access token expires
+const REFRESH_MARGIN_SECONDS = 60;
+
+// Endpoints whose 401 means bad credentials, not an expired access token
+const AUTH_URLS = ['/auth/login/', '/auth/register/', '/auth/token/refresh/'];
+
 const axiosInstance = axios.create({
-    baseURL: import.meta.env.VITE_API_BASE_URL,
+    baseURL,
     headers: {
         'Content-Type': 'application/json',
     },
+    // 304 Not Modified is answered from etagCache below
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
-// Request Interceptor: Attach JWT token to all outgoing requests
+const cacheKey = (config) => axiosInstance.getUri(config);
+
+const rememberResponse = (key, etag, data) => {
+    etagCache.delete(key);
+    etagCache.set(key, { etag, data });
+    if (etagCache.size > ETAG_CACHE_SIZE) {
+        etagCache.delete(etagCache.keys().next().value);
+    }
+};
+
+const isAuthUrl = (url = '') => AUTH_URLS.some((path) => url.includes(path));
+
+// Seconds until the JWT expires (null if it can't be decoded)
+const secondsUntilExpiry = (token) => {
+    try {
+        const payload = token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/');
+        const { exp } = JSON.parse(atob(payload));
+        return exp - Date.now() / 1000;
+    } catch {
+        return null;
+    }
+};
+
+const clearSession = () => {
+    // Force full page reload to clear React state
+    // Using window.location instead of navigate() ensures complete state reset
+    // and prevents stale auth state from persisting in memory
+    localStorage.removeItem('accessToken');
+    localStorage.removeItem('refreshToken');
+    localStorage.removeItem('user');
+    etagCache.clear();
+    window.location.href = '/login';
+};
+
+// Single flight: concurrent callers share one refresh request
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+    if (!refreshPromise) {
+        const refresh = localStorage.getItem('refreshToken');
+        refreshPromise = (refresh
+            ? axios.post(`${baseURL}/auth/token/refresh/`, { refresh })
+            : Promise.reject(new Error('No refresh token'))
+        )
+            .then((response) => {
+                localStorage.setItem('accessToken', response.data.access);
+                return response.data.access;
+            })
+            .finally(() => {
+                refreshPromise = null;
+            });
+    }
+    return refreshPromise;
+};
+
+// Request Interceptor: Attach JWT token to all outgoing requests,
+// refreshing it first when it is about to expire
 axiosInstance.interceptors.request.use(
-    (config) => {
-        const token = localStorage.getItem('accessToken');
+    async (config) => {
+        let token = localStorage.getItem('accessToken');
+        if (token && !isAuthUrl(config.url) && localStorage.getItem('refreshToken')) {
+            const remaining = secondsUntilExpiry(token);
+            if (remaining !== null && remaining < REFRESH_MARGIN_SECONDS) {
+                // A failed proactive refresh falls through to the 401 handling below
+                token = await refreshAccessToken().catch(() => token);
+            }
+        }
         if (token) {
             config.headers.Authorization = `Bearer ${token}`;
         }
+        // Revalidate instead of refetching when we already hold this resource
+        if (config.method === 'get') {
+            const cached = etagCache.get(cacheKey(config));
+            if (cached) {
+                config.headers['If-None-Match'] = cached.etag;
+            }
+        }
         return config;
     },
     (error) => Promise.reject(error)
 );
 
-// Response Interceptor: Handle auth failures globally
+// Response Interceptor: Serve 304s from cache, refresh and replay on 401
 axiosInstance.interceptors.response.use(
-    (response) => response,
-    (error) => {
-        if (error.response?.status === 401) {
-            // Token expired or user banned - force full page reload to clear React state
-            // Using window.location instead of navigate() ensures complete state reset
-            // and prevents stale auth state from persisting in memory
-            localStorage.removeItem('accessToken');
-            localStorage.removeItem('refreshToken');
-            localStorage.removeItem('user');
-            window.location.href = '/login';
+    (response) => {
+        if (response.config.method !== 'get') {
+            return response;
+        }
+        const key = cacheKey(response.config);
+        if (response.status === 304) {
+            const cached = etagCache.get(key);
+            if (cached) {
+                return { ...response, status: 200, data: cached.data };
+            }
+            // Cache entry evicted mid-flight: fetch the full representation
+            const headers = response.config.headers.toJSON();
+            delete headers['If-None-Match'];
+            return axiosInstance.request({ ...response.config, headers });
+        }
+        if (response.headers.etag) {
+            rememberResponse(key, response.headers.etag, response.data);
+        }
+        return response;
+    },
+    async (error) => {
+        const config = error.config;
+        if (error.response?.status !== 401 || !config || isAuthUrl(config.url)) {
+            return Promise.reject(error);
+        }
+
+        // Expired access token: refresh once, then replay the original request.
+        // A second 401 (banned user, revoked or expired refresh token) ends the session.
+        if (!config._retried && localStorage.getItem('refreshToken')) {
+            config._retried = true;
+            try {
+                await refreshAccessToken();
+                return axiosInstance.request(config);
+            } catch {
+                // Fall through to logout
+            }
         }
+        clearSession();
         return Promise.reject(error);
     }
 );